@@ -50,7 +50,7 @@ def _frontend_base_url(request: Request) -> str:
 @router.post("/login")
 async def login(request: Request):
     """Login user (email/password or OAuth token)"""
-    from api.database import create_session
+    from api.database_async import create_session
 
     flow = Flow.from_client_secrets_file(
         "credentials.json",
@@ -64,16 +64,16 @@ async def login(request: Request):
     )
 
     # store state in session
-    create_session(state, {"state": state})
+    await create_session(state, {"state": state})
 
     return RedirectResponse(url=authorization_url)
 
 @router.post("/logout")
 async def logout(session_id: str):
     """Logout and revoke session"""
-    from api.database import delete_session
+    from api.database_async import delete_session
 
-    success = delete_session(session_id)
+    success = await delete_session(session_id)
     if success:
         return {"message": "Logged out successfully"}
 
@@ -82,7 +82,7 @@ async def logout(session_id: str):
 @router.get("/google-oauth")
 async def google_oauth(request: Request):
     """Initiate Google OAuth for calendar integration"""
-    from api.database import create_session
+    from api.database_async import create_session
 
     flow = Flow.from_client_secrets_file(
         "credentials.json",
@@ -96,19 +96,19 @@ async def google_oauth(request: Request):
     )
 
     # store state in session
-    create_session(state, {"state": state})
+    await create_session(state, {"state": state})
 
     return RedirectResponse(url=authorization_url)
 
 @router.get("/google-oauth/callback")
 async def google_oauth_callback(request: Request, code: str = None, state: str = None):
     """Receive OAuth callback and store refresh/access tokens"""
-    from api.database import get_session, create_session
+    from api.database_async import get_session, create_session
 
     if not code or not state:
         raise HTTPException(status_code=400, detail="Missing code or state parameter")
 
-    session = get_session(state)
+    session = await get_session(state)
     if not session:
         raise HTTPException(status_code=400, detail="Invalid state parameter")
 
@@ -135,7 +135,7 @@ async def google_oauth_callback(request: Request, code: str = None, state: str =
             "scopes": credentials.scopes
         }
     }
-    create_session(state, creds_dict)
+    await create_session(state, creds_dict)
 
     # redirect to frontend dashboard
     frontend = _frontend_base_url(request)
@@ -144,9 +144,9 @@ async def google_oauth_callback(request: Request, code: str = None, state: str =
 @router.get("/user")
 async def get_user(session_id: str):
     """Retrieves authenticated user information from Google"""
-    from api.database import get_session, create_or_update_user, get_user_credits
+    from api.database_async import get_session, create_or_update_user, get_user_credits
 
-    session = get_session(session_id)
+    session = await get_session(session_id)
     if not session or "credentials" not in session.get("credentials", {}):
         raise HTTPException(status_code=401, detail="Not authenticated")
 
@@ -161,10 +161,10 @@ async def get_user(session_id: str):
     email = user_info.get("email")
     name = user_info.get("name")
 
-    db_user_id = create_or_update_user(user_id, email, name)
+    db_user_id = await create_or_update_user(user_id, email, name)
 
     # get user"s credit information
-    credit_info = get_user_credits(db_user_id)
+    credit_info = await get_user_credits(db_user_id)
     if credit_info:
         user_info["credits"] = credit_info
 
@@ -173,12 +173,12 @@ async def get_user(session_id: str):
 @router.get("/status")
 async def auth_status(session_id: str = None):
     """Checks if user is authenticated"""
-    from api.database import get_session
+    from api.database_async import get_session
 
     if not session_id:
         return {"authenticated": False}
 
-    session = get_session(session_id)
+    session = await get_session(session_id)
     if not session:
         return {"authenticated": False}
 
@@ -190,9 +190,9 @@ async def auth_status(session_id: str = None):
 @router.get("/credits")
 async def get_credits(session_id: str):
     """Get user"s credit balance and plan information"""
-    from api.database import get_session, get_user_credits, get_user_by_id, get_supabase_client
+    from api.database_async import get_session, get_user_credits, get_user_by_id, get_async_supabase_client, execute
 
-    session = get_session(session_id)
+    session = await get_session(session_id)
     if not session or "credentials" not in session.get("credentials", {}):
         raise HTTPException(status_code=401, detail="Not authenticated")
 
@@ -203,13 +203,13 @@ async def get_credits(session_id: str):
     google_user_id = user_info.get("id")
 
     # get user from database by google_user_id
-    supabase = get_supabase_client()
-    response = supabase.table("users").select("id").eq("google_user_id", google_user_id).execute()
+    supabase = get_async_supabase_client()
+    response = await execute(supabase.table("users").select("id").eq("google_user_id", google_user_id))
     if not response.data:
         raise HTTPException(status_code=404, detail="User not found")
 
     db_user_id = response.data[0]["id"]
-    credit_info = get_user_credits(db_user_id)
+    credit_info = await get_user_credits(db_user_id)
     if not credit_info:
         raise HTTPException(status_code=404, detail="User credit information not found")
 
@@ -218,9 +218,9 @@ async def get_credits(session_id: str):
 @router.post("/upgrade-plan")
 async def upgrade_plan(session_id: str, plan_type: str):
     """Upgrade user"s subscription plan (valid: "free", "pro", "unlimited")"""
-    from api.database import get_session, update_user_plan, get_user_credits, get_supabase_client
+    from api.database_async import get_session, update_user_plan, get_user_credits, get_async_supabase_client, execute
 
-    session = get_session(session_id)
+    session = await get_session(session_id)
     if not session or "credentials" not in session.get("credentials", {}):
         raise HTTPException(status_code=401, detail="Not authenticated")
 
@@ -234,19 +234,19 @@ async def upgrade_plan(session_id: str, plan_type: str):
     google_user_id = user_info.get("id")
 
     # get user from database by google_user_id
-    supabase = get_supabase_client()
-    response = supabase.table("users").select("id").eq("google_user_id", google_user_id).execute()
+    supabase = get_async_supabase_client()
+    response = await execute(supabase.table("users").select("id").eq("google_user_id", google_user_id))
     if not response.data:
         raise HTTPException(status_code=404, detail="User not found")
 
     db_user_id = response.data[0]["id"]
 
-    success = update_user_plan(db_user_id, plan_type)
+    success = await update_user_plan(db_user_id, plan_type)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to update plan")
 
     # return updated credit info
-    credit_info = get_user_credits(db_user_id)
+    credit_info = await get_user_credits(db_user_id)
     return {
         "message": f"Successfully upgraded to {plan_type} plan",
         "credits": credit_info
@@ -302,8 +302,8 @@ async def register_nextauth_session(request: Request):
         }
 
         # store in database
-        from api.database import create_session, create_or_update_user
-        create_session(session_id, {
+        from api.database_async import create_session, create_or_update_user
+        await create_session(session_id, {
             "state": session_id,
             "credentials": creds_dict
         })
@@ -319,7 +319,7 @@ async def register_nextauth_session(request: Request):
         name = user_info.get("name")
 
         print(f"User info retrieved: {email}")
-        db_user_id = create_or_update_user(user_id, email, name)
+        db_user_id = await create_or_update_user(user_id, email, name)
         print(f"User created/updated in database: {db_user_id}")
 
         return {
@@ -344,13 +344,13 @@ class UpdateTimezoneRequest(BaseModel):
 @router.post("/update-timezone")
 async def update_user_timezone(request: UpdateTimezoneRequest):
     """Update user's timezone setting"""
-    from api.database import update_user_timezone, get_user_by_id
+    from api.database_async import update_user_timezone, get_user_by_id
 
-    user = get_user_by_id(request.user_id)
+    user = await get_user_by_id(request.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    success = update_user_timezone(request.user_id, request.timezone)
+    success = await update_user_timezone(request.user_id, request.timezone)
     if not success:
         raise HTTPException(status_code=500, detail="Error updating timezone")
 
@@ -0,0 +1,114 @@
+"""
+User row cache: request scope plus a short-lived process cache.
+
+A chat turn reads the same users row (timezone, conversation_id, plan,
+credits) from every intent it runs in parallel. Inside user_request_scope()
+the row is loaded once and shared by everything the request awaits or
+spawns (asyncio tasks copy the context, so they share the scope dict).
+Outside a request scope and across requests, rows come from a per-process
+RowCache with a short TTL; the user writers in api/database.py and
+api/database_async.py invalidate it. Credits are read fresh: another worker or
+a billing webhook may have just changed them, so they skip the process cache
+and come from the database once per request.
+
+The request scope also makes writes cheap: update_user_conversation_id skips
+the write when this request already knows the row holds that value.
+"""
+
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from api.row_cache import RowCache
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))  # 0 disables the process cache
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+
+user_cache = RowCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+# user id -> users row (None = no such user) for the current request
+_request_users: ContextVar[Optional[Dict[Any, Optional[dict]]]] = ContextVar("request_users", default=None)
+# user ids whose scoped row this request read from the database itself
+_request_fresh: ContextVar[Optional[Set[Any]]] = ContextVar("request_fresh", default=None)
+
+
+def _key(user_id: Any) -> Any:
+    # chat requests carry the user id as a string
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return user_id
+
+
+@contextmanager
+def user_request_scope():
+    """Share user rows across one request (no-op when a scope is already open)."""
+    if _request_users.get() is not None:
+        yield
+        return
+    token = _request_users.set({})
+    fresh_token = _request_fresh.set(set())
+    try:
+        yield
+    finally:
+        _request_fresh.reset(fresh_token)
+        _request_users.reset(token)
+
+
+def _scoped(user_id: Any, fresh: bool = False):
+    """(found, row copy) from the current request scope (fresh: only a row it read from the database)."""
+    scope = _request_users.get()
+    key = _key(user_id)
+    if scope is None or key not in scope:
+        return False, None
+    if fresh and key not in _request_fresh.get():
+        return False, None
+    row = scope[key]
+    return True, dict(row) if row is not None else None
+
+
+def _remember(user_id: Any, row: Optional[dict], fresh: bool = False) -> Optional[dict]:
+    scope = _request_users.get()
+    if scope is not None:
+        scope[_key(user_id)] = dict(row) if row is not None else None
+        if fresh:
+            _request_fresh.get().add(_key(user_id))
+    return row
+
+
+def load_user(user_id: Any, fetch: Callable[[], Optional[dict]], fresh: bool = False) -> Optional[dict]:
+    """The user's row from the request scope, else the process cache (fresh: else the database)."""
+    found, row = _scoped(user_id, fresh)
+    if found:
+        return row
+    if fresh:
+        return _remember(user_id, fetch(), fresh=True)
+    return _remember(user_id, user_cache.load(_key(user_id), fetch))
+
+
+async def load_user_async(user_id: Any, fetch: Callable[[], Awaitable[Optional[dict]]], fresh: bool = False) -> Optional[dict]:
+    found, row = _scoped(user_id, fresh)
+    if found:
+        return row
+    if fresh:
+        return _remember(user_id, await fetch(), fresh=True)
+    return _remember(user_id, await user_cache.load_async(_key(user_id), fetch))
+
+
+def known_in_request(user_id: Any, fields: Dict[str, Any]) -> bool:
+    """True when this request has the user's row and it already holds these values."""
+    found, row = _scoped(user_id)
+    return found and row is not None and all(row.get(k) == v for k, v in fields.items())
+
+
+def note_user_write(user_id: Any, fields: Optional[Dict[str, Any]] = None):
+    """Record a users write: patch the request's row (or forget it) and drop the process entry."""
+    scope = _request_users.get()
+    key = _key(user_id)
+    if scope is not None and key in scope:
+        if fields is not None and scope[key] is not None:
+            scope[key].update(fields)
+        else:
+            del scope[key]
+    user_cache.invalidate(key)
@@ -1,7 +1,7 @@
 # routes for subscription and credit usage information
 
 from fastapi import APIRouter, HTTPException
-from api.database import get_user_credits, get_user_by_id
+from api.database_async import get_user_credits
 
 router = APIRouter()
 
@@ -15,7 +15,7 @@ CREDIT_LIMITS = {
 @router.get("/users/{user_id}/subscription")
 async def get_subscription_status(user_id: int):
     """get user's subscription status and details"""
-    user_data = get_user_by_id(user_id)
+    user_data = await get_user_credits(user_id)
 
     if not user_data:
         raise HTTPException(status_code=404, detail="User not found")
@@ -31,7 +31,7 @@ async def get_subscription_status(user_id: int):
 @router.get("/users/{user_id}/credits")
 async def get_credits(user_id: int):
     """get user's credit usage and limit"""
-    user_data = get_user_credits(user_id)
+    user_data = await get_user_credits(user_id)
 
     if not user_data:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,12 +1,17 @@
 # routes for calendar event management
 # allows users to manually create, update, and delete calendar events
 
-from fastapi import APIRouter, HTTPException
+import hashlib
+import os
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timezone, timedelta
 from api.database import (
     get_supabase_client,
+    get_calendar_version,
+    get_calendar_events_updated_since,
+    get_calendar_event_tombstones,
     create_calendar_event,
     update_calendar_event,
     delete_calendar_event
@@ -14,6 +19,14 @@ from api.database import (
 
 router = APIRouter()
 
+# deleted-event tombstones are kept this long; older cursors get a full reload
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+# updated_at/deleted_at are stamped when a row is written, not when its transaction
+# commits, so a change can become visible with a stamp below a cursor already handed
+# out. each delta re-reads this far behind the cursor; clients apply changes by id.
+CHANGES_OVERLAP = timedelta(seconds=float(os.getenv("CALENDAR_CHANGES_OVERLAP_SECONDS", "10")))
+
 # request models for calendar events
 class CreateCalendarEventRequest(BaseModel):
     user_id: int
@@ -38,18 +51,44 @@ class UpdateCalendarEventRequest(BaseModel):
     task_id: Optional[int] = None
     color_hex: Optional[str] = None
 
+def calendar_etag(user_id: int, version: int, start_date: Optional[str], end_date: Optional[str]) -> str:
+    """weak etag for a calendar read: user's calendar version plus the requested range"""
+    range_key = hashlib.sha1(f"{start_date}|{end_date}".encode()).hexdigest()[:12]
+    return f'W/"{user_id}-{version}-{range_key}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """whether an If-None-Match header (possibly a list, or *) covers the etag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # weak comparison: W/ prefixes are ignored
+    return "*" in candidates or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in candidates]
+
 # ============ CALENDAR EVENT ROUTES ============
 
 @router.get("/events")
 def get_calendar_events(
+    request: Request,
+    response: Response,
     user_id: Optional[int] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None
 ):
-    """get calendar events for user, optionally filtered by date range (overlap logic)"""
+    """
+    get calendar events for user, optionally filtered by date range (overlap logic)
+
+    responses carry an ETag derived from the user's calendar version; a matching
+    If-None-Match is answered with 304 without reading the events
+    """
     if user_id is None:
         raise HTTPException(status_code=400, detail="user_id query parameter is required")
 
+    # conditional GET: one tiny version read instead of the full rows
+    version = get_calendar_version(user_id)
+    etag = calendar_etag(user_id, version, start_date, end_date) if version is not None else None
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
     try:
         supabase = get_supabase_client()
         # build query
@@ -64,16 +103,74 @@ def get_calendar_events(
             query = query.lte("start_time", end_date)
 
         # execute query
-        response = query.order("start_time").execute()
+        result = query.order("start_time").execute()
 
+        if etag:
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = "no-cache"
         return {
             "success": True,
-            "events": response.data,
-            "count": len(response.data)
+            "events": result.data,
+            "count": len(result.data)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching calendar events: {str(e)}")
 
+@router.get("/events/changes")
+def get_calendar_event_changes(user_id: Optional[int] = None, since: Optional[str] = None):
+    """
+    delta sync: events created/updated and ids of events deleted after the `since` cursor
+
+    the response cursor is the latest change timestamp seen (database clock), to be
+    passed back as `since`. changes stamped up to CHANGES_OVERLAP before the cursor are
+    sent again (late commits), so clients upsert events and drop deleted ids by id.
+    without a cursor, or with one older than the tombstone retention window, the full
+    calendar is returned with reset=true
+    """
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="user_id query parameter is required")
+
+    since_time = None
+    if since:
+        try:
+            # a "+00:00" offset arrives as " 00:00" when the cursor isn't URL-encoded
+            since_time = datetime.fromisoformat(since.replace("Z", "+00:00").replace(" ", "+"))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid since cursor. Use the cursor from a previous response")
+        if since_time.tzinfo is None:
+            since_time = since_time.replace(tzinfo=timezone.utc)
+
+    reset = since_time is None or since_time < datetime.now(timezone.utc) - TOMBSTONE_RETENTION
+    try:
+        if reset:
+            supabase = get_supabase_client()
+            events = supabase.table("calendar_events").select("*").eq("user_id", user_id).order("updated_at").execute().data
+            tombstones = []
+        else:
+            read_from = (since_time - CHANGES_OVERLAP).isoformat()
+            events = get_calendar_events_updated_since(user_id, read_from)
+            tombstones = get_calendar_event_tombstones(user_id, read_from)
+            if events is None or tombstones is None:
+                raise HTTPException(status_code=500, detail="Error fetching calendar changes")
+
+        # cursor only moves forward, to the newest change actually returned
+        change_times = [e["updated_at"] for e in events if e.get("updated_at")] + \
+            [t["deleted_at"] for t in tombstones]
+        cursor = max(change_times, key=lambda value: datetime.fromisoformat(value.replace("Z", "+00:00")), default=since)
+
+        return {
+            "success": True,
+            "reset": reset,
+            "events": events,
+            "deleted": [t["event_id"] for t in tombstones],
+            "cursor": cursor,
+            "count": len(events) + len(tombstones)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching calendar changes: {str(e)}")
+
 @router.post("/events")
 def create_event(request: CreateCalendarEventRequest):
     """create new calendar event"""
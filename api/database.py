@@ -1,10 +1,14 @@
 # supabase database client and helper functions
 import os
 from typing import Optional, Dict, Any
-from datetime import datetime, timezone
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from api import database_operations as ops
+from api.auth.user_cache import load_user
+from api.database_operations import UNIQUE_VIOLATION, invalidate_schedules, update_task_index
+from api.settings.settings_cache import settings_cache
+
 load_dotenv()
 
 # initialize supabase client - defer initialization until first use
@@ -23,395 +27,107 @@ def get_supabase_client() -> Client:
         _supabase_client = create_client(supabase_url, supabase_key)
     return _supabase_client
 
+def run(op, *args, **kwargs):
+    """run a data-layer operation (api/database_operations.py) on the sync client"""
+    try:
+        steps = op(ops.LazyClient(lambda: get_supabase_client()), *args, **kwargs)
+        response, error = None, None
+        while True:
+            try:
+                query = steps.throw(error) if error is not None else steps.send(response)
+            except StopIteration as done:
+                return done.value
+            try:
+                response, error = query.execute(), None
+            except Exception as e:
+                response, error = None, e
+    except Exception as e:
+        return ops.failed(op, e, args, kwargs)
+
+def _helper(op):
+    return ops.layer_helper(op, lambda *args, **kwargs: run(op, *args, **kwargs), __name__)
+
 # ============ USER OPERATIONS ============
 
-def create_or_update_user(google_user_id: str, email: str, name: str) -> int:
-    """create or update user in database, returns user id"""
-    try:
-        supabase = get_supabase_client()
-        # check if user exists
-        response = supabase.table("users").select("id").eq("google_user_id", google_user_id).execute()
+create_or_update_user = _helper(ops.create_or_update_user)
+create_or_update_user_by_email = _helper(ops.create_or_update_user_by_email)
+update_user_plan = _helper(ops.update_user_plan)
+update_user_timezone = _helper(ops.update_user_timezone)
+update_user_conversation_id = _helper(ops.update_user_conversation_id)
+save_feedback = _helper(ops.save_feedback)
 
-        if response.data:
-            # update existing user
-            user_id = response.data[0]["id"]
-            supabase.table("users").update({
-                "email": email,
-                "name": name
-            }).eq("id", user_id).execute()
-            return user_id
-        else:
-            # create new user
-            response = supabase.table("users").insert({
-                "google_user_id": google_user_id,
-                "email": email,
-                "name": name,
-                "subscription_plan": "free",
-                "credits_used": 0,
-                "subscription_status": "active"
-            }).execute()
-            return response.data[0]["id"]
-    except Exception as e:
-        print(f"Error creating/updating user: {e}")
-        raise
+def _fetch_user(user_id: int) -> Optional[Dict[str, Any]]:
+    return run(ops.fetch_user, user_id)
 
 def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
-    """get user by id"""
+    """get user by id (read through the request/process user cache)"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table("users").select("*").eq("id", user_id).execute()
-        return response.data[0] if response.data else None
-    except Exception as e:
-        print(f"Error getting user: {e}")
+        return load_user(user_id, lambda: _fetch_user(user_id))
+    except Exception:
         return None
 
-def create_or_update_user_by_email(email: str, name: Optional[str] = None) -> int:
-    """create or update user by email (for NextAuth integration), returns user id"""
-    try:
-        supabase = get_supabase_client()
-        # check if user exists by email
-        response = supabase.table("users").select("id").eq("email", email).execute()
-
-        if response.data:
-            # update existing user
-            user_id = response.data[0]["id"]
-            if name:
-                supabase.table("users").update({
-                    "name": name
-                }).eq("id", user_id).execute()
-            return user_id
-        else:
-            # create new user without google_user_id (NextAuth user)
-            response = supabase.table("users").insert({
-                "email": email,
-                "name": name or email.split("@")[0],
-                "subscription_plan": "free",
-                "credits_used": 0,
-                "subscription_status": "active"
-            }).execute()
-            return response.data[0]["id"]
-    except Exception as e:
-        print(f"Error creating/updating user by email: {e}")
-        raise
-
 def get_user_credits(user_id: int) -> Optional[Dict[str, Any]]:
-    """get user's credit information"""
+    """get user's credit information (read fresh once per request, never from the process cache)"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table("users").select(
-            "subscription_plan, credits_used, subscription_status"
-        ).eq("id", user_id).execute()
-
-        if response.data:
-            return response.data[0]
-        return None
-    except Exception as e:
-        print(f"Error getting user credits: {e}")
+        user = load_user(user_id, lambda: _fetch_user(user_id), fresh=True)
+    except Exception:
         return None
-
-def update_user_plan(user_id: int, plan_type: str) -> bool:
-    """update user's subscription plan"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("users").update({
-            "subscription_plan": plan_type
-        }).eq("id", user_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error updating user plan: {e}")
-        return False
-
-def update_user_timezone(user_id: int, timezone: str) -> bool:
-    """update user's timezone"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("users").update({
-            "timezone": timezone
-        }).eq("id", user_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error updating timezone: {e}")
-        return False
-
-def update_user_conversation_id(user_id: int, conversation_id: str) -> bool:
-    """update user's current conversation id"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("users").update({
-            "conversation_id": conversation_id
-        }).eq("id", user_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error updating conversation id: {e}")
-        return False
+    return ops.credits_of(user)
 
 def get_user_conversation_id(user_id: int) -> Optional[str]:
-    """get user's current conversation id"""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("users").select("conversation_id").eq("id", user_id).execute()
-        if response.data and response.data[0].get("conversation_id"):
-            return response.data[0]["conversation_id"]
-        return None
-    except Exception as e:
-        print(f"Error getting conversation id: {e}")
-        return None
-
-def save_feedback(message: str, email: Optional[str] = None, user_id: Optional[int] = None) -> bool:
-    """persist feedback submissions"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("feedback").insert({
-            "user_id": user_id,
-            "message": message,
-            "email": email
-        }).execute()
-        return True
-    except Exception as e:
-        print(f"Error saving feedback: {e}")
-        return False
+    """get user's current conversation id (from the cached user row)"""
+    return ops.conversation_id_of(get_user_by_id(user_id))
 
 # ============ SESSION OPERATIONS ============
 
-def create_session(session_id: str, credentials: Dict[str, Any]) -> bool:
-    """create or update session in database"""
-    try:
-        supabase = get_supabase_client()
-        # check if session exists
-        response = supabase.table("sessions").select("id").eq("session_id", session_id).execute()
-
-        if response.data:
-            # update existing session
-            supabase.table("sessions").update({
-                "credentials": credentials
-            }).eq("session_id", session_id).execute()
-        else:
-            # create new session
-            supabase.table("sessions").insert({
-                "session_id": session_id,
-                "credentials": credentials
-            }).execute()
-        return True
-    except Exception as e:
-        print(f"Error creating session: {e}")
-        return False
-
-def get_session(session_id: str) -> Optional[Dict[str, Any]]:
-    """get session by id"""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("sessions").select("*").eq("session_id", session_id).execute()
-        return response.data[0] if response.data else None
-    except Exception as e:
-        print(f"Error getting session: {e}")
-        return None
-
-def delete_session(session_id: str) -> bool:
-    """delete session from database"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("sessions").delete().eq("session_id", session_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error deleting session: {e}")
-        return False
+create_session = _helper(ops.create_session)
+get_session = _helper(ops.get_session)
+delete_session = _helper(ops.delete_session)
 
 # ============ TASK OPERATIONS ============
 
-def create_task(task_data: Dict[str, Any]) -> Optional[int]:
-    """create new task, returns task id"""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("tasks").insert(task_data).execute()
-        return response.data[0]["id"] if response.data else None
-    except Exception as e:
-        print(f"Error creating task: {e}")
-        return None
-
-def create_tasks_batch(tasks_data: list[Dict[str, Any]]) -> list[int]:
-    """create multiple tasks in one go, returns list of task ids"""
-    try:
-        if not tasks_data:
-            return []
-        supabase = get_supabase_client()
-        response = supabase.table("tasks").insert(tasks_data).execute()
-        return [task["id"] for task in response.data] if response.data else []
-    except Exception as e:
-        print(f"Error creating tasks batch: {e}")
-        return []
-
-def get_tasks_by_user(user_id: int) -> list[Dict[str, Any]]:
-    """get all tasks for user"""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("tasks").select("*").eq("user_id", user_id).execute()
-        return response.data
-    except Exception as e:
-        print(f"Error getting tasks: {e}")
-        return []
-
-def update_task(task_id: int, task_data: Dict[str, Any]) -> bool:
-    """update task"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("tasks").update(task_data).eq("id", task_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error updating task: {e}")
-        return False
-
-def delete_task(task_id: int) -> bool:
-    """delete task"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("tasks").delete().eq("id", task_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error deleting task: {e}")
-        return False
+create_task = _helper(ops.create_task)
+create_tasks_batch = _helper(ops.create_tasks_batch)
+get_tasks_by_user = _helper(ops.get_tasks_by_user)
+update_task = _helper(ops.update_task)
+delete_task = _helper(ops.delete_task)
 
 # ============ CALENDAR EVENT OPERATIONS ============
 
-def create_calendar_event(event_data: Dict[str, Any]) -> Optional[int]:
-    """create calendar event, returns event id"""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("calendar_events").insert(event_data).execute()
-        return response.data[0]["id"] if response.data else None
-    except Exception as e:
-        print(f"Error creating calendar event: {e}")
-        return None
-
-def create_calendar_events_batch(events_data: list[Dict[str, Any]]) -> list[int]:
-    """create multiple calendar events in one go, returns list of event ids"""
-    try:
-        if not events_data:
-            return []
-        supabase = get_supabase_client()
-        response = supabase.table("calendar_events").insert(events_data).execute()
-        return [event["id"] for event in response.data] if response.data else []
-    except Exception as e:
-        print(f"Error creating calendar events batch: {e}")
-        return []
-
-def get_calendar_events(user_id: int) -> list[Dict[str, Any]]:
-    """get all calendar events for user"""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("calendar_events").select("*").eq("user_id", user_id).execute()
-        return response.data
-    except Exception as e:
-        print(f"Error getting calendar events: {e}")
-        return []
-
-def update_calendar_event(event_id: int, event_data: Dict[str, Any]) -> bool:
-    """update calendar event"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("calendar_events").update(event_data).eq("id", event_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error updating calendar event: {e}")
-        return False
-
-def delete_calendar_event(event_id: int) -> bool:
-    """delete calendar event"""
-    try:
-        supabase = get_supabase_client()
-        supabase.table("calendar_events").delete().eq("id", event_id).execute()
-        return True
-    except Exception as e:
-        print(f"Error deleting calendar event: {e}")
-        return False
-
-def delete_future_calendar_events(user_id: int) -> bool:
-    """delete all future calendar events for user (from now onwards)"""
-    try:
-        supabase = get_supabase_client()
-        now = datetime.now(timezone.utc).isoformat()
-        supabase.table("calendar_events").delete().eq("user_id", user_id).gte("start_time", now).execute()
-        return True
-    except Exception as e:
-        print(f"Error deleting future calendar events: {e}")
-        return False
-
-def delete_events_for_tasks(user_id: int, task_ids: list[int]) -> bool:
-    """
-    Delete calendar events for specific tasks only (surgical deletion).
-    Only deletes future events (from now onwards).
-
-    Args:
-        user_id: User ID to ensure security
-        task_ids: List of task IDs whose events should be deleted
-
-    Returns:
-        bool: True if successful, False otherwise
-    """
-    try:
-        supabase = get_supabase_client()
-        now = datetime.now(timezone.utc).isoformat()
-        supabase.table("calendar_events") \
-            .delete() \
-            .eq("user_id", user_id) \
-            .in_("task_id", task_ids) \
-            .gte("start_time", now) \
-            .execute()
-        return True
-    except Exception as e:
-        print(f"Error deleting events for tasks {task_ids}: {e}")
-        return False
-
-def get_calendar_events_by_task_id(task_id: int) -> list[Dict[str, Any]]:
-    """get all calendar events linked to a specific task"""
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("calendar_events").select("*").eq("task_id", task_id).execute()
-        return response.data
-    except Exception as e:
-        print(f"Error getting calendar events by task_id: {e}")
-        return []
+create_calendar_event = _helper(ops.create_calendar_event)
+create_calendar_events_batch = _helper(ops.create_calendar_events_batch)
+get_calendar_events = _helper(ops.get_calendar_events)
+update_calendar_event = _helper(ops.update_calendar_event)
+delete_calendar_event = _helper(ops.delete_calendar_event)
+delete_future_calendar_events = _helper(ops.delete_future_calendar_events)
+delete_events_for_tasks = _helper(ops.delete_events_for_tasks)
+apply_calendar_event_changes = _helper(ops.apply_calendar_event_changes)
+get_calendar_version = _helper(ops.get_calendar_version)
+get_calendar_events_updated_since = _helper(ops.get_calendar_events_updated_since)
+get_calendar_event_tombstones = _helper(ops.get_calendar_event_tombstones)
+get_calendar_events_by_task_id = _helper(ops.get_calendar_events_by_task_id)
+
+# ============ EMBEDDING CACHE OPERATIONS ============
+
+get_text_embeddings = _helper(ops.get_text_embeddings)
+save_text_embeddings = _helper(ops.save_text_embeddings)
+get_task_embeddings = _helper(ops.get_task_embeddings)
+save_task_embeddings = _helper(ops.save_task_embeddings)
 
 # ============ SETTINGS OPERATIONS ============
 
+def _fetch_settings(user_id: int) -> Optional[Dict[str, Any]]:
+    return run(ops.fetch_settings, user_id)
+
 def get_settings(user_id: int) -> Optional[Dict[str, Any]]:
-    """get user's settings"""
+    """get user's settings (read through the per-process settings cache)"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table("settings").select("*").eq("user_id", user_id).execute()
-        return response.data[0] if response.data else None
-    except Exception as e:
-        print(f"Error getting settings: {e}")
+        return settings_cache.load(user_id, lambda: _fetch_settings(user_id))
+    except Exception:
         return None
 
-def create_or_update_settings(user_id: int, settings_data: Dict[str, Any]) -> bool:
-    """create or update settings"""
-    try:
-        supabase = get_supabase_client()
-        # check if settings exist
-        response = supabase.table("settings").select("id").eq("user_id", user_id).execute()
-
-        if response.data:
-            # update existing settings
-            supabase.table("settings").update(settings_data).eq("user_id", user_id).execute()
-        else:
-            # create new settings
-            settings_data["user_id"] = user_id
-            supabase.table("settings").insert(settings_data).execute()
-        return True
-    except Exception as e:
-        print(f"Error creating/updating settings: {e}")
-        return False
+create_or_update_settings = _helper(ops.create_or_update_settings)
 
 # ============ REVIEW SESSION OPERATIONS ============
 
-def create_review_sessions_batch(sessions_data: list[Dict[str, Any]]) -> list[str]:
-    """create multiple review sessions, returns list of session ids"""
-    try:
-        if not sessions_data:
-            return []
-        supabase = get_supabase_client()
-        response = supabase.table("review_sessions").insert(sessions_data).execute()
-        return [session["id"] for session in response.data] if response.data else []
-    except Exception as e:
-        print(f"Error creating review sessions batch: {e}")
-        return []
+create_review_sessions_batch = _helper(ops.create_review_sessions_batch)
@@ -0,0 +1,200 @@
+# async supabase (postgrest) client and helper functions
+# same helpers as api/database.py (both run the operations in api/database_operations.py),
+# awaited natively by async routes instead of running the sync client in worker threads. queries share one pooled keep-alive
+# http client per event loop, and a semaphore caps how many are in flight.
+import asyncio
+import os
+from typing import Optional, Dict, Any
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from dotenv import load_dotenv
+
+from api import database_operations as ops
+from api.auth.user_cache import load_user_async
+from api.settings.settings_cache import settings_cache
+
+load_dotenv()
+
+# connection pool / timeout / concurrency configuration (per worker process)
+# queries beyond SUPABASE_MAX_CONCURRENCY wait on a semaphore rather than in the http pool's
+# queue, which is rescanned for every request; throughput dropped past ~20 connections under load
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))  # max open connections
+SUPABASE_POOL_KEEPALIVE = int(os.getenv("SUPABASE_POOL_KEEPALIVE", "20"))  # idle connections kept open
+SUPABASE_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY_SECONDS", "30"))
+SUPABASE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_CONNECT_TIMEOUT_SECONDS", "5"))
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "10"))  # read/write/pool wait
+SUPABASE_MAX_CONCURRENCY = int(os.getenv("SUPABASE_MAX_CONCURRENCY", "20"))  # in-flight queries, 0 = unlimited
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() == "true"
+
+# pooled connections belong to the event loop that opened them, so the client is per loop
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_async_supabase_client: Optional[AsyncPostgrestClient] = None
+_query_limiter: Optional[asyncio.Semaphore] = None
+
+def _bind_running_loop():
+    """reset the pool when called from a different event loop than the one it was built on"""
+    global _loop, _http_client, _async_supabase_client, _query_limiter
+    loop = asyncio.get_running_loop()
+    if loop is not _loop:
+        _loop, _http_client, _async_supabase_client, _query_limiter = loop, None, None, None
+
+def get_async_supabase_client() -> AsyncPostgrestClient:
+    """Get or create the pooled async PostgREST client (lazy initialization, call from a coroutine)"""
+    global _http_client, _async_supabase_client
+    _bind_running_loop()
+    if _async_supabase_client is None:
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_SERVICE_KEY")  # use service key for backend operations
+
+        if not supabase_url or not supabase_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY must be set in .env")
+
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=SUPABASE_POOL_SIZE,
+                max_keepalive_connections=SUPABASE_POOL_KEEPALIVE,
+                keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(SUPABASE_TIMEOUT_SECONDS, connect=SUPABASE_CONNECT_TIMEOUT_SECONDS),
+            http2=SUPABASE_HTTP2,
+            follow_redirects=True,
+        )
+        _async_supabase_client = AsyncPostgrestClient(
+            f"{supabase_url.rstrip('/')}/rest/v1",
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "apikey": supabase_key,
+                "Authorization": f"Bearer {supabase_key}",
+            },
+            http_client=_http_client,
+        )
+    return _async_supabase_client
+
+async def execute(query):
+    """run a built query, waiting for a free slot when SUPABASE_MAX_CONCURRENCY queries are in flight"""
+    global _query_limiter
+    if SUPABASE_MAX_CONCURRENCY <= 0:
+        return await query.execute()
+    _bind_running_loop()
+    if _query_limiter is None:
+        _query_limiter = asyncio.Semaphore(SUPABASE_MAX_CONCURRENCY)
+    async with _query_limiter:
+        return await query.execute()
+
+async def close_async_supabase_client():
+    """close pooled connections (app shutdown)"""
+    global _loop, _http_client, _async_supabase_client, _query_limiter
+    http_client = _http_client
+    _loop, _http_client, _async_supabase_client, _query_limiter = None, None, None, None
+    if http_client is not None:
+        await http_client.aclose()
+
+async def run(op, *args, **kwargs):
+    """run a data-layer operation (api/database_operations.py) on the pooled async client"""
+    try:
+        steps = op(ops.LazyClient(lambda: get_async_supabase_client()), *args, **kwargs)
+        response, error = None, None
+        while True:
+            try:
+                query = steps.throw(error) if error is not None else steps.send(response)
+            except StopIteration as done:
+                return done.value
+            try:
+                response, error = await execute(query), None
+            except Exception as e:
+                response, error = None, e
+    except Exception as e:
+        return ops.failed(op, e, args, kwargs)
+
+def _helper(op):
+    async def helper(*args, **kwargs):
+        return await run(op, *args, **kwargs)
+    return ops.layer_helper(op, helper, __name__)
+
+# ============ USER OPERATIONS ============
+
+create_or_update_user = _helper(ops.create_or_update_user)
+create_or_update_user_by_email = _helper(ops.create_or_update_user_by_email)
+update_user_plan = _helper(ops.update_user_plan)
+update_user_timezone = _helper(ops.update_user_timezone)
+update_user_conversation_id = _helper(ops.update_user_conversation_id)
+save_feedback = _helper(ops.save_feedback)
+
+async def _fetch_user(user_id: int) -> Optional[Dict[str, Any]]:
+    return await run(ops.fetch_user, user_id)
+
+async def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
+    """get user by id (read through the request/process user cache)"""
+    try:
+        return await load_user_async(user_id, lambda: _fetch_user(user_id))
+    except Exception:
+        return None
+
+async def get_user_credits(user_id: int) -> Optional[Dict[str, Any]]:
+    """get user's credit information (read fresh once per request, never from the process cache)"""
+    try:
+        user = await load_user_async(user_id, lambda: _fetch_user(user_id), fresh=True)
+    except Exception:
+        return None
+    return ops.credits_of(user)
+
+async def get_user_conversation_id(user_id: int) -> Optional[str]:
+    """get user's current conversation id (from the cached user row)"""
+    return ops.conversation_id_of(await get_user_by_id(user_id))
+
+# ============ SESSION OPERATIONS ============
+
+create_session = _helper(ops.create_session)
+get_session = _helper(ops.get_session)
+delete_session = _helper(ops.delete_session)
+
+# ============ TASK OPERATIONS ============
+
+create_task = _helper(ops.create_task)
+create_tasks_batch = _helper(ops.create_tasks_batch)
+get_tasks_by_user = _helper(ops.get_tasks_by_user)
+update_task = _helper(ops.update_task)
+delete_task = _helper(ops.delete_task)
+
+# ============ CALENDAR EVENT OPERATIONS ============
+
+create_calendar_event = _helper(ops.create_calendar_event)
+create_calendar_events_batch = _helper(ops.create_calendar_events_batch)
+get_calendar_events = _helper(ops.get_calendar_events)
+update_calendar_event = _helper(ops.update_calendar_event)
+delete_calendar_event = _helper(ops.delete_calendar_event)
+delete_future_calendar_events = _helper(ops.delete_future_calendar_events)
+delete_events_for_tasks = _helper(ops.delete_events_for_tasks)
+apply_calendar_event_changes = _helper(ops.apply_calendar_event_changes)
+get_calendar_version = _helper(ops.get_calendar_version)
+get_calendar_events_updated_since = _helper(ops.get_calendar_events_updated_since)
+get_calendar_event_tombstones = _helper(ops.get_calendar_event_tombstones)
+get_calendar_events_by_task_id = _helper(ops.get_calendar_events_by_task_id)
+
+# ============ EMBEDDING CACHE OPERATIONS ============
+
+get_text_embeddings = _helper(ops.get_text_embeddings)
+save_text_embeddings = _helper(ops.save_text_embeddings)
+get_task_embeddings = _helper(ops.get_task_embeddings)
+save_task_embeddings = _helper(ops.save_task_embeddings)
+
+# ============ SETTINGS OPERATIONS ============
+
+async def _fetch_settings(user_id: int) -> Optional[Dict[str, Any]]:
+    return await run(ops.fetch_settings, user_id)
+
+async def get_settings(user_id: int) -> Optional[Dict[str, Any]]:
+    """get user's settings (read through the per-process settings cache)"""
+    try:
+        return await settings_cache.load_async(user_id, lambda: _fetch_settings(user_id))
+    except Exception:
+        return None
+
+create_or_update_settings = _helper(ops.create_or_update_settings)
+
+# ============ REVIEW SESSION OPERATIONS ============
+
+create_review_sessions_batch = _helper(ops.create_review_sessions_batch)
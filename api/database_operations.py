@@ -0,0 +1,427 @@
+# data-layer operations shared by api/database.py (sync supabase client) and
+# api/database_async.py (pooled async postgrest client)
+# each operation is a generator over a client: it yields built (not yet executed) queries,
+# is sent back their responses and returns the helper's result. the two layers only differ
+# in how a query is executed, so payloads, filters, cache/index hooks and error handling
+# are written once, here
+import copy
+import inspect
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from postgrest.exceptions import APIError
+
+from api.auth.user_cache import known_in_request, note_user_write
+from api.settings.settings_cache import settings_cache
+
+UNIQUE_VIOLATION = "23505"  # postgres error code for a duplicate key
+
+USER_CREDIT_FIELDS = ("subscription_plan", "credits_used", "subscription_status")
+
+
+def operation(error: str, default: Any = None, reraise: bool = False):
+    """mark a generator as a data-layer operation; on failure `error` (formatted with the call's
+    arguments) is printed and `default` returned, or the exception re-raised"""
+    def decorate(op):
+        op.error, op.default, op.reraise = error, default, reraise
+        op.signature = inspect.signature(op)
+        return op
+    return decorate
+
+
+def failed(op, exc: Exception, args: tuple, kwargs: dict):
+    """report a failed operation the way the helpers always have"""
+    arguments = op.signature.bind_partial(None, *args, **kwargs).arguments
+    print(f"{op.error.format(**arguments)}: {exc}")
+    if op.reraise:
+        raise exc
+    return copy.copy(op.default)
+
+
+def layer_helper(op, helper: Callable, module: str) -> Callable:
+    """name, document and sign a layer's runner for `op` like the operation (without its client)"""
+    helper.__name__ = helper.__qualname__ = op.__name__
+    helper.__doc__ = op.__doc__
+    helper.__module__ = module
+    helper.__signature__ = op.signature.replace(parameters=list(op.signature.parameters.values())[1:])
+    return helper
+
+
+class LazyClient:
+    """client handle that is only created when an operation builds its first query"""
+
+    def __init__(self, get_client: Callable[[], Any]):
+        self._get_client = get_client
+
+    def table(self, name: str):
+        return self._get_client().table(name)
+
+
+# ============ HOOKS ============
+
+def invalidate_schedules(user_id: Optional[int] = None, rows: Optional[list] = None):
+    """drop cached scheduling results after a calendar/task/settings write (all users if unknown)"""
+    # imported here: the scheduling package imports the data layer
+    from api.scheduling.result_cache import invalidate_user_schedules
+    user_ids = {user_id} if user_id is not None else {row.get("user_id") for row in rows or []}
+    if not user_ids or None in user_ids:
+        invalidate_user_schedules()
+        return
+    for uid in user_ids:
+        invalidate_user_schedules(uid)
+
+def update_task_index(inserted: Optional[list] = None, deleted: Optional[list] = None):
+    """keep resident per-user task embedding indexes in step with task inserts, title edits and deletes"""
+    # looked up, not imported: the scheduling package imports the data layer, and a
+    # process that never loaded the index module has no resident indexes to update
+    task_index = sys.modules.get("api.scheduling.matching.task_index")
+    if task_index is None:
+        return
+    task_index.task_indexes.apply_writes(inserted=inserted or [], deleted=deleted or [])
+
+def first_row(response) -> Optional[Dict[str, Any]]:
+    return response.data[0] if response.data else None
+
+def credits_of(user: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    return {key: user.get(key) for key in USER_CREDIT_FIELDS} if user else None
+
+def conversation_id_of(user: Optional[Dict[str, Any]]) -> Optional[str]:
+    return (user.get("conversation_id") or None) if user else None
+
+# ============ USER OPERATIONS ============
+
+@operation("Error creating/updating user", reraise=True)
+def create_or_update_user(db, google_user_id: str, email: str, name: str) -> int:
+    """create or update user in database (upsert on email, else on google_user_id), returns user id"""
+    # new users get the free plan from column defaults, existing users keep theirs
+    user_data = {"google_user_id": google_user_id, "email": email, "name": name}
+    try:
+        # google verifies the address, so an email-only (NextAuth) row is the same account: link it
+        response = yield db.table("users").upsert(user_data, on_conflict="email")
+    except APIError as e:
+        if e.code != UNIQUE_VIOLATION:
+            raise
+        # the google account is already linked to another row: its email changed, move it
+        response = yield db.table("users").upsert(user_data, on_conflict="google_user_id")
+    note_user_write(response.data[0]["id"])
+    return response.data[0]["id"]
+
+@operation("Error getting user", reraise=True)
+def fetch_user(db, user_id: int) -> Optional[Dict[str, Any]]:
+    """get user row by id (uncached)"""
+    return first_row((yield db.table("users").select("*").eq("id", user_id)))
+
+@operation("Error creating/updating user by email", reraise=True)
+def create_or_update_user_by_email(db, email: str, name: Optional[str] = None) -> int:
+    """create or update user by email (for NextAuth integration, one upsert on email), returns user id"""
+    # without a name the upsert only matches the row; new users are named by a db trigger
+    user_data = {"email": email, "name": name} if name else {"email": email}
+    response = yield db.table("users").upsert(user_data, on_conflict="email")
+    note_user_write(response.data[0]["id"])
+    return response.data[0]["id"]
+
+@operation("Error updating user plan", default=False)
+def update_user_plan(db, user_id: int, plan_type: str) -> bool:
+    """update user's subscription plan"""
+    yield db.table("users").update({
+        "subscription_plan": plan_type
+    }).eq("id", user_id)
+    note_user_write(user_id, {"subscription_plan": plan_type})
+    return True
+
+@operation("Error updating timezone", default=False)
+def update_user_timezone(db, user_id: int, timezone: str) -> bool:
+    """update user's timezone"""
+    yield db.table("users").update({
+        "timezone": timezone
+    }).eq("id", user_id)
+    note_user_write(user_id, {"timezone": timezone})
+    return True
+
+@operation("Error updating conversation id", default=False)
+def update_user_conversation_id(db, user_id: int, conversation_id: str) -> bool:
+    """update user's current conversation id (skipped when this request already has it)"""
+    fields = {"conversation_id": conversation_id}
+    if known_in_request(user_id, fields):
+        return True
+    # recorded before the write so parallel intents saving the same id skip theirs
+    note_user_write(user_id, fields)
+    try:
+        yield db.table("users").update(fields).eq("id", user_id)
+    except Exception:
+        note_user_write(user_id)
+        raise
+    note_user_write(user_id, fields)  # again: drops a row re-read while the write was in flight
+    return True
+
+@operation("Error saving feedback", default=False)
+def save_feedback(db, message: str, email: Optional[str] = None, user_id: Optional[int] = None) -> bool:
+    """persist feedback submissions"""
+    yield db.table("feedback").insert({
+        "user_id": user_id,
+        "message": message,
+        "email": email
+    })
+    return True
+
+# ============ SESSION OPERATIONS ============
+
+@operation("Error creating session", default=False)
+def create_session(db, session_id: str, credentials: Dict[str, Any]) -> bool:
+    """create or update session in database (one upsert on session_id)"""
+    yield db.table("sessions").upsert({
+        "session_id": session_id,
+        "credentials": credentials
+    }, on_conflict="session_id")
+    return True
+
+@operation("Error getting session")
+def get_session(db, session_id: str) -> Optional[Dict[str, Any]]:
+    """get session by id"""
+    return first_row((yield db.table("sessions").select("*").eq("session_id", session_id)))
+
+@operation("Error deleting session", default=False)
+def delete_session(db, session_id: str) -> bool:
+    """delete session from database"""
+    yield db.table("sessions").delete().eq("session_id", session_id)
+    return True
+
+# ============ TASK OPERATIONS ============
+
+@operation("Error creating task")
+def create_task(db, task_data: Dict[str, Any]) -> Optional[int]:
+    """create new task, returns task id"""
+    response = yield db.table("tasks").insert(task_data)
+    invalidate_schedules(task_data.get("user_id"))
+    update_task_index(inserted=response.data)
+    return response.data[0]["id"] if response.data else None
+
+@operation("Error creating tasks batch", default=[])
+def create_tasks_batch(db, tasks_data: list[Dict[str, Any]]) -> list[int]:
+    """create multiple tasks in one go, returns list of task ids"""
+    if not tasks_data:
+        return []
+    response = yield db.table("tasks").insert(tasks_data)
+    invalidate_schedules(rows=tasks_data)
+    update_task_index(inserted=response.data)
+    return [task["id"] for task in response.data] if response.data else []
+
+@operation("Error getting tasks", default=[])
+def get_tasks_by_user(db, user_id: int) -> list[Dict[str, Any]]:
+    """get all tasks for user"""
+    response = yield db.table("tasks").select("*").eq("user_id", user_id)
+    return response.data
+
+@operation("Error updating task", default=False)
+def update_task(db, task_id: int, task_data: Dict[str, Any]) -> bool:
+    """update task"""
+    response = yield db.table("tasks").update(task_data).eq("id", task_id)
+    invalidate_schedules(rows=response.data)
+    if "title" in task_data:
+        update_task_index(inserted=response.data)
+    return True
+
+@operation("Error deleting task", default=False)
+def delete_task(db, task_id: int) -> bool:
+    """delete task"""
+    response = yield db.table("tasks").delete().eq("id", task_id)
+    invalidate_schedules(rows=response.data)
+    update_task_index(deleted=response.data)
+    return True
+
+# ============ CALENDAR EVENT OPERATIONS ============
+
+@operation("Error creating calendar event")
+def create_calendar_event(db, event_data: Dict[str, Any]) -> Optional[int]:
+    """create calendar event, returns event id"""
+    response = yield db.table("calendar_events").insert(event_data)
+    invalidate_schedules(event_data.get("user_id"))
+    return response.data[0]["id"] if response.data else None
+
+@operation("Error creating calendar events batch", default=[])
+def create_calendar_events_batch(db, events_data: list[Dict[str, Any]]) -> list[int]:
+    """create multiple calendar events in one go, returns list of event ids"""
+    if not events_data:
+        return []
+    response = yield db.table("calendar_events").insert(events_data)
+    invalidate_schedules(rows=events_data)
+    return [event["id"] for event in response.data] if response.data else []
+
+@operation("Error getting calendar events", default=[])
+def get_calendar_events(db, user_id: int) -> list[Dict[str, Any]]:
+    """get all calendar events for user"""
+    response = yield db.table("calendar_events").select("*").eq("user_id", user_id)
+    return response.data
+
+@operation("Error updating calendar event", default=False)
+def update_calendar_event(db, event_id: int, event_data: Dict[str, Any]) -> bool:
+    """update calendar event"""
+    response = yield db.table("calendar_events").update(event_data).eq("id", event_id)
+    invalidate_schedules(rows=response.data)
+    return True
+
+@operation("Error deleting calendar event", default=False)
+def delete_calendar_event(db, event_id: int) -> bool:
+    """delete calendar event"""
+    response = yield db.table("calendar_events").delete().eq("id", event_id)
+    invalidate_schedules(rows=response.data)
+    return True
+
+@operation("Error deleting future calendar events", default=False)
+def delete_future_calendar_events(db, user_id: int) -> bool:
+    """delete all future calendar events for user (from now onwards)"""
+    now = datetime.now(timezone.utc).isoformat()
+    yield db.table("calendar_events").delete().eq("user_id", user_id).gte("start_time", now)
+    invalidate_schedules(user_id)
+    return True
+
+@operation("Error deleting events for tasks {task_ids}", default=False)
+def delete_events_for_tasks(db, user_id: int, task_ids: list[int]) -> bool:
+    """
+    Delete calendar events for specific tasks only (surgical deletion).
+    Only deletes future events (from now onwards).
+
+    Args:
+        user_id: User ID to ensure security
+        task_ids: List of task IDs whose events should be deleted
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    yield db.table("calendar_events") \
+        .delete() \
+        .eq("user_id", user_id) \
+        .in_("task_id", task_ids) \
+        .gte("start_time", now)
+    invalidate_schedules(user_id)
+    return True
+
+@operation("Error applying calendar event changes", default=False)
+def apply_calendar_event_changes(
+    db,
+    user_id: int,
+    inserts: list[Dict[str, Any]],
+    updates: list[Dict[str, Any]],
+    delete_ids: list[int]
+) -> bool:
+    """
+    Apply a schedule diff in at most three batched calls (delete, update, insert).
+
+    Args:
+        user_id: User ID to ensure security on deletes
+        inserts: New event payloads
+        updates: Full event payloads including "id" (rewritten in place, ids stay stable)
+        delete_ids: IDs of events to remove
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if delete_ids:
+        yield db.table("calendar_events") \
+            .delete() \
+            .eq("user_id", user_id) \
+            .in_("id", delete_ids)
+    if updates:
+        yield db.table("calendar_events").upsert(updates, on_conflict="id")
+    if inserts:
+        yield db.table("calendar_events").insert(inserts)
+    invalidate_schedules(user_id)
+    return True
+
+@operation("Error getting calendar version")
+def get_calendar_version(db, user_id: int) -> Optional[int]:
+    """get user's calendar version (bumped by a trigger on every calendar_events write), None if unavailable"""
+    response = yield db.table("users").select("calendar_version").eq("id", user_id)
+    if not response.data or response.data[0].get("calendar_version") is None:
+        return None
+    return int(response.data[0]["calendar_version"])
+
+@operation("Error getting calendar event changes")
+def get_calendar_events_updated_since(db, user_id: int, since: str) -> Optional[list[Dict[str, Any]]]:
+    """get user's calendar events created or updated after `since` (ISO timestamp), oldest change first; None on error"""
+    response = yield db.table("calendar_events") \
+        .select("*") \
+        .eq("user_id", user_id) \
+        .gt("updated_at", since) \
+        .order("updated_at")
+    return response.data
+
+@operation("Error getting calendar event tombstones")
+def get_calendar_event_tombstones(db, user_id: int, since: str) -> Optional[list[Dict[str, Any]]]:
+    """get (event_id, deleted_at) tombstones for user's calendar events deleted after `since`; None on error"""
+    response = yield db.table("calendar_event_tombstones") \
+        .select("event_id, deleted_at") \
+        .eq("user_id", user_id) \
+        .gt("deleted_at", since) \
+        .order("deleted_at")
+    return response.data
+
+@operation("Error getting calendar events by task_id", default=[])
+def get_calendar_events_by_task_id(db, task_id: int) -> list[Dict[str, Any]]:
+    """get all calendar events linked to a specific task"""
+    response = yield db.table("calendar_events").select("*").eq("task_id", task_id)
+    return response.data
+
+# ============ EMBEDDING CACHE OPERATIONS ============
+
+@operation("Error getting text embeddings", default={})
+def get_text_embeddings(db, content_hashes: list[str]) -> Dict[str, list[float]]:
+    """get cached embeddings by content hash, returns {content_hash: embedding} for the ones found"""
+    if not content_hashes:
+        return {}
+    response = yield db.table("text_embeddings") \
+        .select("content_hash, embedding") \
+        .in_("content_hash", content_hashes)
+    return {row["content_hash"]: row["embedding"] for row in response.data or []}
+
+@operation("Error saving text embeddings", default=False)
+def save_text_embeddings(db, rows: list[Dict[str, Any]]) -> bool:
+    """store embeddings ({content_hash, model, embedding}); rows already cached are left as they are"""
+    if not rows:
+        return True
+    yield db.table("text_embeddings").upsert(rows, on_conflict="content_hash", ignore_duplicates=True)
+    return True
+
+@operation("Error getting task embeddings", default=[])
+def get_task_embeddings(db, user_id: int, model: str) -> list[Dict[str, Any]]:
+    """get user's stored task title vectors (task_id, content_hash, embedding) for one embedding model"""
+    response = yield db.table("task_embeddings") \
+        .select("task_id, content_hash, embedding") \
+        .eq("user_id", user_id) \
+        .eq("model", model)
+    return response.data or []
+
+@operation("Error saving task embeddings", default=False)
+def save_task_embeddings(db, rows: list[Dict[str, Any]]) -> bool:
+    """store task title vectors ({task_id, user_id, model, content_hash, embedding}), replacing a task's old vector"""
+    if not rows:
+        return True
+    yield db.table("task_embeddings").upsert(rows, on_conflict="task_id")
+    return True
+
+# ============ SETTINGS OPERATIONS ============
+
+@operation("Error getting settings", reraise=True)
+def fetch_settings(db, user_id: int) -> Optional[Dict[str, Any]]:
+    """get user's settings row (uncached)"""
+    return first_row((yield db.table("settings").select("*").eq("user_id", user_id)))
+
+@operation("Error creating/updating settings", default=False)
+def create_or_update_settings(db, user_id: int, settings_data: Dict[str, Any]) -> bool:
+    """create or update settings (one upsert on user_id)"""
+    yield db.table("settings").upsert({**settings_data, "user_id": user_id}, on_conflict="user_id")
+    settings_cache.invalidate(user_id)
+    invalidate_schedules(user_id)
+    return True
+
+# ============ REVIEW SESSION OPERATIONS ============
+
+@operation("Error creating review sessions batch", default=[])
+def create_review_sessions_batch(db, sessions_data: list[Dict[str, Any]]) -> list[str]:
+    """create multiple review sessions, returns list of session ids"""
+    if not sessions_data:
+        return []
+    response = yield db.table("review_sessions").insert(sessions_data)
+    return [session["id"] for session in response.data] if response.data else []
@@ -3,7 +3,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
-from api.database import save_feedback
+from api.database_async import save_feedback
 
 router = APIRouter()
 
@@ -20,7 +20,7 @@ async def submit_feedback(request: FeedbackRequest):
     if not message:
         raise HTTPException(status_code=400, detail="Feedback message cannot be empty")
 
-    success = save_feedback(message, request.email, request.user_id)
+    success = await save_feedback(message, request.email, request.user_id)
     if not success:
         raise HTTPException(status_code=500, detail="Unable to store feedback")
 
@@ -0,0 +1,54 @@
+# shared outbound http session (OpenAI and other JSON APIs)
+# one aiohttp.ClientSession per worker: keep-alive connections are reused across
+# calls instead of paying a TCP + TLS handshake per request. created in the
+# FastAPI lifespan (api/main.py) and closed on shutdown; built lazily when used
+# outside the app (scripts, tests).
+import asyncio
+import os
+import ssl
+from typing import Optional
+
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# connection pool configuration (per worker process)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))  # max open connections, 0 = unlimited
+HTTP_POOL_SIZE_PER_HOST = int(os.getenv("HTTP_POOL_SIZE_PER_HOST", "20"))  # per host, 0 = unlimited
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))  # idle connection lifetime
+HTTP_DNS_CACHE_SECONDS = int(os.getenv("HTTP_DNS_CACHE_SECONDS", "300"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "120"))  # default per call, callers may override
+
+# like the async supabase pool, the session belongs to the event loop that opened it
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_http_session: Optional[aiohttp.ClientSession] = None
+
+def new_http_session() -> aiohttp.ClientSession:
+    """Build a session with the configured pool (call from a coroutine)"""
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_SIZE_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+        ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+        ssl=ssl.create_default_context(),  # honours SSL_CERT_FILE at creation time
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS),
+    )
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get or create the shared session for the running event loop"""
+    global _loop, _http_session
+    loop = asyncio.get_running_loop()
+    if loop is not _loop or _http_session is None or _http_session.closed:
+        _loop, _http_session = loop, new_http_session()
+    return _http_session
+
+async def close_http_session():
+    """Close the shared session (FastAPI shutdown)"""
+    global _loop, _http_session
+    if _http_session is not None and not _http_session.closed and _loop is asyncio.get_running_loop():
+        await _http_session.close()
+    _loop, _http_session = None, None
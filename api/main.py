@@ -2,6 +2,7 @@
 
 import logging
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,11 +17,32 @@ logging.basicConfig(
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one keep-alive http session per worker for outbound API calls (OpenAI)
+    from api.http_session import get_http_session, close_http_session
+    get_http_session()
+    # intent vectors persisted by an earlier worker/deploy (no embedding calls on first chat)
+    from api.scheduling.matching.intent_classifier import intent_examples, load_intent_vectors
+    from api.scheduling.matching.local_intent import get_local_model
+    load_intent_vectors()
+    # local intent model (TF-IDF over examples + logged utterances) is trained before serving
+    get_local_model(intent_examples)
+    yield
+    # shut down shared worker pools, pooled database and http connections
+    from api.scheduling.scheduler import shutdown_scheduler_executor
+    from api.database_async import close_async_supabase_client
+    shutdown_scheduler_executor()
+    await close_async_supabase_client()
+    await close_http_session()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Todo API",
     description="API for managing todos from Gmail with smart scheduling",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -56,6 +78,22 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+def metrics():
+    # in-process cache counters (per worker)
+    from api.scheduling.result_cache import schedule_cache
+    from api.settings.settings_cache import settings_cache
+    from api.auth.user_cache import user_cache
+    from api.scheduling.matching.intent_classifier import classification_counts
+    from api.scheduling.matching.embedding_cache import embedding_counts
+    return {
+        "schedule_cache": schedule_cache.stats(),
+        "settings_cache": settings_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "intent_classifier": dict(classification_counts),
+        "task_embeddings": dict(embedding_counts)
+    }
+
 @app.get("/favicon.ico")
 def favicon():
     # return 204 No Content to prevent 404 errors
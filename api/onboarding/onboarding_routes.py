@@ -3,8 +3,8 @@ from pydantic import BaseModel
 from typing import List, Optional
 import json
 from api.scheduling.agent import run_agent
-from api.settings.settings_routes import SettingsRequest, get_settings
-from api.database import create_or_update_settings
+from api.settings.settings_routes import SettingsRequest
+from api.database_async import get_settings, create_or_update_settings
 
 router = APIRouter()
 
@@ -24,7 +24,7 @@ async def get_onboarding_status(user_id: int = Query(...)):
     Check if the user has completed the onboarding process.
     """
     try:
-        settings = get_settings(user_id)
+        settings = await get_settings(user_id)
         return {"onboarding_completed": settings.get("onboarding_completed", False)}
     except Exception as e:
         # If user has no settings, assume onboarding is not complete
@@ -53,7 +53,7 @@ async def submit_onboarding(
         # Ensure energy_levels is handled correctly (it should be a JSON string from the frontend/request model)
         # The EnergyProfileRequest defines it as str, so we pass it as is.
         
-        success = create_or_update_settings(user_id, profile_data)
+        success = await create_or_update_settings(user_id, profile_data)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save preferences")
 
@@ -74,7 +74,7 @@ async def submit_onboarding(
             profile_data["subjects"] = list(new_subjects)
             
             # Update settings again with subjects
-            create_or_update_settings(user_id, profile_data)
+            await create_or_update_settings(user_id, profile_data)
 
         # 3. Construct prompt for AI Agent
         subjects_str = ", ".join(request.subjects) if request.subjects else "No specific subjects provided"
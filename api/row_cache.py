@@ -0,0 +1,178 @@
+"""
+Per-process read-through cache for database rows keyed by id.
+
+Rows live for a short TTL in an LRU; writers invalidate the rows they change.
+Concurrent misses for the same key share one fetch (singleflight): the first
+caller fetches, everyone else waits for its result. A fetch that started
+before an invalidation doesn't store its (possibly stale) row. Failed fetches
+are not cached.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+Row = Optional[dict]
+
+
+def _copy(row: Row) -> Row:
+    return dict(row) if row is not None else None
+
+
+class _Fetch:
+    """A leader's fetch in progress; invalidate() marks it stale so its row isn't stored."""
+
+    __slots__ = ("stale",)
+
+    def __init__(self):
+        self.stale = False
+
+
+class RowCache:
+    """Thread-safe LRU + TTL cache of rows by key (None = no row) with singleflight loads."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, row)
+        self._fetches: Dict[Hashable, List[_Fetch]] = {}  # key -> leader fetches in progress
+        self._inflight: Dict[Hashable, Future] = {}
+        self._inflight_async: Dict[tuple, asyncio.Future] = {}  # (event loop, key) -> future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _lookup(self, key: Hashable):
+        """(hit, row) under the lock; counts the hit."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= self._clock():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def _start_fetch(self, key: Hashable) -> _Fetch:
+        """Register a leader's fetch under the lock."""
+        fetch = _Fetch()
+        self._fetches.setdefault(key, []).append(fetch)
+        return fetch
+
+    def _end_fetch(self, key: Hashable, fetch: _Fetch):
+        """Unregister a finished fetch under the lock; keys without one leave no trace."""
+        fetches = self._fetches[key]
+        fetches.remove(fetch)
+        if not fetches:
+            del self._fetches[key]
+
+    def _store(self, key: Hashable, row: Row, fetch: _Fetch):
+        with self._lock:
+            if fetch.stale:
+                return  # invalidated while fetching
+            self._entries[key] = (self._clock() + self.ttl_seconds, _copy(row))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def load(self, key: Hashable, fetch: Callable[[], Row]) -> Row:
+        """Cached row for key, else fetch() it once for all concurrent callers (threads)."""
+        if not self.enabled:
+            return fetch()
+        with self._lock:
+            hit, row = self._lookup(key)
+            if hit:
+                return _copy(row)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+                fetching = self._start_fetch(key)
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return _copy(flight.result())
+        try:
+            row = fetch()
+            self._store(key, row, fetching)
+            flight.set_result(row)
+            return _copy(row)
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._end_fetch(key, fetching)
+
+    async def load_async(self, key: Hashable, fetch: Callable[[], Awaitable[Row]]) -> Row:
+        """Async load: concurrent misses on the same event loop await one fetch()."""
+        if not self.enabled:
+            return await fetch()
+        flight_key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            hit, row = self._lookup(key)
+            if hit:
+                return _copy(row)
+            flight = self._inflight_async.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight_async[flight_key] = flight_key[0].create_future()
+                fetching = self._start_fetch(key)
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return _copy(await asyncio.shield(flight))
+        try:
+            row = await fetch()
+            self._store(key, row, fetching)
+            flight.set_result(row)
+            return _copy(row)
+        except BaseException as e:
+            flight.set_exception(e)
+            flight.exception()  # retrieved: followers re-raise it, no "never retrieved" warning
+            raise
+        finally:
+            with self._lock:
+                self._inflight_async.pop(flight_key, None)
+                self._end_fetch(key, fetching)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop the row for key (every row when key is None)."""
+        with self._lock:
+            if key is None:
+                fetches = [fetch for key_fetches in self._fetches.values() for fetch in key_fetches]
+                self._entries.clear()
+            else:
+                fetches = self._fetches.get(key, ())
+                self._entries.pop(key, None)
+            for fetch in fetches:
+                fetch.stale = True
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "invalidations": self.invalidations,
+            }
@@ -13,6 +13,7 @@ from api.scheduling.agent_actions.utils import chatgpt_call
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 from api.timezone.conversions import resolve_user_timezone, now_in_timezone
+from api.auth.user_cache import user_request_scope
 
 # matching
 from api.scheduling.matching.intent_classifier import classify_intent
@@ -102,9 +103,10 @@ async def run_agent(user_input):
         extra={"user_id": user_input.get("user_id"), "task_count": len(tasks)},
     )
 
-    # Run all tasks concurrently
+    # Run all tasks concurrently; they share one users row lookup (timezone, conversation id)
     try:
-        results = await asyncio.gather(*tasks)
+        with user_request_scope():
+            results = await asyncio.gather(*tasks)
     except Exception:
         logger.exception("Agent task execution failed", extra={"user_id": user_input.get("user_id")})
         raise
@@ -1,12 +1,11 @@
 """Direct calendar event creation action (no task decomposition)."""
 
-import asyncio
 import logging
 from datetime import datetime
 
-from api.database import get_calendar_events, create_calendar_event
+from api.database_async import get_calendar_events, create_calendar_event
 from api.data_types.consts import CREATE_EVENT_DEV_PROMPT, EVENT_EXTRACTION_SCHEMA
-from api.timezone.conversions import resolve_user_timezone, now_in_timezone
+from api.timezone.conversions import resolve_user_timezone_async, now_in_timezone
 from api.scheduling.agent_actions.utils import ensure_mapping
 
 logger = logging.getLogger(__name__)
@@ -16,7 +15,7 @@ async def create_calendar_event_direct(user_input, chatgpt_call):
     """Simple calendar event creation without task decomposition."""
     user_id = user_input.get("user_id")
     base_text = user_input.get("text", "")
-    tz_name = resolve_user_timezone(user_id)
+    tz_name = await resolve_user_timezone_async(user_id)
     local_now = now_in_timezone(tz_name)
     
     # Enrich input with timezone and datetime context
@@ -58,7 +57,7 @@ async def create_calendar_event_direct(user_input, chatgpt_call):
     start_time = event_data.get("start_time")
     end_time = event_data.get("end_time")
     
-    calendar_events = await asyncio.to_thread(get_calendar_events, user_id) if user_id else []
+    calendar_events = await get_calendar_events(user_id) if user_id else []
     conflicting_events = []
     
     for event in calendar_events:
@@ -102,7 +101,7 @@ async def create_calendar_event_direct(user_input, chatgpt_call):
     }
     
     try:
-        await asyncio.to_thread(create_calendar_event, event_payload)
+        await create_calendar_event(event_payload)
         return {
             "text": f"✓ Created event: {event_payload['title']} from {start_time} to {end_time}"
         }
@@ -1,8 +1,6 @@
 """Update user preferences action."""
 
-import asyncio
-
-from api.database import get_settings, create_or_update_settings
+from api.database_async import get_settings, create_or_update_settings
 from api.data_types.consts import UPDATE_PREFERENCES_DEV_PROMPT, PREFERENCE_UPDATES_SCHEMA
 from api.scheduling.agent_actions.utils import ensure_mapping
 
@@ -13,7 +11,7 @@ async def update_preferences(user_input, chatgpt_call):
     base_text = user_input.get("text", "")
 
     # get current settings for context
-    current_settings = await asyncio.to_thread(get_settings, user_id) if user_id else None
+    current_settings = await get_settings(user_id) if user_id else None
 
     # enrich input with current settings
     user_input_enriched = user_input.copy()
@@ -35,7 +33,7 @@ async def update_preferences(user_input, chatgpt_call):
     if updates and any(v is not None for k, v in updates.items() if k != "user_id"):
         # remove user_id from updates dict before passing to db
         settings_data = {k: v for k, v in updates.items() if k != "user_id" and v is not None}
-        await asyncio.to_thread(create_or_update_settings, user_id, settings_data)
+        await create_or_update_settings(user_id, settings_data)
 
         return {
             "text": "Updated preferences: " + ", ".join(settings_data.keys())
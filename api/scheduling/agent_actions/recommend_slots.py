@@ -1,9 +1,8 @@
 """Recommend time slots action for agent."""
 
-import asyncio
 from datetime import datetime, timezone
 
-from api.database import get_settings, get_calendar_events
+from api.database_async import get_settings, get_calendar_events
 from api.data_types.consts import RECOMMEND_SLOTS_DEV_PROMPT, SLOTS_SCHEMA
 
 
@@ -13,10 +12,10 @@ async def recommend_slots(user_input, chatgpt_call):
     base_text = user_input.get("text", "")
 
     # fetch settings
-    settings = await asyncio.to_thread(get_settings, user_id) if user_id else None
+    settings = await get_settings(user_id) if user_id else None
 
     # fetch calendar events
-    calendar_events = await asyncio.to_thread(get_calendar_events, user_id) if user_id else []
+    calendar_events = await get_calendar_events(user_id) if user_id else []
 
     # get current datetime
     current_datetime = datetime.now(timezone.utc).isoformat()
@@ -1,29 +1,29 @@
 # determines "what" to schedule/reschedule
 
 import asyncio
-import json
 import logging
-from datetime import datetime, timezone, timedelta
-from typing import Any, List, Tuple
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-import numpy as np
-
-from api.database import (
-    get_tasks_by_user,
-    get_settings,
+from api.database_async import (
     create_tasks_batch,
-    create_calendar_events_batch,
-    delete_future_calendar_events,
-    delete_events_for_tasks,
-    get_supabase_client,
+    apply_calendar_event_changes,
 )
 from api.data_types.consts import GET_TASKS_DEV_PROMPT, TASK_SCHEMA
-from api.scheduling.scheduler import schedule_events
+from api.scheduling.context import SchedulingContext, load_scheduling_context, load_scheduling_context_async
+from api.scheduling.feasibility import CapacityIndex, edf_infeasible
+from api.scheduling.incremental import incremental_window, schedule_incremental
+from api.scheduling.schedule_diff import diff_schedule
+from api.scheduling.scheduler import schedule_events_async, compute_free_slots, find_infeasible_tasks, get_scheduler_executor
 from api.timezone.conversions import resolve_user_timezone, now_in_timezone
 from api.scheduling.agent_actions.utils import build_task_payload, standardize_existing_task, sanitize_event_payload
 
 logger = logging.getLogger(__name__)
 
+# Try the incremental (affected-days only) strategy before horizon-wide ones
+INCREMENTAL_SCHEDULING = os.getenv("SCHEDULER_INCREMENTAL", "true").lower() == "true"
+
 # main scheduling action for agent
 async def schedule_tasks_into_calendar(user_input, chatgpt_call):
     
@@ -53,82 +53,105 @@ async def schedule_tasks_into_calendar(user_input, chatgpt_call):
             "text": "I couldn't identify any tasks to schedule from your message. If you meant to create a calendar event at a specific time, please try rephrasing it."
         }
 
-    # 2. insert new tasks into db efficiently
-    await asyncio.to_thread(create_tasks_batch, infered_tasks)
+    user_id = user_input["user_id"]
 
-    # 3. Get existing tasks and determine surgical scheduling strategy
-    all_tasks = await asyncio.to_thread(get_tasks_by_user, user_input["user_id"])
-    existing_tasks = [t for t in all_tasks if t.get("status") != "completed"] 
+    # 2. insert new tasks and load the scheduling context concurrently
+    new_task_ids, context = await asyncio.gather(
+        create_tasks_batch(infered_tasks),
+        load_scheduling_context_async(user_id, extra_tasks=infered_tasks),
+    )
+    if not context.settings:
+        raise ValueError("User settings not found")
+    settings = context.settings
 
-    # Determine minimal rescheduling strategy
-    strategy, tasks_to_reschedule = calculate_scheduling_strategy(existing_tasks, infered_tasks)
+    # New tasks as stored (ids come back in insert order), so their events link to the task rows
+    new_tasks = [{**task, "id": task_id} for task, task_id in zip(infered_tasks, new_task_ids)] or infered_tasks
+    context.include_tasks(new_tasks)
+    new_ids = set(new_task_ids)
+    existing_tasks = [
+        t for t in context.tasks
+        if t.get("status") != "completed" and t.get("id") not in new_ids
+    ]
 
-    # Get settings for scheduling
-    settings = await asyncio.to_thread(get_settings, user_input["user_id"])
-    if not settings:
-        raise ValueError("User settings not found")
-    
-    # Determine scheduling window (now to latest deadline + 1 week buffer)
-    now = datetime.now(timezone.utc)
-    latest_deadline = now + timedelta(days=7)  # Default 1 week window
-    
-    for task in infered_tasks + existing_tasks:
-        deadline = task.get("end_time")
-        if deadline:
-            if isinstance(deadline, str):
-                deadline = datetime.fromisoformat(deadline.replace("Z", "+00:00"))
-            if deadline > latest_deadline:
-                latest_deadline = deadline
+    # 3. Determine minimal rescheduling strategy (CPU only with a context, so off the event loop)
+    loop = asyncio.get_running_loop()
+    strategy, tasks_to_reschedule = await loop.run_in_executor(
+        get_scheduler_executor(), calculate_scheduling_strategy, existing_tasks, new_tasks, context
+    )
+
+    # Scheduling window: now to latest deadline (at least 1 week), computed with the context
+    now = context.now
+    latest_deadline = context.window_end
+    replaced_events = []  # stored future events the new schedule replaces
 
-    if strategy == "new_only":
+    if strategy == "incremental":
+        # Common case: place new tasks in the nearest free days, everything else stays frozen
+        logger.info(f"Scheduling strategy: incremental - placing {len(new_tasks)} new tasks in the nearest free days")
+        tasks_to_schedule = new_tasks
+
+    elif strategy == "new_only":
         # Best case: just schedule new tasks in gaps
-        logger.info(f"Scheduling strategy: new_only - scheduling {len(infered_tasks)} new tasks")
-        schedule = await schedule_events(
-            user_input["user_id"],
-            infered_tasks,
-            now,
-            latest_deadline,
-            settings
-        )
-        
+        logger.info(f"Scheduling strategy: new_only - scheduling {len(new_tasks)} new tasks")
+        tasks_to_schedule = new_tasks
+
     elif strategy == "partial":
         # Surgical reschedule: only specific tasks
-        logger.info(f"Scheduling strategy: partial - rescheduling {len(tasks_to_reschedule)} tasks + {len(infered_tasks)} new tasks")
-        
-        # Delete events for tasks being rescheduled
+        logger.info(f"Scheduling strategy: partial - rescheduling {len(tasks_to_reschedule)} tasks + {len(new_tasks)} new tasks")
+
+        # Free the time held by events of tasks being rescheduled
         task_ids_to_reschedule = [t["id"] for t in tasks_to_reschedule if "id" in t]
         if task_ids_to_reschedule:
-            await asyncio.to_thread(delete_events_for_tasks, user_input["user_id"], task_ids_to_reschedule)
-        
+            replaced_events = context.forget_events(task_ids_to_reschedule)
+
         # Reschedule only those tasks + new tasks
-        schedule = await schedule_events(
-            user_input["user_id"],
-            tasks_to_reschedule + infered_tasks,
-            now,
-            latest_deadline,
-            settings
-        )
-        
+        tasks_to_schedule = tasks_to_reschedule + new_tasks
+
     else:  # strategy == "full"
         # Worst case: reschedule everything (unavoidable)
-        logger.warning(f"Scheduling strategy: full - rescheduling all {len(existing_tasks)} existing + {len(infered_tasks)} new tasks")
-        await asyncio.to_thread(delete_future_calendar_events, user_input["user_id"])
-        schedule = await schedule_events(
-            user_input["user_id"],
-            existing_tasks + infered_tasks,
-            now,
-            latest_deadline,
-            settings
+        logger.warning(f"Scheduling strategy: full - rescheduling all {len(existing_tasks)} existing + {len(new_tasks)} new tasks")
+        replaced_events = context.forget_events()
+        tasks_to_schedule = existing_tasks + new_tasks
+
+    # Report work that can't meet its deadline up front (earliest-deadline-first check)
+    infeasible = await loop.run_in_executor(
+        get_scheduler_executor(),
+        find_infeasible_tasks,
+        tasks_to_schedule,
+        now,
+        latest_deadline,
+        context.snapshot(now, latest_deadline, settings)
+    )
+    if infeasible:
+        logger.warning(f"{len(infeasible)} tasks cannot meet their deadlines: {[t.get('id') for t in infeasible]}")
+
+    schedule = None
+    if strategy == "incremental":
+        schedule = await loop.run_in_executor(
+            get_scheduler_executor(), schedule_incremental, user_id, tasks_to_schedule, context, settings
         )
+        if schedule is None:
+            logger.info("Incremental schedule did not fit, scheduling over the full window")
+    if schedule is None:
+        schedule = await schedule_events_async(user_id, tasks_to_schedule, now, latest_deadline, settings, context)
 
-    # 4. insert calendar events efficiently
-    await asyncio.to_thread(create_calendar_events_batch, schedule)
+    # 4. write only what changed: matching events stay, moved ones keep their ids, the rest is batched
+    diff = diff_schedule(replaced_events, schedule)
+    logger.info(
+        f"Schedule diff: {len(diff.unchanged)} unchanged, {len(diff.updates)} updated, "
+        f"{len(diff.inserts)} inserted, {len(diff.deletes)} deleted"
+    )
+    if not diff.is_empty:
+        await apply_calendar_event_changes(user_id, diff.inserts, diff.updates, diff.deletes)
 
     # 5. natural language return
     descriptions = [event.get("description") or event.get("title", "task") for event in schedule]
+    text = "Scheduled " + ", ".join(descriptions)
+    if infeasible:
+        late = [t.get("description") or t.get("title", "task") for t in infeasible]
+        text += ". Not enough free time to finish before the deadline: " + ", ".join(late)
 
     return {
-        "text": "Scheduled " + ", ".join(descriptions)
+        "text": text
     }
 
 
@@ -162,7 +185,8 @@ def get_overdue_tasks(existing_tasks: List[dict], now: datetime) -> List[dict]:
 def identify_blocking_tasks_by_importance(
     existing_tasks: List[dict],
     additional_hours_needed: float,
-    now: datetime
+    now: datetime,
+    capacity: Optional[CapacityIndex] = None
 ) -> List[dict]:
     """
     Identify minimal set of existing tasks to reschedule using hybrid importance scoring.
@@ -171,10 +195,15 @@ def identify_blocking_tasks_by_importance(
     - task_importance = (priority_weight × 0.6) + (deadline_urgency × 0.4)
     - Lower importance = more likely to be rescheduled
     
+    With a capacity index, urgency is measured in free hours left before the
+    deadline instead of wall-clock hours, so a task due in three days with a
+    fully booked calendar counts as urgent.
+    
     Args:
         existing_tasks: Currently scheduled tasks
         additional_hours_needed: How many more hours we need to free up
         now: Current datetime for urgency calculation
+        capacity: Free time from now (deadlines past its end fall back to wall-clock hours)
         
     Returns:
         List of tasks to reschedule (lowest importance first)
@@ -195,7 +224,11 @@ def identify_blocking_tasks_by_importance(
             if isinstance(deadline, str):
                 deadline = datetime.fromisoformat(deadline.replace("Z", "+00:00"))
             
-            hours_until = (deadline - now).total_seconds() / 3600
+            if capacity is not None and capacity.covers(deadline):
+                # Free hours scaled to wall-clock hours (16 waking hours per 24)
+                hours_until = capacity.hours_before(deadline) * 24 / 16
+            else:
+                hours_until = (deadline - now).total_seconds() / 3600
             if hours_until < 24:
                 urgency_score = 3  # Very urgent
             elif hours_until < 72:
@@ -227,7 +260,11 @@ def identify_blocking_tasks_by_importance(
     return blocking_tasks
 
 
-def calculate_scheduling_strategy(existing_tasks: List[dict], new_tasks: List[dict]) -> Tuple[str, List[dict]]:
+def calculate_scheduling_strategy(
+    existing_tasks: List[dict],
+    new_tasks: List[dict],
+    context: Optional[SchedulingContext] = None
+) -> Tuple[str, List[dict]]:
     """
     Determines the minimal set of tasks that need rescheduling.
     
@@ -236,10 +273,11 @@ def calculate_scheduling_strategy(existing_tasks: List[dict], new_tasks: List[di
     Args:
         existing_tasks: Currently scheduled tasks (non-completed)
         new_tasks: Newly inferred tasks to be scheduled
+        context: Preloaded SchedulingContext (loaded here if not given)
         
     Returns:
         (strategy, tasks_needing_reschedule) where:
-        - strategy: "new_only" | "partial" | "full"
+        - strategy: "incremental" | "new_only" | "partial" | "full"
         - tasks_needing_reschedule: list of task dicts that need rescheduling
     """
 
@@ -247,17 +285,18 @@ def calculate_scheduling_strategy(existing_tasks: List[dict], new_tasks: List[di
     if not existing_tasks:
         return "new_only", []
     
-    # Get user settings and current time
-    user_id = existing_tasks[0].get("user_id")
-    settings = get_settings(user_id)
-    db = get_supabase_client()
-    now = datetime.now(timezone.utc)
+    # Settings, busy time and current time come from the request's context
+    if context is None:
+        context = load_scheduling_context(existing_tasks[0].get("user_id"), extra_tasks=new_tasks)
+    settings = context.settings
+    now = context.now
     
     # STEP 1: Check for overdue tasks
     overdue = get_overdue_tasks(existing_tasks, now)
     
-    # STEP 2: Find latest deadline among new tasks
+    # STEP 2: Find latest (and earliest) deadline among new tasks
     latest_deadline = None
+    earliest_deadline = None
     for task in new_tasks:
         deadline = task.get("end_time")
         if deadline:
@@ -265,14 +304,24 @@ def calculate_scheduling_strategy(existing_tasks: List[dict], new_tasks: List[di
                 deadline = datetime.fromisoformat(deadline.replace("Z", "+00:00"))
             if not latest_deadline or deadline > latest_deadline:
                 latest_deadline = deadline
+            if not earliest_deadline or deadline < earliest_deadline:
+                earliest_deadline = deadline
+    
+    # Common case: new work fits in the nearest free days, before every new deadline
+    if not overdue and INCREMENTAL_SCHEDULING:
+        hours_needed = sum(t.get("estimated_duration", 0) for t in new_tasks) / 60.0
+        window_end = incremental_window(context, hours_needed)
+        if window_end is not None and (not earliest_deadline or window_end <= earliest_deadline):
+            return "incremental", []
     
     # early return if no deadlines on new tasks, just schedule them
     if not latest_deadline:
         return "partial" if overdue else "new_only", overdue # reschedule overdue
     
-    # STEP 3: Get available empty slots for the whole time range
-    empty_slots = get_empty_time_slots(user_id, now, latest_deadline, settings, db)
-    total_available = sum(dur for _, dur in empty_slots)
+    # STEP 3: Index available empty slots for the whole time range (cumulative free hours)
+    empty_slots = compute_free_slots(context.busy_between(now, latest_deadline), now, latest_deadline, settings)
+    capacity = CapacityIndex(empty_slots, end=latest_deadline)
+    total_available = capacity.total_hours
     
     # STEP 4: Check if new tasks fit in total available time
     total_new_duration = sum(t.get("estimated_duration", 0) for t in new_tasks) / 60.0  # Convert minutes to hours
@@ -287,28 +336,13 @@ def calculate_scheduling_strategy(existing_tasks: List[dict], new_tasks: List[di
             blocking_tasks = identify_blocking_tasks_by_importance(
                 existing_tasks,
                 additional_hours_needed,
-                now
+                now,
+                capacity
             )
             return "partial", blocking_tasks
     
-    # STEP 5: Check each new task individually against its deadline
-    cannot_fit = []
-    for task in new_tasks:
-        deadline = task.get("end_time")
-        if not deadline:
-            continue
-        
-        if isinstance(deadline, str):
-            deadline = datetime.fromisoformat(deadline.replace("Z", "+00:00"))
-        
-        # Calculate available time before this task's deadline
-        available_before = sum(
-            dur for start, dur in empty_slots
-            if start < deadline
-        )
-        
-        if task.get("estimated_duration", 0) / 60.0 > available_before:  # Convert minutes to hours
-            cannot_fit.append(task)
+    # STEP 5: Check new tasks against their deadlines together (earliest deadline first)
+    cannot_fit = edf_infeasible(new_tasks, capacity)
     
     # STEP 6: Determine final strategy
     if overdue or cannot_fit:
@@ -316,92 +350,3 @@ def calculate_scheduling_strategy(existing_tasks: List[dict], new_tasks: List[di
         return "partial", tasks_to_reschedule
     else:
         return "new_only", []
-
-
-def get_empty_time_slots(
-    user_id: int,
-    start_date: datetime,
-    end_date: datetime,
-    settings: dict,
-    db
-) -> List[Tuple[datetime, float]]:
-    """
-    Find empty time slots by treating all calendar events as blocked time.
-    
-    Returns:
-        List of (slot_start_time, duration_hours) tuples
-    """
-    # Get all calendar events (all events are treated as blocking time)
-    now = datetime.now(timezone.utc)
-    response = db.table("calendar_events") \
-        .select("start_time, end_time") \
-        .eq("user_id", user_id) \
-        .gte("start_time", max(now, start_date).isoformat()) \
-        .lte("end_time", end_date.isoformat()) \
-        .order("start_time") \
-        .execute()
-    
-    existing_events = response.data if response.data else []
-    
-    # Convert to datetime objects
-    for event in existing_events:
-        event["start_time"] = datetime.fromisoformat(event["start_time"].replace("Z", "+00:00"))
-        event["end_time"] = datetime.fromisoformat(event["end_time"].replace("Z", "+00:00"))
-    
-    empty_slots = []
-    
-    # Get wake/sleep times with error handling  
-    try:
-        wake_hour, wake_min = map(int, settings.get("wake_time", "07:00").split(":"))
-        sleep_hour, sleep_min = map(int, settings.get("sleep_time", "23:00").split(":"))
-    except (ValueError, AttributeError):
-        wake_hour, wake_min = 7, 0
-        sleep_hour, sleep_min = 23, 0
-        
-    min_study_minutes = settings.get("min_study_duration", 15)
-    
-    # Generate daily slots
-    current_date = max(now, start_date).date()
-    end_date_only = end_date.date()
-    
-    while current_date <= end_date_only:
-        day_start = datetime.combine(current_date, datetime.min.time()).replace(
-            hour=wake_hour, minute=wake_min, tzinfo=timezone.utc
-        )
-        day_end = datetime.combine(current_date, datetime.min.time()).replace(
-            hour=sleep_hour, minute=sleep_min, tzinfo=timezone.utc
-        )
-        
-        # Find gaps for this day
-        day_events = [e for e in existing_events if e["start_time"].date() == current_date]
-        
-        if not day_events:
-            # Entire day available
-            duration_hours = (day_end - day_start).total_seconds() / 3600
-            if duration_hours * 60 >= min_study_minutes:
-                empty_slots.append((day_start, duration_hours))
-        else:
-            # Gap before first event
-            if day_start < day_events[0]["start_time"]:
-                gap_minutes = (day_events[0]["start_time"] - day_start).total_seconds() / 60
-                if gap_minutes >= min_study_minutes:
-                    empty_slots.append((day_start, gap_minutes / 60))
-            
-            # Gaps between consecutive events
-            for i in range(len(day_events) - 1):
-                gap_start = day_events[i]["end_time"]
-                gap_end = day_events[i + 1]["start_time"]
-                gap_minutes = (gap_end - gap_start).total_seconds() / 60
-                
-                if gap_minutes >= min_study_minutes:
-                    empty_slots.append((gap_start, gap_minutes / 60))
-            
-            # Gap after last event
-            if day_events[-1]["end_time"] < day_end:
-                gap_minutes = (day_end - day_events[-1]["end_time"]).total_seconds() / 60
-                if gap_minutes >= min_study_minutes:
-                    empty_slots.append((day_events[-1]["end_time"], gap_minutes / 60))
-        
-        current_date += timedelta(days=1)
-    
-    return empty_slots
\ No newline at end of file
@@ -7,16 +7,23 @@ from typing import Any
 logger = logging.getLogger(__name__)
 
 import os
+import time
 import aiohttp
 from typing import Any, MutableMapping
-from api.database import get_user_conversation_id, update_user_conversation_id
+from api.database import update_user_conversation_id
+from api import database_async
+from api.http_session import get_http_session
 
 UserInput = MutableMapping[str, Any]
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_API_URL = "https://api.openai.com/v1/responses"
+OPENAI_API_URL = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/responses")
 OPENAI_RESPONSES_MODEL = os.getenv("OPENAI_RESPONSES_MODEL", "gpt-5-mini")
 
+# per-call timeouts for chatgpt_call (the shared session's pool is configured in api/http_session.py)
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "120"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "10"))
+
 def _ensure_text_value(text: Any) -> str:
     if isinstance(text, str):
         return text
@@ -25,12 +32,14 @@ def _ensure_text_value(text: Any) -> str:
 def _is_valid_conversation_id(conv_id: str) -> bool:
     return isinstance(conv_id, str) and len(conv_id) > 0
 
-def _save_conversation_id(user_id, data, fallback_id=None):
-    conversation_id = data.get("conversation", {}).get("id")
+async def _save_conversation_id(user_id, data, fallback_id=None):
+    # the write is skipped when the request already has this id (see api/auth/user_cache.py)
+    conversation = data.get("conversation")
+    conversation_id = conversation.get("id") if isinstance(conversation, dict) else conversation
     if conversation_id:
-        update_user_conversation_id(user_id, conversation_id)
+        await database_async.update_user_conversation_id(user_id, conversation_id)
     elif fallback_id:
-        update_user_conversation_id(user_id, fallback_id)
+        await database_async.update_user_conversation_id(user_id, fallback_id)
 
 def _process_file(file_obj):
     """Process file to text, avoiding import issues"""
@@ -53,10 +62,10 @@ async def chatgpt_call(user_input: UserInput, PROMPT, schema_name, SCHEMA):
 
     # get or create conversation id for this user
     user_id = sanitized_input.get("user_id")
-    conversation_id = get_user_conversation_id(user_id) if user_id else None
+    conversation_id = await database_async.get_user_conversation_id(user_id) if user_id else None
     if conversation_id and not _is_valid_conversation_id(conversation_id):
         try:
-            update_user_conversation_id(user_id, None)
+            await database_async.update_user_conversation_id(user_id, None)
         except Exception:
             pass
         conversation_id = None
@@ -101,37 +110,39 @@ async def chatgpt_call(user_input: UserInput, PROMPT, schema_name, SCHEMA):
     if conversation_id:
         payload["conversation"] = conversation_id
     
-    # Make async HTTP request
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            OPENAI_API_URL,
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json=payload
-        ) as resp:
-            if resp.status != 200:
-                error_text = await resp.text()
-                logger.error(
-                    f"OpenAI API error: {resp.status}",
-                    extra={"user_id": user_id, "error": error_text}
-                )
-                raise Exception(f"OpenAI API error {resp.status}: {error_text}")
-            
-            data = await resp.json()
-            
-            # Save conversation ID from response
-            if "conversation" in data and hasattr(data["conversation"], "id"):
-                _save_conversation_id(user_id, data, fallback_id=conversation_id)
-            elif conversation_id:
-                # Use fallback if response doesn't contain conversation
-                update_user_conversation_id(user_id, conversation_id)
-            
-            # Extract output text
-            output_text = data.get("output_text") or data.get("output", [{}])[0].get("content", [{}])[0].get("text", "")
-            
-            return add_user_id(output_text, user_id)
+    # Make async HTTP request on the shared keep-alive session (no handshake per call)
+    started = time.perf_counter()
+    async with get_http_session().post(
+        OPENAI_API_URL,
+        headers={
+            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        json=payload,
+        timeout=aiohttp.ClientTimeout(total=OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS)
+    ) as resp:
+        if resp.status != 200:
+            error_text = await resp.text()
+            logger.error(
+                f"OpenAI API error: {resp.status}",
+                extra={"user_id": user_id, "error": error_text}
+            )
+            raise Exception(f"OpenAI API error {resp.status}: {error_text}")
+
+        data = await resp.json()
+    logger.debug(
+        "OpenAI Responses API call finished",
+        extra={"user_id": user_id, "schema": schema_name, "elapsed_ms": round((time.perf_counter() - started) * 1000)},
+    )
+
+    # Save conversation ID from response (falls back to the one we sent)
+    if user_id:
+        await _save_conversation_id(user_id, data, fallback_id=conversation_id)
+
+    # Extract output text
+    output_text = data.get("output_text") or data.get("output", [{}])[0].get("content", [{}])[0].get("text", "")
+
+    return add_user_id(output_text, user_id)
 
 # helper function for all chatgpt calls
 def save_conversation_id(user_id, response_json):
@@ -0,0 +1,130 @@
+"""
+Minute-resolution availability bitmap for slot discovery.
+
+Alternative to the free/busy sweep for long horizons and heavy calendars:
+- The window is a NumPy boolean array with one cell per `resolution_minutes`
+- Wake/sleep bounds and busy intervals are painted with difference arrays
+  (np.add.at + cumsum), so cost is a few array ops regardless of event count
+- Gaps come out of np.diff run-length extraction, and min_study_duration is a
+  vectorized length filter
+
+Busy intervals block every cell they touch and day windows only keep cells
+that lie fully inside them, so slots never overlap existing events when
+times are not aligned to the resolution.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from api.scheduling.free_busy import DEFAULT_SLEEP, DEFAULT_WAKE, Interval
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _epoch_minutes(dt: datetime) -> int:
+    return int((dt - EPOCH).total_seconds() // 60)
+
+
+def _coverage(length: int, opens: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    """Boolean mask of cells covered by at least one [open, close) index range."""
+    opens = np.clip(opens, 0, length)
+    closes = np.clip(closes, 0, length)
+    keep = closes > opens
+    delta = np.zeros(length + 1, dtype=np.int32)
+    np.add.at(delta, opens[keep], 1)
+    np.add.at(delta, closes[keep], -1)
+    return np.cumsum(delta[:-1]) > 0
+
+
+class AvailabilityBitmap:
+    """Free/busy state of a scheduling window as a boolean array (True = free)."""
+
+    def __init__(
+        self,
+        origin: datetime,
+        free: np.ndarray,
+        resolution_minutes: int = 5,
+        min_study_minutes: float = 15,
+    ):
+        self.origin = origin
+        self.free = free
+        self.resolution_minutes = resolution_minutes
+        self.min_study_minutes = min_study_minutes
+
+    @classmethod
+    def build(
+        cls,
+        busy: Iterable[Interval],
+        window_start: datetime,
+        window_end: datetime,
+        wake: Tuple[int, int] = DEFAULT_WAKE,
+        sleep: Tuple[int, int] = DEFAULT_SLEEP,
+        min_study_minutes: float = 15,
+        resolution_minutes: int = 5,
+    ) -> "AvailabilityBitmap":
+        """
+        Build the bitmap for [window_start, window_end).
+
+        Args:
+            busy: Busy (start, end) intervals, in any order (overlaps are fine)
+            window_start: Earliest time a slot may start (UTC)
+            window_end: Latest time a slot may end (UTC)
+            wake: (hour, minute) the day window opens
+            sleep: (hour, minute) the day window closes; if not after wake, it is on the next day
+            min_study_minutes: Shortest gap reported by free_slots()
+            resolution_minutes: Minutes per cell (1 or 5 are typical)
+        """
+        res = resolution_minutes
+        start_min = _epoch_minutes(window_start)
+        origin_min = -(-start_min // res) * res  # first cell boundary at or after window_start
+        length = max(0, (_epoch_minutes(window_end) - origin_min) // res)
+        origin = EPOCH + timedelta(minutes=origin_min)
+
+        # Day windows: one (open, close) pair per calendar day touching the window
+        wake_offset = wake[0] * 60 + wake[1]
+        sleep_offset = sleep[0] * 60 + sleep[1]
+        if sleep_offset <= wake_offset:
+            sleep_offset += 1440
+        first_day = (origin_min // 1440) - 1
+        last_day = (origin_min + length * res) // 1440
+        day_starts = np.arange(first_day, last_day + 1, dtype=np.int64) * 1440
+        day_open = -(-(day_starts + wake_offset - origin_min) // res)
+        day_close = (day_starts + sleep_offset - origin_min) // res
+        in_day = _coverage(length, day_open, day_close)
+
+        # Busy intervals block every cell they touch
+        intervals = list(busy)
+        if intervals:
+            seconds = np.array([(start.timestamp(), end.timestamp()) for start, end in intervals], dtype=np.float64)
+            busy_open = (np.floor(seconds[:, 0] / 60).astype(np.int64) - origin_min) // res
+            busy_close = -(-(np.ceil(seconds[:, 1] / 60).astype(np.int64) - origin_min) // res)
+            blocked = _coverage(length, busy_open, busy_close)
+            free = in_day & ~blocked
+        else:
+            free = in_day
+
+        return cls(origin, free, res, min_study_minutes)
+
+    def runs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (start_cell, length_in_cells) arrays for every free run long enough to study in."""
+        edges = np.diff(np.concatenate(([0], self.free.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        lengths = np.flatnonzero(edges == -1) - starts
+        long_enough = lengths * self.resolution_minutes >= self.min_study_minutes
+        return starts[long_enough], lengths[long_enough]
+
+    def free_slots(self) -> List[Tuple[datetime, float]]:
+        """
+        Extract free slots in the scheduler's slot format.
+
+        Returns:
+            List of (slot_start_time, duration_hours) tuples in chronological order
+        """
+        starts, lengths = self.runs()
+        res = self.resolution_minutes
+        return [
+            (self.origin + timedelta(minutes=int(start) * res), int(length) * res / 60)
+            for start, length in zip(starts, lengths)
+        ]
@@ -0,0 +1,378 @@
+"""
+Per-request scheduling context.
+
+Loads everything one scheduling request needs in a fixed number of queries:
+- settings (parsed once: JSON fields decoded, energy curve compiled)
+- all of the user's tasks (task map for importance scoring)
+- calendar events overlapping the scheduling horizon (busy intervals)
+- latest review dates for review tasks (only queried when there are any)
+
+Strategy selection and schedule_events then read from the context instead of
+re-querying Supabase for the same rows. load_scheduling_context_async runs the
+same queries concurrently on the pooled async client for async callers.
+With the default client, the settings row is read through the per-process
+settings cache (api/settings/settings_cache.py) like get_settings.
+
+ScheduleSnapshot is the plain-data slice of a context that the pure scheduling
+core (scheduler.solve_schedule) works on: no database handle, no clock.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from api.database import get_supabase_client
+from api.database_async import get_async_supabase_client, execute as execute_async
+from api.scheduling.energy import EnergyCurve
+from api.scheduling.free_busy import Interval, parse_timestamp
+from api.settings.settings_cache import settings_cache
+
+logger = logging.getLogger(__name__)
+
+# Default scheduling horizon when no task has a later deadline
+DEFAULT_HORIZON = timedelta(days=7)
+
+# Settings columns stored as JSON strings by the settings routes
+JSON_SETTINGS_FIELDS = ("energy_levels", "subject_colors")
+
+
+@dataclass(frozen=True)
+class ScheduleSnapshot:
+    """Everything the scheduling algorithm reads, as plain (picklable) data."""
+
+    busy: Tuple[Interval, ...]
+    settings: dict
+    now: datetime
+    tasks_map: Dict[int, dict] = field(default_factory=dict)
+    review_dates: Dict[int, datetime] = field(default_factory=dict)
+    energy: Optional[EnergyCurve] = None
+
+    def energy_curve(self) -> EnergyCurve:
+        return self.energy if self.energy is not None else EnergyCurve(self.settings.get("energy_levels"))
+
+
+@dataclass
+class SchedulingContext:
+    """Snapshot of a user's scheduling inputs, built once per request."""
+
+    user_id: int
+    now: datetime
+    window_end: datetime
+    settings: dict
+    energy: EnergyCurve
+    tasks: List[dict]
+    events: List[dict]  # calendar events overlapping [now, window_end], times parsed
+    review_dates: Dict[int, datetime] = field(default_factory=dict)
+    _event_starts: Optional[List[datetime]] = field(default=None, init=False, repr=False, compare=False)
+    _longest_event: timedelta = field(default=timedelta(0), init=False, repr=False, compare=False)
+
+    @property
+    def tasks_map(self) -> Dict[int, dict]:
+        return {t["id"]: t for t in self.tasks if "id" in t}
+
+    @property
+    def busy(self) -> List[Interval]:
+        return [(e["start_time"], e["end_time"]) for e in self.events]
+
+    def snapshot(
+        self,
+        window_start: datetime,
+        window_end: datetime,
+        settings: Optional[dict] = None
+    ) -> ScheduleSnapshot:
+        """Plain-data snapshot of the busy time in a window plus everything scoring needs."""
+        return ScheduleSnapshot(
+            busy=tuple(self.busy_between(max(self.now, window_start), window_end)),
+            settings=settings if settings is not None else self.settings,
+            now=self.now,
+            tasks_map=self.tasks_map,
+            review_dates=self.review_dates,
+            energy=self.energy,
+        )
+
+    def busy_between(self, window_start: datetime, window_end: datetime) -> List[Interval]:
+        """
+        Busy intervals overlapping [window_start, window_end), located by bisect on the
+        sorted events so the cost depends on the window, not the horizon.
+        """
+        if self._event_starts is None:
+            self.events.sort(key=lambda e: e["start_time"])
+            self._event_starts = [e["start_time"] for e in self.events]
+            self._longest_event = max(
+                (e["end_time"] - e["start_time"] for e in self.events), default=timedelta(0)
+            )
+        lo = bisect.bisect_left(self._event_starts, window_start - self._longest_event)
+        hi = bisect.bisect_left(self._event_starts, window_end)
+        return [
+            (e["start_time"], e["end_time"]) for e in self.events[lo:hi]
+            if e["end_time"] > window_start
+        ]
+
+    def include_tasks(self, tasks: Iterable[dict]):
+        """Add task rows written after the snapshot was taken (replacing same-id rows)."""
+        added = {t["id"]: t for t in tasks if "id" in t}
+        self.tasks = [t for t in self.tasks if t.get("id") not in added] + list(added.values())
+
+    def forget_events(self, task_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        """
+        Drop future events from the snapshot (all of them, or only those of task_ids)
+        so they no longer block time. Selects the same rows as delete_future_calendar_events
+        (task_ids=None) and delete_events_for_tasks.
+
+        Returns:
+            The dropped events
+        """
+        task_ids = set(task_ids) if task_ids is not None else None
+        kept, dropped = [], []
+        for event in self.events:
+            if event["start_time"] < self.now or (task_ids is not None and event.get("task_id") not in task_ids):
+                kept.append(event)
+            else:
+                dropped.append(event)
+        self.events = kept
+        self._event_starts = None
+        return dropped
+
+
+def parse_settings(settings: Optional[dict]) -> dict:
+    """Copy settings with JSON string fields decoded (missing/invalid -> {})."""
+    parsed = dict(settings or {})
+    for key in JSON_SETTINGS_FIELDS:
+        value = parsed.get(key)
+        if isinstance(value, str):
+            try:
+                parsed[key] = json.loads(value) if value.strip() else {}
+            except ValueError:
+                logger.warning(f"Invalid JSON in settings.{key}, ignoring")
+                parsed[key] = {}
+        elif value is None:
+            parsed[key] = {}
+    return parsed
+
+
+def task_deadline(task: dict) -> Optional[datetime]:
+    """Parse a task's deadline (end_time, or due_date for tasks created through the API), if any."""
+    deadline = task.get("end_time") or task.get("due_date")
+    if not deadline:
+        return None
+    return parse_timestamp(deadline)
+
+
+def scheduling_horizon(tasks: Iterable[dict], now: datetime) -> datetime:
+    """Scheduling window end: the latest task deadline, but at least one week out."""
+    latest_deadline = now + DEFAULT_HORIZON
+    for task in tasks:
+        deadline = task_deadline(task)
+        if deadline and deadline > latest_deadline:
+            latest_deadline = deadline
+    return latest_deadline
+
+
+def _review_sessions_query(task_ids: List[int], db):
+    return db.table("review_sessions") \
+        .select("task_id, scheduled_date") \
+        .in_("task_id", task_ids)
+
+
+def latest_review_dates(rows: Iterable[dict]) -> Dict[int, datetime]:
+    """Latest scheduled_date per task from review_sessions rows."""
+    review_dates_map = {}
+    for row in rows:
+        scheduled_date = parse_timestamp(row["scheduled_date"])
+        latest = review_dates_map.get(row["task_id"])
+        if latest is None or scheduled_date > latest:
+            review_dates_map[row["task_id"]] = scheduled_date
+    return review_dates_map
+
+
+def fetch_latest_review_dates(task_ids: List[int], db) -> Dict[int, datetime]:
+    """
+    Fetch the latest review_sessions.scheduled_date per task in one query.
+
+    Returns:
+        dict of {task_id: latest scheduled_date}
+    """
+    if not task_ids:
+        return {}
+
+    try:
+        response = _review_sessions_query(task_ids, db).execute()
+        return latest_review_dates(response.data or [])
+    except Exception as e:
+        logger.warning(f"Failed to batch fetch review sessions for tasks {task_ids}: {e}")
+        return {}
+
+
+def _settings_query(user_id: int, db):
+    return db.table("settings").select("*").eq("user_id", user_id)
+
+
+def fetch_settings_row(user_id: int, db) -> dict:
+    """Raw settings row for the user ({} if none)."""
+    response = _settings_query(user_id, db).execute()
+    return response.data[0] if response.data else {}
+
+
+def _first_row(response) -> Optional[dict]:
+    # settings_cache stores a missing row as None, the same as get_settings
+    return response.data[0] if response.data else None
+
+
+def _tasks_query(user_id: int, db):
+    return db.table("tasks").select("*").eq("user_id", user_id)
+
+
+def fetch_user_tasks(user_id: int, db) -> List[dict]:
+    """All of the user's tasks."""
+    response = _tasks_query(user_id, db).execute()
+    return response.data or []
+
+
+def _horizon_events_query(user_id: int, window_start: datetime, window_end: datetime, db):
+    return db.table("calendar_events") \
+        .select("id, task_id, start_time, end_time, event_type, source, fixed") \
+        .eq("user_id", user_id) \
+        .lt("start_time", window_end.isoformat()) \
+        .gt("end_time", window_start.isoformat()) \
+        .order("start_time")
+
+
+def parse_event_times(rows: Iterable[dict]) -> List[dict]:
+    """Copy event rows with start_time/end_time parsed to datetimes."""
+    events = []
+    for row in rows:
+        event = dict(row)
+        event["start_time"] = parse_timestamp(row["start_time"])
+        event["end_time"] = parse_timestamp(row["end_time"])
+        events.append(event)
+    return events
+
+
+def fetch_horizon_events(user_id: int, window_start: datetime, window_end: datetime, db) -> List[dict]:
+    """
+    Calendar events overlapping [window_start, window_end) with parsed start/end times.
+    Uses overlap logic so events already in progress still block time.
+    """
+    response = _horizon_events_query(user_id, window_start, window_end, db).execute()
+    return parse_event_times(response.data or [])
+
+
+def review_task_ids_for(tasks: Iterable[dict]) -> List[int]:
+    return [t["id"] for t in tasks if t.get("event_type") == "review" and t.get("id")]
+
+
+def build_scheduling_context(
+    user_id: int,
+    now: datetime,
+    window_end: datetime,
+    raw_settings: dict,
+    tasks: List[dict],
+    events: List[dict],
+    review_dates: Dict[int, datetime]
+) -> SchedulingContext:
+    settings = parse_settings(raw_settings)
+    return SchedulingContext(
+        user_id=user_id,
+        now=now,
+        window_end=window_end,
+        settings=settings if raw_settings else {},
+        energy=EnergyCurve(settings.get("energy_levels")),
+        tasks=tasks,
+        events=events,
+        review_dates=review_dates,
+    )
+
+
+def load_scheduling_context(
+    user_id: int,
+    db=None,
+    extra_tasks: Iterable[dict] = (),
+    now: Optional[datetime] = None
+) -> SchedulingContext:
+    """
+    Build the scheduling context for one request (3 queries, 4 with review tasks).
+
+    Args:
+        user_id: User ID
+        db: Database connection (defaults to supabase)
+        extra_tasks: Tasks not yet in the DB whose deadlines should widen the horizon
+        now: Current time (UTC); injectable for tests
+
+    Returns:
+        SchedulingContext covering now .. latest deadline (at least one week)
+    """
+    if db is None:
+        db = get_supabase_client()
+        raw_settings = settings_cache.load(user_id, lambda: _first_row(_settings_query(user_id, db).execute())) or {}
+    else:
+        raw_settings = fetch_settings_row(user_id, db)
+    now = now or datetime.now(timezone.utc)
+
+    tasks = fetch_user_tasks(user_id, db)
+    window_end = scheduling_horizon(list(tasks) + list(extra_tasks), now)
+
+    # Every event overlapping the horizon blocks time
+    events = fetch_horizon_events(user_id, now, window_end, db)
+    review_dates = fetch_latest_review_dates(review_task_ids_for(tasks), db)
+
+    return build_scheduling_context(user_id, now, window_end, raw_settings, tasks, events, review_dates)
+
+
+async def _fetch_settings_async(user_id: int, db) -> Optional[dict]:
+    return _first_row(await execute_async(_settings_query(user_id, db)))
+
+
+async def load_scheduling_context_async(
+    user_id: int,
+    db=None,
+    extra_tasks: Iterable[dict] = (),
+    now: Optional[datetime] = None
+) -> SchedulingContext:
+    """
+    Async version of load_scheduling_context that never blocks the event loop.
+
+    Queries run in two concurrent rounds: settings and tasks, then calendar events
+    (which need the horizon from the tasks) and review dates. By default they are
+    awaited on the pooled async client; a sync `db` runs them in worker threads.
+    """
+    if db is None:
+        db, run = get_async_supabase_client(), execute_async
+
+        async def settings_row():
+            return await settings_cache.load_async(user_id, lambda: _fetch_settings_async(user_id, db)) or {}
+    else:
+        run = lambda query: asyncio.to_thread(query.execute)
+
+        async def settings_row():
+            return _first_row(await run(_settings_query(user_id, db))) or {}
+    now = now or datetime.now(timezone.utc)
+    extra_tasks = list(extra_tasks)
+
+    raw_settings, tasks_response = await asyncio.gather(
+        settings_row(),
+        run(_tasks_query(user_id, db)),
+    )
+    tasks = tasks_response.data or []
+    window_end = scheduling_horizon(list(tasks) + extra_tasks, now)
+
+    async def review_dates_for(task_ids: List[int]) -> Dict[int, datetime]:
+        if not task_ids:
+            return {}
+        try:
+            response = await run(_review_sessions_query(task_ids, db))
+            return latest_review_dates(response.data or [])
+        except Exception as e:
+            logger.warning(f"Failed to batch fetch review sessions for tasks {task_ids}: {e}")
+            return {}
+
+    events_response, review_dates = await asyncio.gather(
+        run(_horizon_events_query(user_id, now, window_end, db)),
+        review_dates_for(review_task_ids_for(tasks)),
+    )
+    events = parse_event_times(events_response.data or [])
+
+    return build_scheduling_context(user_id, now, window_end, raw_settings, tasks, events, review_dates)
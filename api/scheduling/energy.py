@@ -0,0 +1,86 @@
+"""
+Per-minute energy curve for slot scoring.
+
+The user's hourly energy_levels are compiled once into a 1440-entry per-minute
+array with prefix sums, so the average energy of any slot is O(1) and a whole
+batch of slots (or candidate sub-slots) is scored in one vectorized call.
+Averages are minute-weighted: a 5-minute tail into the next hour counts for
+5 minutes, not a full hour. Hours missing from energy_levels are ignored, and
+a slot with no known hours scores the default.
+"""
+
+import json
+from datetime import datetime
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+DEFAULT_ENERGY = 0.5
+
+
+class EnergyCurve:
+    """Compiled energy curve: prefix sums over a per-minute day profile."""
+
+    def __init__(self, energy_levels: Union[dict, str, None], default: float = DEFAULT_ENERGY):
+        """
+        Args:
+            energy_levels: Hour -> energy map like {"8": 0.3, "9": 0.5}, or its JSON string
+            default: Score for slots that touch no known hour
+        """
+        if isinstance(energy_levels, str):
+            energy_levels = json.loads(energy_levels) if energy_levels.strip() else {}
+
+        values = np.zeros(MINUTES_PER_DAY, dtype=np.float64)
+        known = np.zeros(MINUTES_PER_DAY, dtype=np.float64)
+        for hour, level in (energy_levels or {}).items():
+            try:
+                hour = int(hour)
+                level = float(level)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= hour < 24:
+                values[hour * 60:(hour + 1) * 60] = level
+                known[hour * 60:(hour + 1) * 60] = 1
+
+        self.default = default
+        self._energy_prefix = np.concatenate(([0.0], np.cumsum(values)))
+        self._known_prefix = np.concatenate(([0.0], np.cumsum(known)))
+
+    @staticmethod
+    def _cumulative(prefix: np.ndarray, minutes: np.ndarray) -> np.ndarray:
+        """Prefix value at an absolute minute offset from midnight, wrapping across days."""
+        days, minute_of_day = np.divmod(minutes, MINUTES_PER_DAY)
+        return days * prefix[-1] + prefix[minute_of_day]
+
+    def average(self, start_minutes, duration_minutes) -> np.ndarray:
+        """
+        Average energy for a batch of windows.
+
+        Args:
+            start_minutes: Window starts as minutes since midnight (int array-like)
+            duration_minutes: Window lengths in minutes (int array-like, may exceed a day)
+
+        Returns:
+            Float array of minute-weighted average energy per window
+        """
+        starts = np.asarray(start_minutes, dtype=np.int64)
+        ends = starts + np.asarray(duration_minutes, dtype=np.int64)
+        energy = self._cumulative(self._energy_prefix, ends) - self._cumulative(self._energy_prefix, starts)
+        known = self._cumulative(self._known_prefix, ends) - self._cumulative(self._known_prefix, starts)
+        return np.where(known > 0, energy / np.maximum(known, 1), self.default)
+
+    def score_slots(self, slots: Iterable[Tuple[datetime, float]]) -> np.ndarray:
+        """Average energy for (start_time, duration_hours) slots in one vectorized call."""
+        slots = list(slots)
+        if not slots:
+            return np.zeros(0, dtype=np.float64)
+        starts = [start.hour * 60 + start.minute for start, _ in slots]
+        durations = [round(duration_hours * 60) for _, duration_hours in slots]
+        return self.average(starts, durations)
+
+    def rank_slots(self, slots: List[Tuple[datetime, float]]) -> List[Tuple[datetime, float, float]]:
+        """Attach average energy to each slot and sort best-first (stable for ties)."""
+        scores = self.score_slots(slots)
+        order = np.argsort(-scores, kind="stable")
+        return [(slots[i][0], slots[i][1], float(scores[i])) for i in order]
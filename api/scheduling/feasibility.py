@@ -0,0 +1,79 @@
+"""
+Deadline feasibility over free slots.
+
+Free slots are sorted once into a cumulative-capacity array, so "how many free
+hours exist before deadline D" is a binary search instead of a scan over every
+slot. On top of it, an earliest-deadline-first (EDF) check tells whether a set
+of tasks can all meet their deadlines together: placing work in deadline order
+is optimal for this question, so a task is infeasible exactly when the demand
+of it and every task due before it exceeds the capacity before its deadline.
+"""
+
+import bisect
+from datetime import datetime
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple
+
+from api.scheduling.context import task_deadline
+
+# Float slack when comparing summed hours
+_EPSILON_HOURS = 1e-9
+
+
+class CapacityIndex:
+    """Cumulative free hours over non-overlapping (start_time, duration_hours) slots."""
+
+    def __init__(self, slots: Iterable[Tuple[datetime, float]], end: Optional[datetime] = None):
+        """
+        Args:
+            slots: Free slots, in any order
+            end: End of the window the slots were found in (None = unbounded)
+        """
+        self.end = end
+        ordered = sorted(slots, key=lambda slot: slot[0])
+        self._starts = [start for start, _ in ordered]
+        self._hours = [hours for _, hours in ordered]
+        self._prefix = [0.0, *accumulate(self._hours)]
+
+    @property
+    def total_hours(self) -> float:
+        return self._prefix[-1]
+
+    def covers(self, moment: datetime) -> bool:
+        """Whether free time up to `moment` is fully known to this index."""
+        return self.end is None or moment <= self.end
+
+    def hours_before(self, deadline: datetime) -> float:
+        """Free hours before deadline (a slot straddling the deadline counts up to it)."""
+        idx = bisect.bisect_left(self._starts, deadline)
+        if idx == 0:
+            return 0.0
+        last_start = self._starts[idx - 1]
+        straddle = min(self._hours[idx - 1], (deadline - last_start).total_seconds() / 3600)
+        return self._prefix[idx - 1] + straddle
+
+
+def edf_infeasible(tasks: List[dict], capacity: CapacityIndex) -> List[dict]:
+    """
+    Tasks that miss their deadline when all tasks are placed earliest-deadline-first.
+
+    Tasks without a deadline never miss. A task that misses still takes its time
+    (it is placed late, not dropped), so tasks due after it see that demand too.
+
+    Args:
+        tasks: Tasks with estimated_duration (minutes) and optional end_time
+        capacity: Free time the tasks can be placed into
+
+    Returns:
+        Infeasible tasks, in deadline order
+    """
+    with_deadlines = [(deadline, task) for task in tasks if (deadline := task_deadline(task))]
+    with_deadlines.sort(key=lambda item: item[0])
+
+    infeasible = []
+    demand = 0.0
+    for deadline, task in with_deadlines:
+        demand += task.get("estimated_duration", 0) / 60.0  # Convert minutes to hours
+        if demand > capacity.hours_before(deadline) + _EPSILON_HOURS:
+            infeasible.append(task)
+    return infeasible
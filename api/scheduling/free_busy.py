@@ -0,0 +1,148 @@
+"""
+Free/busy engine for slot discovery.
+
+Turns a user's busy intervals into free study slots for a whole scheduling
+window in a single sorted sweep:
+- Busy intervals are sorted and merged once (overlaps collapse into one block)
+- Each day's wake/sleep window is walked with a cursor that only moves forward,
+  so total work is O(days + events) instead of re-filtering events per day
+- Events that start before wake time or span midnight are clipped to the day
+  window they overlap, so they still block the following morning
+"""
+
+import logging
+from datetime import datetime, time, timedelta, timezone
+from typing import Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+Interval = Tuple[datetime, datetime]
+
+DEFAULT_WAKE = (7, 0)
+DEFAULT_SLEEP = (23, 0)
+
+
+def parse_timestamp(value) -> datetime:
+    """Parse an ISO timestamp (or pass through a datetime) as an aware UTC datetime."""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parse_clock(value, default: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Parse a wake/sleep time into (hour, minute).
+
+    Accepts "HH:MM", "HH:MM:SS" (Postgres TIME) or an integer hour.
+    """
+    if value is None:
+        return default
+    if isinstance(value, int):
+        return value, 0
+    hour, minute = value.split(":")[:2]
+    return int(hour), int(minute)
+
+
+def parse_day_bounds(settings: dict) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Read (wake, sleep) clock times from settings, falling back to 07:00-23:00."""
+    try:
+        wake = parse_clock(settings.get("wake_time", "07:00"), DEFAULT_WAKE)
+        sleep = parse_clock(settings.get("sleep_time", "23:00"), DEFAULT_SLEEP)
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Invalid wake/sleep time format: {e}, using defaults")
+        return DEFAULT_WAKE, DEFAULT_SLEEP
+    return wake, sleep
+
+
+def parse_busy_intervals(rows: Iterable[dict]) -> List[Interval]:
+    """Convert calendar event rows ({"start_time", "end_time"}) into (start, end) datetimes."""
+    return [
+        (parse_timestamp(row["start_time"]), parse_timestamp(row["end_time"]))
+        for row in rows
+    ]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals by start and merge any that overlap or touch."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_free_slots(
+    busy: Iterable[Interval],
+    window_start: datetime,
+    window_end: datetime,
+    wake: Tuple[int, int] = DEFAULT_WAKE,
+    sleep: Tuple[int, int] = DEFAULT_SLEEP,
+    min_study_minutes: float = 15,
+) -> List[Tuple[datetime, float]]:
+    """
+    Find free slots inside daily wake/sleep windows for the whole range in one pass.
+
+    Args:
+        busy: Busy (start, end) intervals, in any order
+        window_start: Earliest time a slot may start (UTC)
+        window_end: Latest time a slot may end (UTC)
+        wake: (hour, minute) the day window opens
+        sleep: (hour, minute) the day window closes; if not after wake, it is on the next day
+        min_study_minutes: Gaps shorter than this are dropped
+
+    Returns:
+        List of (slot_start_time, duration_hours) tuples in chronological order
+    """
+    merged = merge_intervals(busy)
+
+    wake_offset = timedelta(hours=wake[0], minutes=wake[1])
+    sleep_offset = timedelta(hours=sleep[0], minutes=sleep[1])
+    one_day = timedelta(days=1)
+    if sleep_offset <= wake_offset:
+        # Overnight window (e.g. 18:00-02:00) closes on the following day
+        sleep_offset += one_day
+    min_gap = timedelta(minutes=min_study_minutes)
+
+    # An overnight window that opened yesterday can still cover window_start
+    first_date = window_start.date() - (one_day if sleep_offset > one_day else timedelta(0))
+    day = datetime.combine(first_date, time.min, tzinfo=timezone.utc)
+    last_date = window_end.date()
+
+    empty_slots: List[Tuple[datetime, float]] = []
+    first_open = 0  # index of the first busy interval that may still overlap a day window
+
+    while day.date() <= last_date:
+        day_start = max(day + wake_offset, window_start)
+        day_end = min(day + sleep_offset, window_end)
+        day += one_day
+
+        if day_end - day_start < min_gap:
+            continue
+
+        # Merged intervals have ascending ends, so this pointer never moves back
+        while first_open < len(merged) and merged[first_open][1] <= day_start:
+            first_open += 1
+
+        cursor = day_start
+        i = first_open
+        while i < len(merged) and merged[i][0] < day_end:
+            busy_start, busy_end = merged[i]
+            if busy_start - cursor >= min_gap:
+                empty_slots.append((cursor, (busy_start - cursor).total_seconds() / 3600))
+            if busy_end > cursor:
+                cursor = busy_end
+            i += 1
+
+        if day_end - cursor >= min_gap:
+            empty_slots.append((cursor, (day_end - cursor).total_seconds() / 3600))
+
+    return empty_slots
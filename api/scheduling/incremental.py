@@ -0,0 +1,117 @@
+"""
+Incremental rescheduling scoped to the affected days.
+
+A single change (a new task, or time freed by a deleted event or completed
+task) only needs the days from the change onwards until the work fits:
+- the window starts on the day of the change and covers just enough whole
+  days to hold the work, then doubles (spill-over) if placement falls short
+- every event outside the window, and every event already inside it, stays
+  frozen as busy time
+- busy intervals and slots are looked up for the window only, so the cost
+  of the common case does not grow with the scheduling horizon
+
+If the work doesn't fit anywhere before the horizon ends, None is returned
+and the caller falls back to a horizon-wide run.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from api.scheduling.context import SchedulingContext
+from api.scheduling.event_decomposition import decompose_tasks_to_events
+from api.scheduling.scheduler import compute_free_slots, solve_schedule
+
+logger = logging.getLogger(__name__)
+
+ONE_DAY = timedelta(days=1)
+
+
+def _start_of_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def required_minutes_by_task(tasks: List[dict], settings: dict) -> Counter:
+    """Study minutes each task needs placed (as decomposed into events)."""
+    required = Counter()
+    for event in decompose_tasks_to_events(tasks, settings):
+        required[event["task_id"]] += event["duration_minutes"]
+    return required
+
+
+def incremental_window(
+    context: SchedulingContext,
+    hours_needed: float,
+    start: Optional[datetime] = None
+) -> Optional[datetime]:
+    """
+    End of the smallest run of whole days from `start` whose free time covers hours_needed.
+    Days are added one at a time, so only the days actually inspected are swept.
+
+    Returns:
+        Window end (a day boundary, capped at the horizon), or None if the horizon is too short
+    """
+    window_start = max(start or context.now, context.now)
+    window_end = window_start
+    available = 0.0
+
+    while window_end < context.window_end:
+        day_end = min(_start_of_day(window_end) + ONE_DAY, context.window_end)
+        busy = context.busy_between(window_end, day_end)
+        available += sum(hours for _, hours in compute_free_slots(busy, window_end, day_end, context.settings))
+        window_end = day_end
+        if available >= hours_needed:
+            return window_end
+
+    return None
+
+
+def schedule_incremental(
+    user_id: int,
+    tasks: List[dict],
+    context: SchedulingContext,
+    settings: Optional[dict] = None,
+    start: Optional[datetime] = None
+) -> Optional[List[dict]]:
+    """
+    Place tasks in the days affected by a change, leaving the rest of the calendar frozen.
+
+    Args:
+        user_id: User ID
+        tasks: Tasks whose work must be (re)placed
+        context: SchedulingContext with the events to keep already in place
+        settings: User settings (defaults to the context's parsed settings)
+        start: Time of the change (defaults to now); the window begins on its day
+
+    Returns:
+        Scheduled events, or None if the work doesn't fit before the horizon
+    """
+    settings = settings if settings is not None else context.settings
+    required = required_minutes_by_task(tasks, settings)
+    if not required:
+        return []
+
+    window_start = max(start or context.now, context.now)
+    window_end = incremental_window(context, sum(required.values()) / 60, window_start)
+    if window_end is None:
+        return None
+
+    while True:
+        snapshot = context.snapshot(window_start, window_end, settings)
+        schedule = solve_schedule(tasks, window_start, window_end, snapshot)
+
+        placed = Counter()
+        for event in schedule:
+            if event.get("event_type") != "break":
+                placed[event.get("task_id")] += (event["end_time"] - event["start_time"]).total_seconds() / 60
+        if all(placed[task_id] >= minutes for task_id, minutes in required.items()):
+            days = (window_end - _start_of_day(window_start)).days
+            logger.info(f"Incremental schedule placed {len(required)} tasks within {days} days")
+            return schedule
+
+        if window_end >= context.window_end:
+            return None
+
+        # Spill over: double the window (days inspected stay proportional to the work)
+        window_end = min(window_start + 2 * (window_end - window_start), context.window_end)
@@ -0,0 +1,117 @@
+"""
+Cached, batched text embeddings for semantic matching.
+
+Embeddings are keyed by a hash of model + text. A lookup checks an in-process
+LRU first, then the persistent text_embeddings table (one query for all
+misses). Only what is still missing goes to the embeddings API, in a single
+batched request, and the results are written back to both. Deleting by
+description therefore re-embeds only new task titles, not the user's whole
+task list.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from api import database_async
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = os.getenv("TASK_EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))  # vectors kept in memory per process
+
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def content_hash(text: str, model: str = EMBEDDING_MODEL) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+
+def _normalize(vec) -> np.ndarray:
+    vec = np.asarray(vec, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class _VectorLRU:
+    """Thread-safe LRU of unit vectors by content hash."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            found = {}
+            for key in keys:
+                vec = self._entries.get(key)
+                if vec is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vec
+            return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, vec in vectors.items():
+                self._entries[key] = vec
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+memory_cache = _VectorLRU(EMBEDDING_CACHE_SIZE)
+
+# where embedding lookups were served from, per process
+embedding_counts = {"memory": 0, "store": 0, "api": 0}
+
+
+async def _embed_remote(texts: List[str]) -> List[List[float]]:
+    response = await client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    return [item.embedding for item in response.data]
+
+
+async def embed_texts(texts: List[str]) -> np.ndarray:
+    """Unit-length float32 embeddings, one row per text (in order)."""
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    keys = [content_hash(text) for text in texts]
+    unique = dict(zip(keys, texts))
+
+    vectors = memory_cache.get_many(list(unique))
+    embedding_counts["memory"] += len(vectors)
+
+    missing = [key for key in unique if key not in vectors]
+    if missing:
+        stored = {key: _normalize(vec) for key, vec in (await database_async.get_text_embeddings(missing)).items()}
+        embedding_counts["store"] += len(stored)
+        memory_cache.put_many(stored)
+        vectors.update(stored)
+
+    missing = [key for key in missing if key not in vectors]
+    if missing:
+        embeddings = await _embed_remote([unique[key] for key in missing])
+        embedding_counts["api"] += len(missing)
+        fresh = {key: _normalize(vec) for key, vec in zip(missing, embeddings)}
+        memory_cache.put_many(fresh)
+        vectors.update(fresh)
+        # a failed write only costs a re-embed later (save_text_embeddings logs it)
+        await database_async.save_text_embeddings([
+            {"content_hash": key, "model": EMBEDDING_MODEL, "embedding": [float(x) for x in vec]}
+            for key, vec in zip(missing, embeddings)
+        ])
+        logger.debug("Embedded texts", extra={"count": len(missing)})
+
+    return np.vstack([vectors[key] for key in keys])
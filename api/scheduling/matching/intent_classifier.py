@@ -1,17 +1,31 @@
 import os
+import json
+import asyncio
+import hashlib
 import logging
+import tempfile
+from pathlib import Path
+
 import numpy as np
 from openai import AsyncOpenAI
 
+from api.scheduling.matching.local_intent import classify_locally, get_local_model, local_model_loaded, record_utterance
+
 # Initialize OpenAI client
 client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Averaged intent vectors are persisted here, one .npy per (model, examples hash);
+# workers memory-map the same file, so it is computed once per deploy, not per process
+INTENT_VECTOR_CACHE_DIR = Path(os.getenv("INTENT_VECTOR_CACHE_DIR", Path(__file__).parent / "cache"))
+
 # ------------------- Embedding functions -------------------
 
-async def get_openai_embedding(text, model="text-embedding-3-small"):
+async def get_openai_embedding(text, model=EMBEDDING_MODEL):
     """Get embedding from OpenAI API"""
     response = await client.embeddings.create(
         model=model,
@@ -24,7 +38,7 @@ async def embed(texts):
     if isinstance(texts, str):
         texts = [texts]
     response = await client.embeddings.create(
-        model="text-embedding-3-small",
+        model=EMBEDDING_MODEL,
         input=texts
     )
     return np.vstack([np.array(emb.embedding) for emb in response.data])
@@ -76,26 +90,83 @@ intent_examples = {
     ]
 }
 
-# Precompute mean embeddings per intent (performed lazily)
+# Precompute mean embeddings per intent (loaded from disk at startup, else built lazily)
 intent_vectors: dict[str, np.ndarray] = {}
 
 
-async def _initialize_intent_vectors():
-    """Build embeddings for each intent when first needed."""
+def intent_vector_cache_path(model: str = EMBEDDING_MODEL) -> Path:
+    """Cache file for the current model and intent_examples (a new file whenever either changes)."""
+    key = json.dumps({"model": model, "examples": intent_examples}, sort_keys=True)
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return INTENT_VECTOR_CACHE_DIR / f"intent_vectors-{model}-{digest}.npy"
+
+
+def load_intent_vectors() -> bool:
+    """Memory-map persisted intent vectors into intent_vectors; False when there are none yet."""
     if intent_vectors:
+        return True
+    path = intent_vector_cache_path()
+    try:
+        matrix = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return False
+    if matrix.shape[0] != len(intent_examples):
+        logger.warning(f"Ignoring intent vector cache {path}: unexpected shape {matrix.shape}")
+        return False
+    # rows follow intent_examples order, which is part of the file's hash
+    intent_vectors.update(zip(intent_examples, matrix))
+    logger.info("Loaded intent vectors", extra={"path": str(path)})
+    return True
+
+
+def _save_intent_vectors(matrix: np.ndarray):
+    """Write atomically (workers may race to build it) and drop caches for old examples."""
+    path = intent_vector_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".npy.tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, path)
+        for stale in path.parent.glob("intent_vectors-*.npy"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not persist intent vectors to {path}: {e}")
+
+
+async def build_intent_vectors() -> np.ndarray:
+    """Embed every intent example in one request; returns the normalized mean vector per intent (rows in intent_examples order)."""
+    examples = [example for examples in intent_examples.values() for example in examples]
+    embeddings = await embed(examples)
+    rows, start = [], 0
+    for intent_list in intent_examples.values():
+        vec = embeddings[start:start + len(intent_list)].mean(axis=0)
+        rows.append(vec / np.linalg.norm(vec))
+        start += len(intent_list)
+    return np.vstack(rows).astype(np.float32)
+
+
+async def _initialize_intent_vectors():
+    """Load persisted embeddings for each intent, building and saving them when first needed."""
+    if intent_vectors or load_intent_vectors():
         return
 
-    for intent, examples in intent_examples.items():
-        vec = (await embed(examples)).mean(axis=0)
-        vec /= np.linalg.norm(vec)
-        intent_vectors[intent] = vec
+    matrix = await build_intent_vectors()
+    _save_intent_vectors(matrix)
+    intent_vectors.update(zip(intent_examples, matrix))
 
 
 # ------------------- Classification -------------------
 
+# where classify_intent answered from (local fast path vs embeddings), per process
+classification_counts = {"local": 0, "embeddings": 0}
+
+
 async def classify_intent(text: str, intents: list[str], dynamic_ratio: float = 0.8) -> list[str]:
     """
-    Classify text into one or more intents using dynamic thresholding.
+    Classify text into one or more intents: locally when the TF-IDF model is
+    confident (see local_intent.py), else with embeddings and dynamic thresholding.
 
     Args:
         text: User input message
@@ -105,6 +176,33 @@ async def classify_intent(text: str, intents: list[str], dynamic_ratio: float =
     Returns:
         List of detected intent strings
     """
+    if not local_model_loaded():
+        # normally trained in the app lifespan; train off the event loop when it was not
+        await asyncio.to_thread(get_local_model, intent_examples)
+
+    # confidently classified messages never leave the process
+    detected = classify_locally(text, intents, intent_examples)
+    source = "local"
+    if detected is None:
+        detected = await classify_with_embeddings(text, intents, dynamic_ratio)
+        source = "embeddings"
+        record_utterance(text, detected)
+    classification_counts[source] += 1
+
+    logger.info(
+        "Intent classification result",
+        extra={
+            "detected_intents": detected,
+            "intent_count": len(detected),
+            "source": source
+        }
+    )
+
+    return detected
+
+
+async def classify_with_embeddings(text: str, intents: list[str], dynamic_ratio: float = 0.8) -> list[str]:
+    """Embedding classifier: every intent within dynamic_ratio of the top cosine similarity."""
     await _initialize_intent_vectors()
     msg_vec = await get_openai_embedding(text)
     msg_vec /= np.linalg.norm(msg_vec)
@@ -129,14 +227,9 @@ async def classify_intent(text: str, intents: list[str], dynamic_ratio: float =
     )
 
     # Get all intents above threshold
-    detected = [intent for intent, score in scores.items() if score >= threshold]
-    
-    logger.info(
-        "Intent classification result",
-        extra={
-            "detected_intents": detected,
-            "intent_count": len(detected)
-        }
-    )
-    
-    return detected
+    return [intent for intent, score in scores.items() if score >= threshold]
+
+if __name__ == "__main__":
+    # build the intent vector cache ahead of time (e.g. during a deploy)
+    asyncio.run(_initialize_intent_vectors())
+    print(intent_vector_cache_path())
@@ -0,0 +1,237 @@
+"""
+Local first-stage intent classifier (no network).
+
+A TF-IDF model over word and character n-grams, trained on intent_examples
+plus the most recent utterances logged from production (INTENT_UTTERANCE_LOG,
+deduplicated and capped at LOCAL_INTENT_MAX_LOGGED). Training vectors are
+stored sparsely (CSR by n-gram), so a message is scored by summing only the
+postings of its own n-grams. Each message is compared with every training
+utterance and every intent takes its best match. The model is built once per
+worker at startup (api/main.py lifespan).
+
+classify_intent answers locally only when the top intent is similar enough
+(LOCAL_INTENT_MIN_SCORE), clearly ahead of the runner-up
+(LOCAL_INTENT_MIN_MARGIN) and the runner-up scores well below it
+(LOCAL_INTENT_MAX_RUNNER_UP). The local model only ever answers one intent,
+so messages that look like two ("clear my tasks and block 2-3pm for the
+dentist") go to the embedding classifier, which can return both. Its
+answers are logged to train the next process.
+
+tests/eval_intent_classifier.py reports accuracy and the share served locally.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LOCAL_INTENT_CLASSIFIER = os.getenv("LOCAL_INTENT_CLASSIFIER", "true").lower() == "true"
+LOCAL_INTENT_MIN_SCORE = float(os.getenv("LOCAL_INTENT_MIN_SCORE", "0.5"))
+LOCAL_INTENT_MIN_MARGIN = float(os.getenv("LOCAL_INTENT_MIN_MARGIN", "0.15"))
+# runner-up / top score at or above this reads as a second intent (TF-IDF scores of a
+# second intent in the same message are ~0.65-0.85 of the top; single intents stay below ~0.35)
+LOCAL_INTENT_MAX_RUNNER_UP = float(os.getenv("LOCAL_INTENT_MAX_RUNNER_UP", "0.5"))
+# JSONL of {"text", "intents"} labelled by the embedding classifier (unset = no logging)
+INTENT_UTTERANCE_LOG = os.getenv("INTENT_UTTERANCE_LOG")
+# distinct logged utterances trained on (most recent first); bounds model memory and build time
+LOCAL_INTENT_MAX_LOGGED = int(os.getenv("LOCAL_INTENT_MAX_LOGGED", "5000"))
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def features(text: str) -> Counter:
+    """Word unigrams/bigrams and 3-5 character n-grams of the lowercased words."""
+    words = _WORD.findall(text.lower())
+    grams = Counter(f"w:{w}" for w in words)
+    grams.update(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f" {word} "
+        for n in (3, 4, 5):
+            grams.update(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+    return grams
+
+
+class LocalIntentModel:
+    """TF-IDF nearest-example scorer over a fixed set of labelled utterances."""
+
+    def __init__(self, utterances: Iterable[Tuple[str, str]]):
+        utterances = [(text, intent) for text, intent in utterances if text.strip()]
+        docs = [features(text) for text, _ in utterances]
+        self.texts = {normalize_text(text) for text, _ in utterances}
+        self.intents = sorted({intent for _, intent in utterances})
+        self._intent_index = {intent: i for i, intent in enumerate(self.intents)}
+        self._labels = np.array([self._intent_index[intent] for _, intent in utterances], dtype=np.intp)
+        self._n_docs = len(docs)
+
+        document_frequency = Counter(gram for doc in docs for gram in doc)
+        self._vocab = {gram: i for i, gram in enumerate(document_frequency)}
+        self._idf = np.array(
+            [math.log((1 + len(docs)) / (1 + document_frequency[gram])) + 1 for gram in self._vocab],
+            dtype=np.float32,
+        )
+
+        # unit TF-IDF vector of each training utterance as (n-gram, utterance, weight) triples
+        grams, columns, weights = [], [], []
+        for j, doc in enumerate(docs):
+            ids = np.array([self._vocab[gram] for gram in doc], dtype=np.int64)
+            values = np.array([1 + math.log(count) for count in doc.values()], dtype=np.float32) * self._idf[ids]
+            values /= np.linalg.norm(values)
+            grams.append(ids)
+            columns.append(np.full(len(ids), j, dtype=np.int32))
+            weights.append(values)
+        grams = np.concatenate(grams) if docs else np.zeros(0, dtype=np.int64)
+        order = np.argsort(grams, kind="stable")
+        # CSR by n-gram: postings of n-gram i are _columns/_weights[_indptr[i]:_indptr[i + 1]]
+        self._indptr = np.concatenate([[0], np.cumsum(np.bincount(grams, minlength=len(self._vocab)))])
+        self._columns = np.concatenate(columns)[order] if docs else np.zeros(0, dtype=np.int32)
+        self._weights = np.concatenate(weights)[order] if docs else np.zeros(0, dtype=np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self._indptr.nbytes + self._columns.nbytes + self._weights.nbytes + self._idf.nbytes
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Best cosine similarity to a training utterance, per intent."""
+        grams = features(text)
+        rows = [self._vocab[gram] for gram in grams if gram in self._vocab]
+        if not rows:
+            return {intent: 0.0 for intent in self.intents}
+        weights = np.array(
+            [(1 + math.log(grams[gram])) * self._idf[self._vocab[gram]] for gram in grams if gram in self._vocab],
+            dtype=np.float32,
+        )
+        # only the message's n-grams contribute; its norm counts unseen n-grams with idf 1 so
+        # mostly-unfamiliar messages score low
+        unseen = sum((1 + math.log(c)) ** 2 for g, c in grams.items() if g not in self._vocab)
+        rows = np.array(rows, dtype=np.int64)
+        starts, lengths = self._indptr[rows], self._indptr[rows + 1] - self._indptr[rows]
+        # positions of every posting of the message's n-grams, gathered in one go
+        postings = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(starts, lengths)
+        similarities = np.bincount(
+            self._columns[postings],
+            weights=self._weights[postings] * np.repeat(weights, lengths),
+            minlength=self._n_docs,
+        ) / math.sqrt(float(weights @ weights) + unseen)
+        best = np.zeros(len(self.intents), dtype=np.float32)
+        np.maximum.at(best, self._labels, similarities)
+        return {intent: float(best[i]) for i, intent in enumerate(self.intents)}
+
+    def classify(self, text: str, intents: List[str]) -> Tuple[Optional[str], float, float]:
+        """(top intent among `intents`, its score, margin over the runner-up)."""
+        scores = self.scores(text)
+        ranked = sorted(((scores.get(intent, 0.0), intent) for intent in intents), reverse=True)
+        if not ranked:
+            return None, 0.0, 0.0
+        top_score, top = ranked[0]
+        runner_up = ranked[1][0] if len(ranked) > 1 else 0.0
+        return top, top_score, top_score - runner_up
+
+
+# ------------------- Training data -------------------
+
+def logged_utterances(path: Optional[str] = None, limit: int = LOCAL_INTENT_MAX_LOGGED) -> List[Tuple[str, str]]:
+    """
+    The `limit` most recent distinct single-intent utterances from the production log
+    (multi-intent lines are skipped; a repeated message keeps its latest label).
+    """
+    path = path or INTENT_UTTERANCE_LOG
+    if not path or not Path(path).exists() or limit <= 0:
+        return []
+    utterances: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and len(entry.get("intents") or []) == 1 and entry.get("text"):
+                key = normalize_text(entry["text"])
+                utterances.pop(key, None)
+                utterances[key] = (entry["text"], entry["intents"][0])
+                if len(utterances) > limit:
+                    utterances.popitem(last=False)
+    return list(utterances.values())
+
+
+_log_lock = threading.Lock()
+
+
+def record_utterance(text: str, intents: List[str]):
+    """Append a remotely classified message to INTENT_UTTERANCE_LOG (no-op when unset or already trained on)."""
+    if not INTENT_UTTERANCE_LOG or not intents:
+        return
+    if _model is not None and normalize_text(text) in _model.texts:
+        return
+    line = json.dumps({"text": text, "intents": intents}) + "\n"
+    try:
+        with _log_lock, open(INTENT_UTTERANCE_LOG, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        logger.warning(f"Could not log intent utterance: {e}")
+
+
+def training_utterances(intent_examples: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+    examples = [(text, intent) for intent, texts in intent_examples.items() for text in texts]
+    return examples + [(text, intent) for text, intent in logged_utterances() if intent in intent_examples]
+
+
+# ------------------- Fast path -------------------
+
+_model: Optional[LocalIntentModel] = None
+_model_lock = threading.Lock()
+
+
+def local_model_loaded() -> bool:
+    return _model is not None
+
+
+def get_local_model(intent_examples: Dict[str, List[str]]) -> LocalIntentModel:
+    """Model trained once per process (examples + log); built at startup, else at first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = LocalIntentModel(training_utterances(intent_examples))
+    return _model
+
+
+def is_confident(
+    score: float,
+    margin: float,
+    min_score: float = LOCAL_INTENT_MIN_SCORE,
+    min_margin: float = LOCAL_INTENT_MIN_MARGIN,
+    max_runner_up: float = LOCAL_INTENT_MAX_RUNNER_UP
+) -> bool:
+    """True when a single intent can be answered locally (no plausible second intent)."""
+    runner_up = score - margin
+    return score >= min_score and margin >= min_margin and runner_up < max_runner_up * score
+
+
+def classify_locally(
+    text: str,
+    intents: List[str],
+    intent_examples: Dict[str, List[str]],
+    min_score: float = LOCAL_INTENT_MIN_SCORE,
+    min_margin: float = LOCAL_INTENT_MIN_MARGIN,
+    max_runner_up: float = LOCAL_INTENT_MAX_RUNNER_UP
+) -> Optional[List[str]]:
+    """[intent] when the local model is confident, else None (use the embedding classifier)."""
+    if not LOCAL_INTENT_CLASSIFIER:
+        return None
+    top, score, margin = get_local_model(intent_examples).classify(text, intents)
+    if top is None or not is_confident(score, margin, min_score, min_margin, max_runner_up):
+        return None
+    return [top]
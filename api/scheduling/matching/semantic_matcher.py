@@ -1,20 +1,7 @@
-import os
 import numpy as np
-from openai import OpenAI
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-
-def get_openai_embedding(text: str, model="text-embedding-3-small"):
-
-    """Get embeddings for text string"""
-
-    response = client.embeddings.create(
-        model=model,
-        input=text
-    )
-    return np.array(response.data[0].embedding)
+from api.scheduling.matching.embedding_cache import embed_texts
+from api.scheduling.matching.task_index import get_task_index
 
 
 def cosine_similarity(vec1, vec2):
@@ -24,33 +11,55 @@ def cosine_similarity(vec1, vec2):
     return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
 
 
-def match_tasks(user_text: str, tasks, similarity_threshold=0.75):
+async def match_tasks(user_text: str, tasks, similarity_threshold=0.75):
     """
     Filter tasks semantically matching the user input.
 
+    The message and every task title are embedded together (cached titles are
+    not re-embedded, see embedding_cache.py) and scored with one matrix-vector
+    product.
+
     Args:
         user_text: String describing task to delete.
-        tasks: List of dicts, each with "title" or "description".
+        tasks: List of dicts, each with "title".
         similarity_threshold: Min cosine similarity to consider a match.
 
     Returns:
         List of matched tasks.
     """
 
-    user_vec = get_openai_embedding(user_text)
-    user_vec /= np.linalg.norm(user_vec)
+    candidates = [task for task in tasks if task.get("title")]
+    if not candidates:
+        return []
+
+    vectors = await embed_texts([user_text] + [task["title"] for task in candidates])
+    similarities = vectors[1:] @ vectors[0]
+
+    return [task for task, similarity in zip(candidates, similarities) if similarity >= similarity_threshold]
+
 
-    matched_tasks = []
+async def match_user_tasks(user_id: int, user_text: str, tasks, similarity_threshold=0.75):
+    """
+    match_tasks against the user's persistent task index (see task_index.py):
+    only the message is embedded per call, task vectors come from the index.
+
+    Args:
+        user_id: Owner of `tasks`.
+        user_text: String describing task to delete.
+        tasks: The user's current task rows, each with "id" and "title".
+        similarity_threshold: Min cosine similarity to consider a match.
 
-    for task in tasks:
-        task_text = task.get("title")
-        if not task_text:
-            continue
+    Returns:
+        List of matched tasks.
+    """
 
-        task_vec = get_openai_embedding(task_text)
-        task_vec /= np.linalg.norm(task_vec)
+    candidates = {task["id"]: task for task in tasks if task.get("id") is not None and task.get("title")}
+    if not candidates:
+        return []
 
-        if cosine_similarity(user_vec, task_vec) >= similarity_threshold:
-            matched_tasks.append(task)
+    index = await get_task_index(user_id, list(candidates.values()))
+    query = (await embed_texts([user_text]))[0]
+    task_ids, similarities = index.scores(query)
 
-    return matched_tasks
+    matched = {int(task_id) for task_id, similarity in zip(task_ids, similarities) if similarity >= similarity_threshold}
+    return [task for task_id, task in candidates.items() if task_id in matched]
@@ -0,0 +1,263 @@
+"""
+Per-user task embedding index.
+
+Each user's task title vectors live in one contiguous float32 matrix with a
+parallel array of task ids, so a semantic lookup ("delete my math stuff") is
+a single matrix-vector product plus an argpartition for top-k.
+
+Indexes are persisted in the task_embeddings table (one row per task, rows go
+away with the task via ON DELETE CASCADE) and kept resident per process for
+recently active users. They are updated incrementally:
+- create_task / create_tasks_batch / title updates queue the new titles,
+  which are embedded in one batch (embedding_cache.embed_texts) by a
+  background task or, at the latest, by the next lookup
+- delete_task drops the rows
+get_task_index(user_id, tasks) also reconciles the index against the user's
+current task rows, picking up writes made by other workers.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from api import database_async
+from api.scheduling.matching.embedding_cache import EMBEDDING_MODEL, content_hash, embed_texts
+
+logger = logging.getLogger(__name__)
+
+TASK_INDEX_CACHE_USERS = int(os.getenv("TASK_INDEX_CACHE_USERS", "256"))  # resident indexes per process
+
+
+class TaskEmbeddingIndex:
+    """One user's task vectors: ids[i] is the task whose unit vector is matrix[i]."""
+
+    def __init__(self, ids: np.ndarray, hashes: List[str], matrix: np.ndarray):
+        self._lock = threading.Lock()  # guards _state swaps and pending (write hooks run in worker threads)
+        self._state = (ids, hashes, matrix)
+        self.pending: Dict[int, str] = {}  # task id -> title waiting to be embedded
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "TaskEmbeddingIndex":
+        rows = [row for row in rows if row.get("embedding")]
+        if not rows:
+            return cls(np.zeros(0, dtype=np.int64), [], np.zeros((0, 0), dtype=np.float32))
+        matrix = np.ascontiguousarray([row["embedding"] for row in rows], dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return cls(
+            np.array([row["task_id"] for row in rows], dtype=np.int64),
+            [row["content_hash"] for row in rows],
+            matrix,
+        )
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._state[0]
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    def hashes(self) -> Dict[int, str]:
+        ids, hashes, _ = self._state
+        return dict(zip(ids.tolist(), hashes))
+
+    # -------- updates (copy-on-write: readers keep a consistent snapshot) --------
+
+    def queue(self, task_id: int, title: str):
+        with self._lock:
+            self.pending[task_id] = title
+
+    def pending_titles(self) -> Dict[int, str]:
+        with self._lock:
+            return dict(self.pending)
+
+    def upsert_embedded(self, titles: Dict[int, str], hashes: List[str], vectors: np.ndarray) -> List[int]:
+        """
+        Add vectors embedded for a pending snapshot, skipping tasks dropped or retitled
+        since it was taken. Returns the positions (in `titles` order) that were added.
+        """
+        with self._lock:
+            kept = [i for i, (task_id, title) in enumerate(titles.items()) if self.pending.get(task_id) == title]
+            if kept:
+                task_ids = list(titles)
+                self._upsert([task_ids[i] for i in kept], [hashes[i] for i in kept], vectors[kept])
+            return kept
+
+    def upsert(self, task_ids: List[int], hashes: List[str], vectors: np.ndarray):
+        with self._lock:
+            self._upsert(task_ids, hashes, vectors)
+
+    def _upsert(self, task_ids: List[int], hashes: List[str], vectors: np.ndarray):
+        ids, old_hashes, matrix = self._state
+        keep = ~np.isin(ids, task_ids)
+        if len(ids):
+            matrix = np.concatenate([matrix[keep], vectors.astype(np.float32)])
+        else:
+            matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._state = (
+            np.concatenate([ids[keep], np.asarray(task_ids, dtype=np.int64)]),
+            [h for h, k in zip(old_hashes, keep) if k] + list(hashes),
+            matrix,
+        )
+        for task_id in task_ids:
+            self.pending.pop(task_id, None)
+
+    def drop(self, task_ids: Iterable[int]):
+        task_ids = list(task_ids)
+        with self._lock:
+            for task_id in task_ids:
+                self.pending.pop(task_id, None)
+            ids, hashes, matrix = self._state
+            keep = ~np.isin(ids, task_ids)
+            if keep.all():
+                return
+            self._state = (ids[keep], [h for h, k in zip(hashes, keep) if k], matrix[keep])
+
+    # -------- lookups --------
+
+    def scores(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(task ids, cosine similarity to the unit-length query) for every indexed task."""
+        ids, _, matrix = self._state
+        if not len(ids):
+            return ids, np.zeros(0, dtype=np.float32)
+        return ids, matrix @ query.astype(np.float32)
+
+    def top_k(self, query: np.ndarray, k: int = 5, min_score: float = -1.0) -> List[Tuple[int, float]]:
+        """Best k (task id, similarity) pairs at or above min_score, best first."""
+        ids, scores = self.scores(query)
+        if not len(ids) or k <= 0:
+            return []
+        if k < len(ids):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(ids))
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] >= min_score]
+
+
+def _key(user_id: Any) -> Any:
+    # chat requests carry the user id as a string, task rows as an int
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return user_id
+
+
+class TaskIndexRegistry:
+    """Resident indexes by user (LRU), plus the write hooks the data layer calls."""
+
+    def __init__(self, max_users: int = TASK_INDEX_CACHE_USERS):
+        self.max_users = max_users
+        self._indexes: "OrderedDict[int, TaskEmbeddingIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._background: set = set()
+
+    def resident(self, user_id: Any) -> Optional[TaskEmbeddingIndex]:
+        user_id = _key(user_id)
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                self._indexes.move_to_end(user_id)
+            return index
+
+    def _keep(self, user_id: Any, index: TaskEmbeddingIndex):
+        if self.max_users <= 0:
+            return
+        user_id = _key(user_id)
+        with self._lock:
+            self._indexes[user_id] = index
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def apply_writes(self, inserted: Iterable[dict] = (), deleted: Iterable[dict] = ()):
+        """Record task writes against resident indexes (users without one load fresh later)."""
+        touched = set()
+        for row in deleted:
+            index = self.resident(row.get("user_id"))
+            if index is not None and row.get("id") is not None:
+                index.drop([row["id"]])
+        for row in inserted:
+            index = self.resident(row.get("user_id"))
+            if index is not None and row.get("id") is not None and row.get("title"):
+                index.queue(row["id"], row["title"])
+                touched.add(_key(row["user_id"]))
+        if not touched:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # sync caller: the next lookup embeds the pending titles
+        for user_id in touched:
+            task = loop.create_task(self._embed_pending_logged(user_id))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+    async def _embed_pending_logged(self, user_id: int):
+        try:
+            await self.embed_pending(user_id, self.resident(user_id))
+        except Exception as e:
+            logger.warning(f"Background task indexing failed for user {user_id}: {e}")
+
+    async def embed_pending(self, user_id: int, index: Optional[TaskEmbeddingIndex]):
+        """
+        Embed queued titles in one batch, add them to the index and persist them.
+        Tasks deleted or retitled while the batch was embedding are skipped.
+        """
+        if index is None:
+            return
+        pending = index.pending_titles()
+        if not pending:
+            return
+        user_id = _key(user_id)
+        titles = list(pending.values())
+        vectors = await embed_texts(titles)
+        hashes = [content_hash(title) for title in titles]
+        kept = index.upsert_embedded(pending, hashes, vectors)
+        task_ids = list(pending)
+        rows = [
+            {"task_id": task_ids[i], "user_id": user_id, "model": EMBEDDING_MODEL,
+             "content_hash": hashes[i], "embedding": [float(x) for x in vectors[i]]}
+            for i in kept
+        ]
+        if await database_async.save_task_embeddings(rows):
+            return
+        # a task deleted between the upsert and the save fails the batch's foreign key
+        resident = set(index.ids.tolist())
+        still_there = [row for row in rows if row["task_id"] in resident]
+        if len(still_there) < len(rows):
+            await database_async.save_task_embeddings(still_there)
+
+    async def get(self, user_id: Any, tasks: Optional[Iterable[dict]] = None) -> TaskEmbeddingIndex:
+        """The user's index, loaded from task_embeddings when not resident and reconciled with `tasks`."""
+        user_id = _key(user_id)
+        index = self.resident(user_id)
+        if index is None:
+            index = TaskEmbeddingIndex.from_rows(await database_async.get_task_embeddings(user_id, EMBEDDING_MODEL))
+            self._keep(user_id, index)
+
+        if tasks is not None:
+            titles = {task["id"]: task["title"] for task in tasks if task.get("id") is not None and task.get("title")}
+            indexed = index.hashes()
+            index.drop([task_id for task_id in indexed if task_id not in titles])
+            for task_id, title in titles.items():
+                if indexed.get(task_id) != content_hash(title):
+                    index.queue(task_id, title)
+
+        await self.embed_pending(user_id, index)
+        return index
+
+
+task_indexes = TaskIndexRegistry()
+
+
+async def get_task_index(user_id: Any, tasks: Optional[Iterable[dict]] = None) -> TaskEmbeddingIndex:
+    return await task_indexes.get(user_id, tasks)
@@ -0,0 +1,105 @@
+"""
+Compact slot and placement types for the assignment hot loop.
+
+Times are integer minutes since the Unix epoch and durations are minutes,
+so placing a chunk is plain integer arithmetic: no tz-aware datetime or
+timedelta objects and no per-placement dicts. Placements convert to the
+scheduler's event dicts once, after the loop (and to ISO strings only at
+the database boundary, see schedule_diff.serialize_event).
+
+Slot starts that are not on a whole minute are rounded up and slot ends
+rounded down, so a placement never overlaps the busy time around it.
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from api.scheduling.availability_bitmap import EPOCH
+
+# Placement kinds
+STUDY = 0
+CONTEXT_SWITCH = 1
+SHORT_BREAK = 2
+LONG_BREAK = 3
+
+BREAK_TITLES = {
+    CONTEXT_SWITCH: "Context Switch",
+    SHORT_BREAK: "Short Break",
+    LONG_BREAK: "Long Break",
+}
+BREAK_COLOR = "#95A5A6"  # Neutral gray for breaks
+
+# Float slack when turning hour fractions back into whole minutes
+_MINUTE_EPSILON = 1e-6
+
+
+def to_epoch_minutes(moment: datetime, round_up: bool = True) -> int:
+    """Whole minutes since the epoch, rounding partial minutes up (or down)."""
+    minutes = (moment - EPOCH).total_seconds() / 60
+    if round_up:
+        return math.ceil(minutes - _MINUTE_EPSILON)
+    return math.floor(minutes + _MINUTE_EPSILON)
+
+
+def from_epoch_minutes(minutes: int) -> datetime:
+    return EPOCH + timedelta(minutes=minutes)
+
+
+class Slot:
+    """A free slot: start (epoch minutes), length (minutes) and its energy score."""
+
+    __slots__ = ("start", "minutes", "energy")
+
+    def __init__(self, start: int, minutes: int, energy: float = 0.0):
+        self.start = start
+        self.minutes = minutes
+        self.energy = energy
+
+    @classmethod
+    def from_tuple(cls, slot: Tuple[datetime, float, float]) -> "Slot":
+        """Convert a (start_time, duration_hours, energy) slot."""
+        start_time, duration_hours, energy = slot
+        start_seconds = (start_time - EPOCH).total_seconds()
+        start = math.ceil(start_seconds / 60 - _MINUTE_EPSILON)
+        end = math.floor((start_seconds + duration_hours * 3600) / 60 + _MINUTE_EPSILON)
+        return cls(start, max(0, end - start), energy)
+
+
+class Placement:
+    """One scheduled block; `event` is the decomposed event it belongs to (breaks too)."""
+
+    __slots__ = ("kind", "start", "end", "event")
+
+    def __init__(self, kind: int, start: int, end: int, event: dict):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.event = event
+
+    def to_event(self) -> dict:
+        """The scheduler's event dict (times as UTC datetimes)."""
+        event = self.event
+        if self.kind == STUDY:
+            return {
+                "user_id": event["user_id"],
+                "task_id": event.get("task_id"),
+                "title": event.get("title", "Study Session"),
+                "description": event.get("description"),
+                "start_time": from_epoch_minutes(self.start),
+                "end_time": from_epoch_minutes(self.end),
+                "event_type": event.get("event_type", "study"),
+                "source": "scheduler",
+                "priority": event.get("priority"),
+                "subject": event.get("subject"),
+                "color_hex": event.get("color_hex")
+            }
+        return {
+            "user_id": event["user_id"],
+            "title": BREAK_TITLES[self.kind],
+            "event_type": "break",
+            "source": "scheduler",
+            "start_time": from_epoch_minutes(self.start),
+            "end_time": from_epoch_minutes(self.end),
+            "color_hex": BREAK_COLOR
+        }
@@ -0,0 +1,166 @@
+"""
+Scheduling result cache.
+
+Re-planning with nothing changed ("plan my week" twice) reruns the whole slot
+search and assignment for the same answer. Results are cached in a bounded
+LRU with a TTL, keyed by a fingerprint of everything the solver reads: busy
+intervals, parsed settings, the task set (plus the task rows and review dates
+used for importance), the scheduling window and the placement mode.
+
+The window is keyed to the hour, so a re-plan a few minutes later can hit.
+A hit is only served while the cached plan is still ahead of the clock (no
+block starts before the new "now") and fits the new window; otherwise it is
+recomputed. Because the fingerprint covers the inputs, a changed calendar
+can't be served a stale plan; writes in api/database.py still drop a user's
+entries (invalidate_user_schedules) so they don't linger until they expire.
+"""
+
+import hashlib
+import json
+from array import array
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from api.scheduling.context import ScheduleSnapshot
+
+SCHEDULE_CACHE_SIZE = int(os.getenv("SCHEDULE_CACHE_SIZE", "256"))  # 0 disables the cache
+SCHEDULE_CACHE_TTL_SECONDS = float(os.getenv("SCHEDULE_CACHE_TTL_SECONDS", "600"))
+
+
+@dataclass
+class _Entry:
+    user_id: int
+    expires_at: float
+    earliest_start: Optional[datetime]
+    latest_end: Optional[datetime]
+    events: List[dict]
+
+
+def _window_key(moment: datetime) -> str:
+    return moment.replace(minute=0, second=0, microsecond=0).isoformat()
+
+
+def schedule_fingerprint(
+    user_id: int,
+    tasks: List[dict],
+    start_date: datetime,
+    end_date: datetime,
+    snapshot: ScheduleSnapshot,
+    placement_mode: str
+) -> str:
+    """Stable hash of every input solve_schedule reads (window to the hour)."""
+    task_ids = sorted({t.get("id") for t in tasks if t.get("id") is not None})
+    given = {t.get("id"): t for t in tasks}
+    payload = {
+        "user_id": user_id,
+        "mode": placement_mode,
+        "start": _window_key(start_date) if start_date > snapshot.now else "now",
+        "end": _window_key(end_date),
+        "settings": snapshot.settings,
+        "tasks": sorted(tasks, key=lambda t: str(t.get("id"))),
+        # Stored rows only matter where they differ from the tasks passed in
+        "task_rows": [
+            row if (row := snapshot.tasks_map.get(task_id)) != given[task_id] else None
+            for task_id in task_ids
+        ],
+        "review_dates": {str(task_id): snapshot.review_dates.get(task_id) for task_id in task_ids},
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode())
+    # Busy time can be thousands of intervals: hash packed epoch seconds, not ISO strings
+    busy = sorted((start.timestamp(), end.timestamp()) for start, end in snapshot.busy)
+    digest.update(array("d", [bound for interval in busy for bound in interval]).tobytes())
+    return digest.hexdigest()
+
+
+class ScheduleCache:
+    """Thread-safe LRU + TTL cache of scheduled event lists, with hit/miss counters."""
+
+    def __init__(
+        self,
+        max_entries: int = SCHEDULE_CACHE_SIZE,
+        ttl_seconds: float = SCHEDULE_CACHE_TTL_SECONDS,
+        clock=time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str, now: datetime, window_end: datetime) -> Optional[List[dict]]:
+        """Cached events for key (copies), if fresh and still ahead of `now`."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            usable = (
+                entry is not None
+                and entry.expires_at > self._clock()
+                and (entry.earliest_start is None or entry.earliest_start >= now)
+                and (entry.latest_end is None or entry.latest_end <= window_end)
+            )
+            if not usable:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(event) for event in entry.events]
+
+    def put(self, key: str, user_id: int, events: List[dict]):
+        if not self.enabled:
+            return
+        entry = _Entry(
+            user_id=user_id,
+            expires_at=self._clock() + self.ttl_seconds,
+            earliest_start=min((e["start_time"] for e in events), default=None),
+            latest_end=max((e["end_time"] for e in events), default=None),
+            events=[dict(event) for event in events],
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: Optional[int] = None):
+        """Drop a user's entries (every entry when user_id is None)."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k, e in self._entries.items() if e.user_id == user_id]:
+                    del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "invalidations": self.invalidations,
+            }
+
+
+schedule_cache = ScheduleCache()
+
+
+def invalidate_user_schedules(user_id: Optional[int] = None):
+    """Drop cached schedules for a user (all users when the user isn't known)."""
+    schedule_cache.invalidate_user(user_id)
@@ -0,0 +1,108 @@
+"""
+Diff-and-apply for scheduler output.
+
+Instead of deleting every affected future event and reinserting the whole
+schedule, the new schedule is compared with the events it replaces by
+(task_id, start_time, end_time, event_type):
+- exact matches are left alone (no write, id unchanged)
+- moved events for the same task and type are updated in place, keeping their id
+- whatever is left becomes a batched insert or delete
+
+so a reschedule that mostly lands in the same place costs a handful of writes.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from api.scheduling.free_busy import parse_timestamp
+
+EventKey = Tuple[Optional[int], datetime, datetime, str]
+
+
+@dataclass
+class ScheduleDiff:
+    """Minimal set of writes turning the current events into the new schedule."""
+
+    inserts: List[dict] = field(default_factory=list)
+    updates: List[dict] = field(default_factory=list)  # full payloads including "id"
+    deletes: List[int] = field(default_factory=list)
+    unchanged: List[int] = field(default_factory=list)
+
+    @property
+    def write_count(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.write_count == 0
+
+
+def _as_datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else parse_timestamp(value)
+
+
+def event_key(event: dict) -> EventKey:
+    """Identity of a scheduled block: (task_id, start, end, event_type)."""
+    return (
+        event.get("task_id"),
+        _as_datetime(event["start_time"]),
+        _as_datetime(event["end_time"]),
+        event.get("event_type") or "study",
+    )
+
+
+def serialize_event(event: dict) -> dict:
+    """Event payload for the database (datetimes as ISO strings, helper fields dropped)."""
+    row = {}
+    for key, value in event.items():
+        if key in ("duration_minutes", "importance"):
+            continue
+        row[key] = value.isoformat() if isinstance(value, datetime) else value
+    return row
+
+
+def diff_schedule(current_events: Iterable[dict], new_events: Iterable[dict]) -> ScheduleDiff:
+    """
+    Compare stored events (with ids) against a freshly computed schedule.
+
+    Args:
+        current_events: Events the new schedule replaces (need id, task_id, start/end, event_type)
+        new_events: Scheduler output
+
+    Returns:
+        ScheduleDiff with inserts, in-place updates (stable ids) and deletes
+    """
+    diff = ScheduleDiff()
+
+    # Multiset of stored events by exact key
+    by_key: Dict[EventKey, List[dict]] = defaultdict(list)
+    for event in sorted(current_events, key=lambda e: _as_datetime(e["start_time"])):
+        by_key[event_key(event)].append(event)
+
+    unmatched_new = []
+    for event in new_events:
+        matches = by_key.get(event_key(event))
+        if matches:
+            diff.unchanged.append(matches.pop(0)["id"])
+        else:
+            unmatched_new.append(event)
+
+    # Leftover stored events can be moved to a new time if task and type agree
+    reusable: Dict[Tuple[Optional[int], str], List[dict]] = defaultdict(list)
+    for key, events in by_key.items():
+        reusable[(key[0], key[3])].extend(events)
+    for events in reusable.values():
+        events.sort(key=lambda e: _as_datetime(e["start_time"]))
+
+    for event in unmatched_new:
+        task_id, _, _, event_type = event_key(event)
+        candidates = reusable.get((task_id, event_type))
+        if candidates:
+            diff.updates.append({**serialize_event(event), "id": candidates.pop(0)["id"]})
+        else:
+            diff.inserts.append(serialize_event(event))
+
+    diff.deletes = [event["id"] for events in reusable.values() for event in events]
+    return diff
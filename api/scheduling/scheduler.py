@@ -11,17 +11,51 @@ This module implements the refined scheduling algorithm that:
 - Tracks cumulative study time for smart break insertion
 """
 
+import asyncio
+import bisect
+import heapq
 import math
 import logging
+import os
 from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 
 from api.database import get_supabase_client
+from api.scheduling.availability_bitmap import AvailabilityBitmap
+from api.scheduling.context import (
+    ScheduleSnapshot,
+    SchedulingContext,
+    fetch_latest_review_dates,
+    load_scheduling_context_async,
+    task_deadline,
+)
+from api.scheduling.energy import EnergyCurve
 from api.scheduling.event_decomposition import decompose_tasks_to_events
+from api.scheduling.feasibility import CapacityIndex, edf_infeasible
+from api.scheduling.free_busy import Interval, find_free_slots, parse_busy_intervals, parse_day_bounds
+from api.scheduling.placement import CONTEXT_SWITCH, LONG_BREAK, SHORT_BREAK, STUDY, Placement, Slot, to_epoch_minutes
+from api.scheduling.result_cache import schedule_cache, schedule_fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Slot discovery engine: "sweep" (sorted interval sweep) or "bitmap" (NumPy availability bitmap)
+SLOT_ENGINE = os.getenv("SCHEDULER_SLOT_ENGINE", "sweep")
+BITMAP_RESOLUTION_MINUTES = int(os.getenv("SCHEDULER_BITMAP_RESOLUTION_MINUTES", "5"))
+
+# Worker pool for CPU-bound slot assignment: "thread" or "process"
+SCHEDULER_POOL = os.getenv("SCHEDULER_POOL", "thread")
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "4"))
+_executor: Optional[Executor] = None
+
+# Minimum gap between two sessions of the same subject
+SAME_SUBJECT_SPACING = timedelta(hours=6)
+
+# Placement mode: "energy" (best-energy slots first) or "edf" (earliest deadline first,
+# energy as the tiebreak among slots before the deadline)
+PLACEMENT_MODE = os.getenv("SCHEDULER_PLACEMENT_MODE", "energy")
+
 # Priority-based urgency calculation (hours)
 PRIORITY_TIME_HOURS = {
     "high": 24,
@@ -36,10 +70,13 @@ def schedule_events(
     start_date: datetime,
     end_date: datetime,
     settings: dict,
-    db = None
+    db = None,
+    context: Optional[SchedulingContext] = None,
+    placement_mode: Optional[str] = None
 ) -> List[dict]:
     """
     Main scheduling function - assigns start/end times to tasks by creating calendar events.
+    Thin database-facing wrapper: gathers a ScheduleSnapshot and runs the pure solve_schedule core.
 
     Args:
         user_id: User ID
@@ -48,188 +85,367 @@ def schedule_events(
         end_date: End of scheduling window (UTC)
         settings: User settings including energy_levels, wake_time, sleep_time
         db: Database connection (defaults to supabase)
+        context: Preloaded SchedulingContext; when given, no database queries are made
+        placement_mode: "energy" or "edf" (defaults to SCHEDULER_PLACEMENT_MODE)
 
     Returns:
         List of scheduled events with start_time and end_time set
     """
-    if db is None:
-        db = get_supabase_client()
-    
     try:
-        # PHASE 1: Find empty time slots around existing events
-        empty_slots = get_empty_time_slots(user_id, start_date, end_date, settings, db)
-        energy_sorted_slots = assign_energy_and_sort(empty_slots, settings.get("energy_levels", {}))
-        
-        # PHASE 2: Decompose tasks into events with complete schema
-        events = decompose_tasks_to_events(tasks, settings)
-        
-        if not events:
-            logger.warning(f"No valid events created from {len(tasks)} tasks")
-            return []
-        
-        # Batch fetch all task data to avoid N+1 queries
-        task_ids = list(set(e.get("task_id") for e in events if e.get("task_id")))
-        tasks_map = {}
-        if task_ids:
-            try:
-                tasks_response = db.table("tasks").select("*").in_("id", task_ids).execute()
-                tasks_map = {t["id"]: t for t in (tasks_response.data or [])}
-            except Exception as e:
-                logger.error(f"Failed to batch fetch tasks: {e}")
+        if context is not None:
+            snapshot = context.snapshot(start_date, end_date, settings)
+        else:
+            snapshot = load_schedule_snapshot(user_id, tasks, start_date, end_date, settings, db)
         
-        # Group by subject and calculate importance
-        subject_buckets = group_events_by_subject(events, tasks_map)
-        calculate_importance_for_all_events(subject_buckets, tasks_map, db)
-        sort_events_within_each_bucket(subject_buckets)
-        
-        # PHASE 3: Assign events to slots with interleaving
-        scheduled_events = assign_events_to_slots(subject_buckets, energy_sorted_slots, settings, db)
+        # Identical re-plans are served from the result cache
+        placement_mode = placement_mode or PLACEMENT_MODE
+        key, cached = lookup_cached_schedule(user_id, tasks, start_date, end_date, snapshot, placement_mode)
+        if cached is not None:
+            return cached
         
         # Return scheduled events (to be inserted by caller)
-        return scheduled_events
+        schedule = solve_schedule(tasks, start_date, end_date, snapshot, placement_mode)
+        if key is not None:
+            schedule_cache.put(key, user_id, schedule)
+        return schedule
         
     except Exception as e:
         logger.error(f"Error in schedule_events: {e}")
         raise
 
 
+def load_schedule_snapshot(
+    user_id: int,
+    tasks: list[Dict],
+    start_date: datetime,
+    end_date: datetime,
+    settings: dict,
+    db = None
+) -> ScheduleSnapshot:
+    """
+    Query what solve_schedule needs for these tasks in batched calls:
+    busy intervals for the window, parent task rows and latest review dates.
+    """
+    if db is None:
+        db = get_supabase_client()
+    now = datetime.now(timezone.utc)
+    
+    # All calendar events overlapping the window are treated as blocking time
+    busy = fetch_busy_intervals(user_id, max(now, start_date), end_date, db)
+    
+    # Batch fetch all task data to avoid N+1 queries
+    task_ids = list(set(t.get("id") for t in tasks if t.get("id")))
+    tasks_map = {}
+    if task_ids:
+        try:
+            tasks_response = db.table("tasks").select("*").in_("id", task_ids).execute()
+            tasks_map = {t["id"]: t for t in (tasks_response.data or [])}
+        except Exception as e:
+            logger.error(f"Failed to batch fetch tasks: {e}")
+    
+    # Batch fetch latest review dates for review tasks (same N+1 avoidance)
+    review_task_ids = list(set(
+        t.get("id") for t in tasks
+        if t.get("event_type") == "review" and t.get("id")
+    ))
+    review_dates_map = fetch_latest_review_dates(review_task_ids, db)
+    
+    return ScheduleSnapshot(
+        busy=tuple(busy),
+        settings=settings,
+        now=now,
+        tasks_map=tasks_map,
+        review_dates=review_dates_map,
+    )
+
+
+def solve_schedule(
+    tasks: list[Dict],
+    start_date: datetime,
+    end_date: datetime,
+    snapshot: ScheduleSnapshot,
+    placement_mode: Optional[str] = None
+) -> List[dict]:
+    """
+    Pure scheduling core: no database access and no clock reads, so the same
+    snapshot always produces the same schedule (safe to cache, benchmark or
+    run in a process pool).
+
+    Args:
+        tasks: Task rows to schedule (each needs id, user_id and estimated_duration)
+        start_date: Start of scheduling window (clamped to snapshot.now)
+        end_date: End of scheduling window
+        snapshot: Busy intervals, parsed settings, task/review data and the current time
+        placement_mode: "energy" or "edf" (defaults to SCHEDULER_PLACEMENT_MODE)
+
+    Returns:
+        List of scheduled events (including breaks) with start_time and end_time set
+    """
+    settings = snapshot.settings
+    
+    # PHASE 1: Find empty time slots around busy time, best energy first
+    window_start = max(snapshot.now, start_date)
+    empty_slots = compute_free_slots(list(snapshot.busy), window_start, end_date, settings)
+    energy_sorted_slots = assign_energy_and_sort(empty_slots, snapshot.energy_curve())
+    
+    # PHASE 2: Decompose tasks into events with complete schema
+    events = decompose_tasks_to_events(tasks, settings)
+    
+    if not events:
+        logger.warning(f"No valid events created from {len(tasks)} tasks")
+        return []
+    
+    # Group by subject and calculate importance
+    subject_buckets = group_events_by_subject(events, snapshot.tasks_map)
+    calculate_importance_for_all_events(subject_buckets, snapshot.tasks_map, snapshot.review_dates, snapshot.now)
+    sort_events_within_each_bucket(subject_buckets)
+    
+    # PHASE 3: Assign events to slots with interleaving (or deadline first)
+    if (placement_mode or PLACEMENT_MODE) == "edf":
+        deadlines = {task.get("id"): task_deadline(task) for task in tasks}
+        return assign_events_by_deadline(subject_buckets, energy_sorted_slots, settings, deadlines)
+    return assign_events_to_slots(subject_buckets, energy_sorted_slots, settings)
+
+
+def find_infeasible_tasks(
+    tasks: list[Dict],
+    start_date: datetime,
+    end_date: datetime,
+    snapshot: ScheduleSnapshot
+) -> List[dict]:
+    """
+    Tasks that can't all meet their deadlines in the snapshot's free time
+    (earliest-deadline-first check), so callers can report them before placing.
+    """
+    window_start = max(snapshot.now, start_date)
+    empty_slots = compute_free_slots(list(snapshot.busy), window_start, end_date, snapshot.settings)
+    return edf_infeasible(tasks, CapacityIndex(empty_slots, end_date))
+
+
+async def schedule_events_async(
+    user_id: int,
+    tasks: list[Dict],
+    start_date: datetime,
+    end_date: datetime,
+    settings: Optional[dict] = None,
+    context: Optional[SchedulingContext] = None,
+    placement_mode: Optional[str] = None
+) -> List[dict]:
+    """
+    Async scheduling entry point that never blocks the event loop.
+
+    Loads the SchedulingContext concurrently (if not given), then runs the
+    pure solve_schedule core on the scheduler worker pool. The worker only
+    receives a plain ScheduleSnapshot, so it also works with a process pool.
+
+    Args:
+        settings: User settings (defaults to the context's parsed settings)
+        context: Preloaded SchedulingContext
+        placement_mode: "energy" or "edf" (defaults to SCHEDULER_PLACEMENT_MODE)
+
+    Returns:
+        List of scheduled events with start_time and end_time set
+    """
+    if context is None:
+        context = await load_scheduling_context_async(user_id, extra_tasks=tasks)
+
+    # Only the plain snapshot crosses into the worker
+    snapshot = context.snapshot(start_date, end_date, settings)
+    placement_mode = placement_mode or PLACEMENT_MODE
+    key, cached = lookup_cached_schedule(user_id, tasks, start_date, end_date, snapshot, placement_mode)
+    if cached is not None:
+        return cached
+    
+    loop = asyncio.get_running_loop()
+    schedule = await loop.run_in_executor(
+        get_scheduler_executor(),
+        solve_schedule,
+        tasks,
+        start_date,
+        end_date,
+        snapshot,
+        placement_mode
+    )
+    if key is not None:
+        schedule_cache.put(key, user_id, schedule)
+    return schedule
+
+
+def lookup_cached_schedule(
+    user_id: int,
+    tasks: list[Dict],
+    start_date: datetime,
+    end_date: datetime,
+    snapshot: ScheduleSnapshot,
+    placement_mode: str
+) -> Tuple[Optional[str], Optional[List[dict]]]:
+    """
+    Fingerprint a scheduling run and look it up in the result cache.
+
+    Returns:
+        (cache key or None when caching is off, cached events or None on a miss)
+    """
+    if not schedule_cache.enabled:
+        return None, None
+    key = schedule_fingerprint(user_id, tasks, start_date, end_date, snapshot, placement_mode)
+    return key, schedule_cache.get(key, snapshot.now, end_date)
+
+
+def get_scheduler_executor() -> Executor:
+    """Shared worker pool for scheduling runs (created on first use)."""
+    global _executor
+    if _executor is None:
+        if SCHEDULER_POOL == "process":
+            _executor = ProcessPoolExecutor(max_workers=SCHEDULER_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=SCHEDULER_WORKERS, thread_name_prefix="scheduler")
+    return _executor
+
+
+def shutdown_scheduler_executor():
+    """Stop the scheduler worker pool (called on app shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
 def get_empty_time_slots(
     user_id: int,
     start_date: datetime,
     end_date: datetime,
     settings: dict,
-    db
+    db,
+    bitmap: Optional[AvailabilityBitmap] = None,
+    engine: Optional[str] = None
 ) -> List[Tuple[datetime, float]]:
     """
     Find empty time slots by treating all existing calendar events as blocked time.
-    Only considers events that start after 'now'.
+    Only considers time after 'now'; uses the free/busy sweep so the whole
+    window is resolved in one pass over the (sorted) events.
+    
+    Args:
+        bitmap: Prebuilt availability bitmap; when given, slots are read from it without querying
+        engine: "sweep" or "bitmap" (defaults to SCHEDULER_SLOT_ENGINE)
     
     Returns:
         List of (slot_start_time, duration_hours) tuples
     """
     try:
-        now = datetime.now(timezone.utc)
+        if bitmap is not None:
+            return bitmap.free_slots()
         
-        # Get all calendar events that start after now (all events are treated as blocking time)
-        response = db.table("calendar_events") \
-            .select("start_time, end_time") \
-            .eq("user_id", user_id) \
-            .gte("start_time", max(now, start_date).isoformat()) \
-            .lte("end_time", end_date.isoformat()) \
-            .order("start_time") \
-            .execute()
+        if (engine or SLOT_ENGINE) == "bitmap":
+            return build_availability_bitmap(user_id, start_date, end_date, settings, db).free_slots()
         
-        existing_events = response.data if response.data else []
-        
-        # Convert to datetime objects
-        for event in existing_events:
-            event["start_time"] = datetime.fromisoformat(event["start_time"].replace("Z", "+00:00"))
-            event["end_time"] = datetime.fromisoformat(event["end_time"].replace("Z", "+00:00"))
-        
-        empty_slots = []
-        
-        # Get wake/sleep times with error handling
-        try:
-            wake_time_str = settings.get("wake_time", "07:00")
-            sleep_time_str = settings.get("sleep_time", "23:00")
-            wake_hour, wake_min = map(int, wake_time_str.split(":"))
-            sleep_hour, sleep_min = map(int, sleep_time_str.split(":"))
-        except (ValueError, AttributeError) as e:
-            logger.warning(f"Invalid wake/sleep time format: {e}, using defaults")
-            wake_hour, wake_min = 7, 0
-            sleep_hour, sleep_min = 23, 0
-        
-        min_study_minutes = settings.get("min_study_duration", 15)
-        
-        # Generate daily slots for the entire date range
-        current_date = max(now, start_date).date()
-        end_date_only = end_date.date()
+        now = datetime.now(timezone.utc)
+        window_start = max(now, start_date)
         
-        while current_date <= end_date_only:
-            # Daily wake and sleep times
-            day_start = datetime.combine(current_date, datetime.min.time()).replace(
-                hour=wake_hour, minute=wake_min, tzinfo=timezone.utc
-            )
-            day_end = datetime.combine(current_date, datetime.min.time()).replace(
-                hour=sleep_hour, minute=sleep_min, tzinfo=timezone.utc
-            )
-            
-            # Find gaps for this day
-            day_events = [e for e in existing_events if e["start_time"].date() == current_date]
-            
-            if not day_events:
-                # Entire day available
-                duration_hours = (day_end - day_start).total_seconds() / 3600
-                if duration_hours * 60 >= min_study_minutes:
-                    empty_slots.append((day_start, duration_hours))
-            else:
-                # Gap before first event
-                first_event = day_events[0]
-                if day_start < first_event["start_time"]:
-                    gap_minutes = (first_event["start_time"] - day_start).total_seconds() / 60
-                    if gap_minutes >= min_study_minutes:
-                        empty_slots.append((day_start, gap_minutes / 60))
-                
-                # Gaps between consecutive events
-                for i in range(len(day_events) - 1):
-                    gap_start = day_events[i]["end_time"]
-                    gap_end = day_events[i + 1]["start_time"]
-                    gap_minutes = (gap_end - gap_start).total_seconds() / 60
-                    
-                    if gap_minutes >= min_study_minutes:
-                        empty_slots.append((gap_start, gap_minutes / 60))
-                
-                # Gap after last event
-                last_event = day_events[-1]
-                if last_event["end_time"] < day_end:
-                    gap_minutes = (day_end - last_event["end_time"]).total_seconds() / 60
-                    if gap_minutes >= min_study_minutes:
-                        empty_slots.append((last_event["end_time"], gap_minutes / 60))
-            
-            current_date += timedelta(days=1)
+        # All calendar events overlapping the window are treated as blocking time
+        busy = fetch_busy_intervals(user_id, window_start, end_date, db)
         
-        return empty_slots
+        return compute_free_slots(busy, window_start, end_date, settings, engine="sweep")
         
     except Exception as e:
         logger.error(f"Error in get_empty_time_slots: {e}")
         return []
 
 
+def compute_free_slots(
+    busy: List[Interval],
+    window_start: datetime,
+    window_end: datetime,
+    settings: dict,
+    engine: Optional[str] = None
+) -> List[Tuple[datetime, float]]:
+    """
+    Free slots for already-loaded busy intervals (no database access).
+    Applies the user's wake/sleep bounds and min_study_duration with the configured engine.
+    
+    Returns:
+        List of (slot_start_time, duration_hours) tuples
+    """
+    wake, sleep = parse_day_bounds(settings)
+    min_study_minutes = settings.get("min_study_duration", 15)
+    
+    if (engine or SLOT_ENGINE) == "bitmap":
+        return AvailabilityBitmap.build(
+            busy, window_start, window_end, wake, sleep, min_study_minutes, BITMAP_RESOLUTION_MINUTES
+        ).free_slots()
+    
+    return find_free_slots(busy, window_start, window_end, wake, sleep, min_study_minutes)
+
+
+def build_availability_bitmap(
+    user_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    settings: dict,
+    db,
+    resolution_minutes: int = BITMAP_RESOLUTION_MINUTES
+) -> AvailabilityBitmap:
+    """
+    Build the user's availability bitmap for the window (one cell per resolution_minutes).
+    Wake/sleep bounds, busy events and min_study_duration are all applied as array ops.
+    """
+    window_start = max(datetime.now(timezone.utc), start_date)
+    busy = fetch_busy_intervals(user_id, window_start, end_date, db)
+    wake, sleep = parse_day_bounds(settings)
+    
+    return AvailabilityBitmap.build(
+        busy,
+        window_start,
+        end_date,
+        wake,
+        sleep,
+        settings.get("min_study_duration", 15),
+        resolution_minutes
+    )
+
+
+def fetch_busy_intervals(
+    user_id: int,
+    start_date: datetime,
+    end_date: datetime,
+    db
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Fetch (start, end) intervals of every calendar event overlapping the window.
+    Uses overlap logic so events already in progress or spanning midnight still block time.
+    """
+    response = db.table("calendar_events") \
+        .select("start_time, end_time") \
+        .eq("user_id", user_id) \
+        .lt("start_time", end_date.isoformat()) \
+        .gt("end_time", start_date.isoformat()) \
+        .order("start_time") \
+        .execute()
+    
+    return parse_busy_intervals(response.data or [])
+
+
 def assign_energy_and_sort(
-    empty_slots: List[Tuple[datetime, float]],
-    energy_levels: dict
+    empty_slots: Union[List[Tuple[datetime, float]], AvailabilityBitmap],
+    energy_levels: Union[dict, str, EnergyCurve]
 ) -> List[Tuple[datetime, float, float]]:
     """
     Calculate average energy for each slot and sort by energy descending.
+    Energy is minute-weighted via the compiled EnergyCurve (O(1) per slot).
     
     Args:
-        empty_slots: List of (start_time, duration_hours)
-        energy_levels: JSONB like {"8": 0.3, "9": 0.5, ..., "23": 0.8}
+        empty_slots: List of (start_time, duration_hours), or an AvailabilityBitmap
+        energy_levels: JSONB like {"8": 0.3, "9": 0.5, ..., "23": 0.8}, or a compiled EnergyCurve
     
     Returns:
         List of (start_time, duration_hours, avg_energy) sorted by energy
     """
-    slots_with_energy = []
+    if isinstance(empty_slots, AvailabilityBitmap):
+        empty_slots = empty_slots.free_slots()
     
-    for start_time, duration_hours in empty_slots:
-        hour_of_day = start_time.hour
-        end_hour = (start_time + timedelta(hours=duration_hours)).hour
-        
-        # Average energy during this slot
-        energy_sum = 0
-        hour_count = 0
-        
-        for h in range(hour_of_day, end_hour + 1):
-            hour_key = str(h)
-            if hour_key in energy_levels:
-                energy_sum += energy_levels[hour_key]
-                hour_count += 1
-        
-        avg_energy = energy_sum / hour_count if hour_count > 0 else 0.5
-        slots_with_energy.append((start_time, duration_hours, avg_energy))
+    curve = energy_levels if isinstance(energy_levels, EnergyCurve) else EnergyCurve(energy_levels)
     
     # Sort by energy descending (best slots first)
-    return sorted(slots_with_energy, key=lambda x: x[2], reverse=True)
+    return curve.rank_slots(empty_slots)
 
 
 def group_events_by_subject(events: List[dict], tasks_map: dict) -> Dict[str, List[dict]]:
@@ -257,17 +473,28 @@ def group_events_by_subject(events: List[dict], tasks_map: dict) -> Dict[str, Li
     return buckets
 
 
-def calculate_importance_for_all_events(subject_buckets: Dict[str, List[dict]], tasks_map: dict, db):
-    """Calculate importance score for all events (modifies in-place). Uses tasks_map to avoid N+1 queries."""
+def calculate_importance_for_all_events(
+    subject_buckets: Dict[str, List[dict]],
+    tasks_map: dict,
+    review_dates_map: Dict[int, datetime],
+    now: Optional[datetime] = None
+):
+    """Calculate importance score for all events (modifies in-place). Uses prefetched maps to avoid N+1 queries."""
+    now = now or datetime.now(timezone.utc)
     for subject, events in subject_buckets.items():
         for event in events:
-            event["importance"] = calculate_event_importance(event, tasks_map, db)
+            event["importance"] = calculate_event_importance(event, tasks_map, review_dates_map, now)
 
 
-def calculate_event_importance(event: dict, tasks_map: dict, db) -> float:
+def calculate_event_importance(
+    event: dict,
+    tasks_map: dict,
+    review_dates_map: Dict[int, datetime],
+    now: Optional[datetime] = None
+) -> float:
     """
     Calculate importance score with implicit review boost.
-    Uses pre-fetched tasks_map to avoid database queries.
+    Uses pre-fetched tasks_map and review_dates_map to avoid database queries.
     
     Returns:
         Importance score (higher = more important)
@@ -285,23 +512,12 @@ def calculate_event_importance(event: dict, tasks_map: dict, db) -> float:
     
     difficulty_score = math.log(1 + difficulty) * 20
     
-    # IMPLICIT REVIEW BOOST
+    # IMPLICIT REVIEW BOOST (latest review date per task is prefetched)
     review_boost = 0
-    if event.get("event_type") == "review" and task_id:
-        try:
-            review_response = db.table("review_sessions") \
-                .select("scheduled_date") \
-                .eq("task_id", task_id) \
-                .order("scheduled_date", desc=True) \
-                .limit(1) \
-                .execute()
-            
-            if review_response.data:
-                scheduled_date = datetime.fromisoformat(review_response.data[0]["scheduled_date"].replace("Z", "+00:00"))
-                days_overdue = max(0, (datetime.now(timezone.utc) - scheduled_date).days)
-                review_boost = days_overdue * 100
-        except Exception as e:
-            logger.warning(f"Failed to fetch review session for task {task_id}: {e}")
+    if event.get("event_type") == "review" and task_id in review_dates_map:
+        now = now or datetime.now(timezone.utc)
+        days_overdue = max(0, (now - review_dates_map[task_id]).days)
+        review_boost = days_overdue * 100
     
     return urgency + difficulty_score + review_boost
 
@@ -316,28 +532,53 @@ def assign_events_to_slots(
     subject_buckets: Dict[str, List[dict]],
     energy_sorted_slots: List[Tuple[datetime, float, float]],
     settings: dict,
-    db
+    db = None
 ) -> List[dict]:
     """
     Core interleaving algorithm with spacing and break logic.
     
+    Slots are converted to integer epoch minutes up front and placed with
+    assign_placements; datetimes are rebuilt once per placement at the end.
+    
     Returns:
         List of scheduled events (including breaks) with start_time and end_time
     """
-    scheduled_events = []
+    slots = [Slot.from_tuple(slot) for slot in energy_sorted_slots]
+    return [placement.to_event() for placement in assign_placements(subject_buckets, slots, settings)]
+
+
+def assign_placements(
+    subject_buckets: Dict[str, List[dict]],
+    slots: List[Slot],
+    settings: dict
+) -> List[Placement]:
+    """
+    Interleave subject events into slots (best energy first), all in integer minutes.
+    
+    Subjects still waiting out the 6-hour spacing window sit in a heap keyed by
+    (next eligible minute, subject order); eligible subjects sit in a sorted index
+    list, so the next round-robin pick is a bisect instead of a scan over every
+    subject. Produces exactly the same schedule as a linear round-robin.
+    
+    Returns:
+        Placements (study blocks and breaks) in the order they were made
+    """
+    placements = []
     
     # Convert to queues
-    subject_queues = {subject: deque(events) for subject, events in subject_buckets.items()}
-    subject_names = list(subject_queues.keys())
+    subject_queues = [deque(events) for events in subject_buckets.values()]
+    subject_count = len(subject_queues)
     
-    if not subject_names:
+    if not subject_count:
         return []
     
     # Tracking
-    subject_last_time = {}
     current_subject_idx = 0
-    previous_subject = None
+    previous_subject_idx = None
     cumulative_study_time = 0  # Track for break logic
+    active_subjects = [i for i, queue in enumerate(subject_queues) if queue]
+    subject_eligible_at = [-math.inf] * subject_count
+    spacing = int(SAME_SUBJECT_SPACING.total_seconds() // 60)
     
     # Settings with defaults
     max_study_duration = settings.get("max_study_duration", 90)
@@ -346,131 +587,250 @@ def assign_events_to_slots(
     long_study_threshold = settings.get("long_study_threshold", 120)
     
     # Iterate through slots (best energy first)
-    for slot_start_time, slot_duration_hours, energy in energy_sorted_slots:
-        remaining_minutes = slot_duration_hours * 60
-        current_time = slot_start_time
+    for slot in slots:
+        if not active_subjects:
+            break
+        
+        remaining_minutes = slot.minutes
+        current_time = slot.start
         
-        while remaining_minutes > 0 and any(len(q) > 0 for q in subject_queues.values()):
-            scheduled_this_round = False
-            attempts = 0
+        # Slots are in energy order, not time order, so eligibility is rebuilt per slot
+        ready = [i for i in active_subjects if subject_eligible_at[i] <= current_time]  # sorted indices
+        waiting = [(subject_eligible_at[i], i) for i in active_subjects if subject_eligible_at[i] > current_time]
+        heapq.heapify(waiting)
+        
+        while remaining_minutes > 0:
+            # Release subjects whose spacing window has passed
+            while waiting and waiting[0][0] <= current_time:
+                bisect.insort(ready, heapq.heappop(waiting)[1])
             
-            # Round-robin through subjects
-            while attempts < len(subject_names) and not scheduled_this_round:
-                subject = subject_names[current_subject_idx]
-                
-                # Skip if no events for this subject
-                if not subject_queues[subject]:
-                    current_subject_idx = (current_subject_idx + 1) % len(subject_names)
-                    attempts += 1
-                    continue
-                
-                # Check 6-hour spacing constraint
-                if subject in subject_last_time:
-                    hours_since = (current_time - subject_last_time[subject]).total_seconds() / 3600
-                    
-                    if hours_since < 6:
-                        # Too soon! Try next subject
-                        current_subject_idx = (current_subject_idx + 1) % len(subject_names)
-                        attempts += 1
-                        continue
-                
-                # Can schedule this subject!
-                event = subject_queues[subject][0]
-                
-                # Context switching buffer (10 minutes)
-                if previous_subject is not None and previous_subject != subject and remaining_minutes >= 10:
-                    # Add break event to return array (not DB)
-                    scheduled_events.append({
-                        "user_id": event["user_id"],
-                        "title": "Context Switch",
-                        "event_type": "break",
-                        "source": "scheduler",
-                        "start_time": current_time,
-                        "end_time": current_time + timedelta(minutes=10),
-                        "color_hex": "#95A5A6"  # Neutral gray for breaks
-                    })
-                    
-                    current_time += timedelta(minutes=10)
-                    remaining_minutes -= 10
-                
-                # Schedule the event
-                duration_to_schedule = min(
-                    event["duration_minutes"],
-                    remaining_minutes,
-                    max_study_duration
-                )
-                
-                # Create event payload matching schema
-                scheduled_events.append({
-                    "user_id": event["user_id"],
-                    "task_id": event.get("task_id"),
-                    "title": event.get("title", "Study Session"),
-                    "description": event.get("description"),
-                    "start_time": current_time,
-                    "end_time": current_time + timedelta(minutes=duration_to_schedule),
-                    "event_type": event.get("event_type", "study"),
-                    "source": "scheduler",
-                    "priority": event.get("priority"),
-                    "subject": event.get("subject"),
-                    "color_hex": event.get("color_hex")
-                })
-                
-                # Update state
-                event["duration_minutes"] -= duration_to_schedule
-                current_time += timedelta(minutes=duration_to_schedule)
-                remaining_minutes -= duration_to_schedule
-                
-                # Remove if fully scheduled
-                if event["duration_minutes"] <= 0:
-                    subject_queues[subject].popleft()
-                
-                # Update tracking
-                subject_last_time[subject] = current_time
-                previous_subject = subject
-                current_subject_idx = (current_subject_idx + 1) % len(subject_names)
-                scheduled_this_round = True
-                
-                # Track cumulative study time for break logic
-                cumulative_study_time += duration_to_schedule
+            # Couldn't schedule anything this round, move to next slot
+            if not ready:
+                break
+            
+            # Next eligible subject in round-robin order
+            pos = bisect.bisect_left(ready, current_subject_idx)
+            subject_idx = ready.pop(pos if pos < len(ready) else 0)
+            queue = subject_queues[subject_idx]
+            event = queue[0]
+            
+            # Context switching buffer (10 minutes)
+            if previous_subject_idx is not None and previous_subject_idx != subject_idx and remaining_minutes >= 10:
+                placements.append(Placement(CONTEXT_SWITCH, current_time, current_time + 10, event))
+                current_time += 10
+                remaining_minutes -= 10
+            
+            # Schedule the event
+            duration_to_schedule = min(
+                event["duration_minutes"],
+                remaining_minutes,
+                max_study_duration
+            )
+            placements.append(Placement(STUDY, current_time, current_time + duration_to_schedule, event))
+            
+            # Update state
+            event["duration_minutes"] -= duration_to_schedule
+            current_time += duration_to_schedule
+            remaining_minutes -= duration_to_schedule
+            
+            # Remove if fully scheduled
+            if event["duration_minutes"] <= 0:
+                queue.popleft()
+            
+            # Update tracking
+            previous_subject_idx = subject_idx
+            current_subject_idx = (subject_idx + 1) % subject_count
+            
+            subject_eligible_at[subject_idx] = current_time + spacing
+            if queue:
+                heapq.heappush(waiting, (subject_eligible_at[subject_idx], subject_idx))
+            else:
+                active_subjects.remove(subject_idx)
+            
+            # Track cumulative study time for break logic
+            cumulative_study_time += duration_to_schedule
+            
+            # Insert appropriate break based on cumulative study time
+            if remaining_minutes >= short_break:
+                # Long break after extended study (threshold exceeded)
+                if cumulative_study_time >= long_study_threshold:
+                    if remaining_minutes >= long_break:
+                        placements.append(Placement(LONG_BREAK, current_time, current_time + long_break, event))
+                        current_time += long_break
+                        remaining_minutes -= long_break
+                        cumulative_study_time = 0  # Reset after long break
                 
-                # Insert appropriate break based on cumulative study time
-                should_insert_break = remaining_minutes >= short_break
+                # Short break for regular study sessions
+                else:
+                    placements.append(Placement(SHORT_BREAK, current_time, current_time + short_break, event))
+                    current_time += short_break
+                    remaining_minutes -= short_break
+    
+    return placements
+
+
+def assign_events_by_deadline(
+    subject_buckets: Dict[str, List[dict]],
+    energy_sorted_slots: List[Tuple[datetime, float, float]],
+    settings: dict,
+    deadlines: Dict[int, Optional[datetime]]
+) -> List[dict]:
+    """
+    Deadline-aware ("edf") counterpart of assign_events_to_slots.
+    
+    Returns:
+        List of scheduled events (including breaks) with start_time and end_time
+    """
+    slots = [Slot.from_tuple(slot) for slot in energy_sorted_slots]
+    deadline_minutes = {
+        task_id: to_epoch_minutes(deadline, round_up=False)
+        for task_id, deadline in deadlines.items() if deadline is not None
+    }
+    placements = assign_placements_by_deadline(subject_buckets, slots, settings, deadline_minutes)
+    return [placement.to_event() for placement in placements]
+
+
+def assign_placements_by_deadline(
+    subject_buckets: Dict[str, List[dict]],
+    slots: List[Slot],
+    settings: dict,
+    deadlines: Dict[int, int]
+) -> List[Placement]:
+    """
+    Earliest-deadline-first placement with energy as the tiebreak.
+    
+    Events are taken in deadline order (most important first within a deadline,
+    no deadline last). Each goes into the highest-energy slot that starts before
+    its deadline, with blocks clipped to end by it. Slots become candidates as
+    the deadline sweep passes their start, so a heap of slot ranks replaces a
+    scan. Same-subject spacing, context switches and breaks follow the energy
+    mode. Work that can't be placed before its deadline is placed late, in the
+    best remaining slots, after every on-time event.
+    
+    Args:
+        subject_buckets: Events grouped by subject, sorted by importance
+        slots: Free slots, best energy first (consumed from the front)
+        settings: User settings (study/break durations)
+        deadlines: Task id -> deadline in epoch minutes (tasks without one omitted)
+    
+    Returns:
+        Placements (study blocks and breaks) in the order they were made
+    """
+    placements = []
+    
+    # Events in deadline order; stable sort keeps the importance order within a deadline
+    events = [(subject, event) for subject, bucket in subject_buckets.items() for event in bucket]
+    events.sort(key=lambda item: (deadlines.get(item[1].get("task_id"), math.inf), -item[1].get("importance", 0)))
+    
+    # Slots are identified by energy rank (index into slots); per-slot tracking for breaks
+    by_start = sorted(range(len(slots)), key=lambda rank: slots[rank].start)
+    released = 0
+    candidates = []  # heap of ranks: best energy on top
+    last_subject = [None] * len(slots)
+    cumulative_study_time = [0] * len(slots)
+    subject_blocks = {}  # subject -> sorted (start, end) study blocks
+    spacing = int(SAME_SUBJECT_SPACING.total_seconds() // 60)
+    
+    # Settings with defaults
+    max_study_duration = settings.get("max_study_duration", 90)
+    short_break = settings.get("short_break", 5)
+    long_break = settings.get("long_break", 25)
+    long_study_threshold = settings.get("long_study_threshold", 120)
+    
+    def spaced(subject, start, end):
+        """Whether a study block keeps the spacing window to the subject's other blocks."""
+        blocks = subject_blocks.get(subject, [])
+        idx = bisect.bisect_left(blocks, (start, end))
+        if idx > 0 and blocks[idx - 1][1] + spacing > start:
+            return False
+        return idx == len(blocks) or end + spacing <= blocks[idx][0]
+    
+    # Slots too close to the current subject's blocks; they stay too close while the
+    # same subject keeps placing (its blocks only grow), so they are not re-examined
+    too_close = []
+    too_close_subject = None
+    
+    def place(subject, event, limit):
+        """Place as much of event as fits before limit; returns True if fully placed."""
+        nonlocal too_close_subject
+        if subject != too_close_subject:
+            for rank in too_close:
+                heapq.heappush(candidates, rank)
+            too_close.clear()
+            too_close_subject = subject
+        
+        while event["duration_minutes"] > 0:
+            past_limit = []
+            chosen = None
+            while candidates:
+                rank = heapq.heappop(candidates)
+                slot = slots[rank]
+                if slot.minutes <= 0 or (last_subject[rank] is not None and slot.minutes <= 10):
+                    continue  # exhausted (no room after a context switch), drop for good
                 
-                if should_insert_break:
-                    # Long break after extended study (threshold exceeded)
-                    if cumulative_study_time >= long_study_threshold:
-                        if remaining_minutes >= long_break:
-                            scheduled_events.append({
-                                "user_id": event["user_id"],
-                                "title": "Long Break",
-                                "event_type": "break",
-                                "source": "scheduler",
-                                "start_time": current_time,
-                                "end_time": current_time + timedelta(minutes=long_break),
-                                "color_hex": "#95A5A6"  # Neutral gray for breaks
-                            })
-                            
-                            current_time += timedelta(minutes=long_break)
-                            remaining_minutes -= long_break
-                            cumulative_study_time = 0  # Reset after long break
-                    
-                    # Short break for regular study sessions
-                    else:
-                        scheduled_events.append({
-                            "user_id": event["user_id"],
-                            "title": "Short Break",
-                            "event_type": "break",
-                            "source": "scheduler",
-                            "start_time": current_time,
-                            "end_time": current_time + timedelta(minutes=short_break),
-                            "color_hex": "#95A5A6"  # Neutral gray for breaks
-                        })
-                        
-                        current_time += timedelta(minutes=short_break)
-                        remaining_minutes -= short_break
+                switch = 10 if last_subject[rank] not in (None, subject) else 0
+                start = slot.start + switch
+                duration = min(event["duration_minutes"], slot.minutes - switch, max_study_duration, limit - start)
+                if duration <= 0:
+                    past_limit.append(rank)
+                elif spaced(subject, start, start + duration):
+                    chosen = (rank, switch, start, duration)
+                    break
+                else:
+                    too_close.append(rank)
             
-            # Couldn't schedule anything this round, move to next slot
-            if not scheduled_this_round:
-                break
+            for rank in past_limit:
+                heapq.heappush(candidates, rank)
+            if chosen is None:
+                return False
+            
+            rank, switch, start, duration = chosen
+            slot = slots[rank]
+            if switch:
+                placements.append(Placement(CONTEXT_SWITCH, slot.start, start, event))
+            placements.append(Placement(STUDY, start, start + duration, event))
+            bisect.insort(subject_blocks.setdefault(subject, []), (start, start + duration))
+            
+            # Update state
+            event["duration_minutes"] -= duration
+            slot.start = start + duration
+            slot.minutes -= switch + duration
+            last_subject[rank] = subject
+            cumulative_study_time[rank] += duration
+            
+            # Insert appropriate break based on cumulative study time in this slot
+            if slot.minutes >= short_break:
+                if cumulative_study_time[rank] >= long_study_threshold:
+                    if slot.minutes >= long_break:
+                        placements.append(Placement(LONG_BREAK, slot.start, slot.start + long_break, event))
+                        slot.start += long_break
+                        slot.minutes -= long_break
+                        cumulative_study_time[rank] = 0  # Reset after long break
+                else:
+                    placements.append(Placement(SHORT_BREAK, slot.start, slot.start + short_break, event))
+                    slot.start += short_break
+                    slot.minutes -= short_break
+            
+            if slot.minutes > 0:
+                heapq.heappush(candidates, rank)
+        return True
+    
+    late = []
+    for subject, event in events:
+        limit = deadlines.get(event.get("task_id"), math.inf)
+        
+        # Release slots starting before this deadline (deadlines only grow)
+        while released < len(by_start) and slots[by_start[released]].start < limit:
+            heapq.heappush(candidates, by_start[released])
+            released += 1
+        
+        if not place(subject, event, limit):
+            late.append((subject, event))
+    
+    # Late work: anywhere that's left, still best energy first
+    for rank in by_start[released:]:
+        heapq.heappush(candidates, rank)
+    for subject, event in late:
+        place(subject, event, math.inf)
     
-    return scheduled_events
+    return placements
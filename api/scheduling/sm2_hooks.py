@@ -8,6 +8,8 @@ Review events are created as fixed calendar events immediately upon task complet
 from datetime import datetime, timezone, timedelta
 from typing import List
 
+from api.database import invalidate_schedules
+
 
 def on_task_completed(task_id: int, user_id: int, db) -> List[dict]:
     """
@@ -82,6 +84,7 @@ def on_task_completed(task_id: int, user_id: int, db) -> List[dict]:
             "end_time": (scheduled_date + timedelta(minutes=review_duration)).isoformat()
         }).execute()
     
+    invalidate_schedules(user_id)
     print(f"Created {len(review_sessions_created)} review sessions for task {task_id}")
     return review_sessions_created
 
@@ -0,0 +1,18 @@
+"""
+Read-through cache for user settings rows.
+
+A chat turn and the settings/onboarding routes read the same settings row
+many times, and it rarely changes. Rows are cached per process for a short
+TTL (other workers' writes show up once it expires). create_or_update_settings
+in api/database.py and api/database_async.py invalidates the user's entry.
+See api/row_cache.py for the singleflight and invalidation rules.
+"""
+
+import os
+
+from api.row_cache import RowCache
+
+SETTINGS_CACHE_SIZE = int(os.getenv("SETTINGS_CACHE_SIZE", "1024"))  # 0 disables the cache
+SETTINGS_CACHE_TTL_SECONDS = float(os.getenv("SETTINGS_CACHE_TTL_SECONDS", "30"))
+
+settings_cache = RowCache(SETTINGS_CACHE_SIZE, SETTINGS_CACHE_TTL_SECONDS)
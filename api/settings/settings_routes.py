@@ -5,7 +5,7 @@ import json
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional, List, Union
-from api.database import get_settings, create_or_update_settings
+from api.database_async import get_settings, create_or_update_settings
 
 router = APIRouter()
 
@@ -46,14 +46,14 @@ DEFAULT_SETTINGS = {
 }
 
 
-def seed_default_settings(user_id: int):
+async def seed_default_settings(user_id: int):
     """Create default settings for first-time users so the UI always has data."""
     settings_payload = DEFAULT_SETTINGS.copy()
     # use existing helper so inserts go through a single code path
-    created = create_or_update_settings(user_id, settings_payload)
+    created = await create_or_update_settings(user_id, settings_payload)
     if not created:
         raise HTTPException(status_code=500, detail="Failed to seed default settings")
-    return get_settings(user_id)
+    return await get_settings(user_id)
 
 # request model for settings
 class SettingsRequest(BaseModel):
@@ -78,9 +78,9 @@ class SettingsRequest(BaseModel):
 async def get_user_settings(user_id: int = Query(...)):
     """get user's settings"""
     try:
-        settings = get_settings(user_id)
+        settings = await get_settings(user_id)
         if not settings:
-            settings = seed_default_settings(user_id)
+            settings = await seed_default_settings(user_id)
 
         return settings
     except HTTPException:
@@ -139,12 +139,12 @@ async def save_user_settings(
         if request.onboarding_completed is not None:
             settings_data["onboarding_completed"] = request.onboarding_completed
 
-        success = create_or_update_settings(user_id, settings_data)
+        success = await create_or_update_settings(user_id, settings_data)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save settings")
 
         # return updated settings
-        settings = get_settings(user_id)
+        settings = await get_settings(user_id)
         return {
             "success": True,
             "message": "Settings saved successfully",
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from datetime import datetime, timezone
-from api.database import get_supabase_client
+from api.database_async import get_async_supabase_client, execute
 
 router = APIRouter()
 
@@ -16,15 +16,14 @@ async def submit_review_feedback(feedback: ReviewFeedback):
     In the fixed 5-session system, this just marks the current review as complete.
     """
     try:
-        supabase = get_supabase_client()
+        supabase = get_async_supabase_client()
         # Find the earliest pending review session for this task
-        response = supabase.table("review_sessions")\
+        response = await execute(supabase.table("review_sessions")\
             .select("*")\
             .eq("task_id", feedback.task_id)\
             .eq("status", "pending")\
             .order("scheduled_date")\
-            .limit(1)\
-            .execute()
+            .limit(1))
 
         if not response.data:
             return {"message": "No pending review session found for this task", "success": False}
@@ -32,10 +31,10 @@ async def submit_review_feedback(feedback: ReviewFeedback):
         session = response.data[0]
 
         # Mark as completed
-        supabase.table("review_sessions").update({
+        await execute(supabase.table("review_sessions").update({
             "status": "completed",
             "completed_at": datetime.now(timezone.utc).isoformat(),
-        }).eq("id", session["id"]).execute()
+        }).eq("id", session["id"]))
 
         return {"success": True, "message": "Review recorded"}
 
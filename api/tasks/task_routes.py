@@ -4,19 +4,19 @@
 from fastapi import APIRouter, HTTPException
 from typing import Optional, Dict, Any
 from pydantic import BaseModel
-from datetime import datetime, timezone, timedelta
-import asyncio
-import json
-import numpy as np
-from api.scheduling.scheduler import schedule_events
+from datetime import datetime, timedelta
+from api.scheduling.context import load_scheduling_context_async
+from api.scheduling.scheduler import schedule_events_async
 
 from api.database import (
-    get_supabase_client,
     create_task,
-    get_tasks_by_user,
     update_task,
     delete_task,
-    get_settings,
+)
+from api.database_async import (
+    get_async_supabase_client,
+    execute,
+    get_tasks_by_user,
     create_calendar_event,
 )
 
@@ -54,7 +54,7 @@ async def get_tasks(user_id: Optional[int] = None):
     if user_id is None:
         raise HTTPException(status_code=400, detail="user_id query parameter is required")
     try:
-        tasks = await asyncio.to_thread(get_tasks_by_user, user_id)
+        tasks = await get_tasks_by_user(user_id)
         return {"success": True, "tasks": tasks, "count": len(tasks)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching tasks: {str(e)}")
@@ -164,8 +164,8 @@ def delete_existing_task(task_id: int):
 async def schedule_single_task(task_id: int):
     """schedule a single task using the AI scheduler"""
     try:
-        supabase = get_supabase_client()
-        task_response = supabase.table("tasks").select("*").eq("id", task_id).execute()
+        supabase = get_async_supabase_client()
+        task_response = await execute(supabase.table("tasks").select("*").eq("id", task_id))
         if not task_response.data:
             raise HTTPException(status_code=404, detail=f"Task with id {task_id} not found")
 
@@ -175,8 +175,9 @@ async def schedule_single_task(task_id: int):
         if not task.get("estimated_duration"):
             raise HTTPException(status_code=400, detail="Task must have an estimated_duration to be scheduled")
 
-        # fetch user settings for scheduling
-        settings = await asyncio.to_thread(get_settings, user_id)
+        # load settings, tasks and busy time for scheduling in one concurrent pass
+        context = await load_scheduling_context_async(user_id, extra_tasks=[task])
+        settings = context.settings
 
         if not settings:
             raise HTTPException(
@@ -184,32 +185,12 @@ async def schedule_single_task(task_id: int):
                 detail="User must have settings configured before scheduling tasks"
             )
 
-        task_for_scheduler = {
-            "user_id": user_id,
-            "description": task.get("description") or task.get("title"),
-            "title": task.get("title"),
-            "duration": task.get("estimated_duration") / 60.0,
-            "difficulty": task.get("difficulty") or 3,
-            "priority": task.get("priority") or "medium",
-            "task_id": task_id,
-            "due_date": task.get("due_date"),
-        }
-
-        # build scheduler settings from user settings
-        scheduler_settings = type("obj", (object,), {
-            "min_study_duration": settings.get("min_study_duration", 30) / 60.0,  # convert to hours
-            "max_study_duration": settings.get("max_study_duration", 180) / 60.0,  # convert to hours
-            "break_duration": settings.get("short_break_min", 5) / 60.0,  # convert to hours
-            "max_study_duration_before_break": settings.get("long_study_threshold_min", 90) / 60.0,  # convert to hours
-            "energy_plot": np.array(json.loads(settings.get("energy_levels", "[]"))) if settings.get("energy_levels") else np.ones(24)
-        })()
-
-        start_date = datetime.now(timezone.utc)
+        start_date = context.now
         due_date_days = settings.get("due_date_days", 7)
         end_date = start_date + timedelta(days=due_date_days)
 
-        # call scheduler with single task
-        schedule = await schedule_events([task_for_scheduler], user_id, start_date, end_date, scheduler_settings, supabase)
+        # call scheduler with single task (slot assignment runs on the scheduler worker pool)
+        schedule = await schedule_events_async(user_id, [task], start_date, end_date, settings, context)
 
         if not schedule:
             raise HTTPException(status_code=400, detail="No available time slots found for scheduling this task")
@@ -228,7 +209,7 @@ async def schedule_single_task(task_id: int):
                 "task_id": task_id,
                 "color_hex": event.get("color_hex", "#000000"),
             }
-            event_id = await asyncio.to_thread(create_calendar_event, sanitized_event)
+            event_id = await create_calendar_event(sanitized_event)
             if event_id:
                 created_events.append({"id": event_id, **sanitized_event})
 
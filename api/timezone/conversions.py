@@ -45,6 +45,25 @@ def resolve_user_timezone(user_id: Any) -> str:
     return tz_value or "UTC"
 
 
+async def resolve_user_timezone_async(user_id: Any) -> str:
+    """Async resolve_user_timezone for coroutines (awaits the async data layer)."""
+    if not user_id:
+        return "UTC"
+    
+    # Import here to avoid circular dependency
+    from api.database_async import get_user_by_id
+    
+    try:
+        user_record = await get_user_by_id(user_id)
+    except Exception:
+        user_record = None
+    
+    tz_value = None
+    if isinstance(user_record, dict):
+        tz_value = user_record.get("timezone")
+    return tz_value or "UTC"
+
+
 def now_in_timezone(tz_name: str) -> datetime:
     """Get current time in the specified timezone."""
     now_utc = datetime.now(timezone.utc)
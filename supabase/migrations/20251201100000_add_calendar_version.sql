@@ -0,0 +1,46 @@
+-- Per-user calendar version for conditional GETs on /api/calendar/events.
+-- Bumped by statement-level triggers on every calendar_events write, so all
+-- write paths (API routes, scheduler batches, SM2 review hooks) are covered
+-- and a batch insert bumps each affected user once, not once per row.
+
+ALTER TABLE public.users
+    ADD COLUMN IF NOT EXISTS calendar_version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.bump_calendar_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE public.users SET calendar_version = calendar_version + 1
+        WHERE id IN (SELECT DISTINCT user_id FROM new_rows);
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE public.users SET calendar_version = calendar_version + 1
+        WHERE id IN (SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows);
+    ELSE
+        UPDATE public.users SET calendar_version = calendar_version + 1
+        WHERE id IN (SELECT DISTINCT user_id FROM old_rows);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS calendar_events_version_insert ON public.calendar_events;
+CREATE TRIGGER calendar_events_version_insert
+    AFTER INSERT ON public.calendar_events
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_calendar_version();
+
+DROP TRIGGER IF EXISTS calendar_events_version_update ON public.calendar_events;
+CREATE TRIGGER calendar_events_version_update
+    AFTER UPDATE ON public.calendar_events
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_calendar_version();
+
+DROP TRIGGER IF EXISTS calendar_events_version_delete ON public.calendar_events;
+CREATE TRIGGER calendar_events_version_delete
+    AFTER DELETE ON public.calendar_events
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_calendar_version();
+
+COMMENT ON COLUMN public.users.calendar_version IS 'Incremented on every calendar_events write; used as the ETag for calendar reads';
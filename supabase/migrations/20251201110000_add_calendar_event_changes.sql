@@ -0,0 +1,101 @@
+-- Delta sync for calendar events (/api/calendar/events/changes).
+-- Created/updated events are found by updated_at; deleted events leave a
+-- tombstone row so clients can drop them without a full reload.
+-- Stamps are taken at write time, not commit time, so the API re-reads a short
+-- overlap behind each cursor (CALENDAR_CHANGES_OVERLAP_SECONDS in event_routes).
+
+-- 1. updated_at on calendar_events, maintained by trigger
+ALTER TABLE public.calendar_events
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp();
+
+CREATE OR REPLACE FUNCTION public.touch_calendar_event_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS calendar_events_touch_updated_at ON public.calendar_events;
+CREATE TRIGGER calendar_events_touch_updated_at
+    BEFORE UPDATE ON public.calendar_events
+    FOR EACH ROW EXECUTE FUNCTION public.touch_calendar_event_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_calendar_events_user_updated_at
+    ON public.calendar_events(user_id, updated_at);
+
+-- 2. Tombstones for deleted events
+CREATE TABLE IF NOT EXISTS public.calendar_event_tombstones (
+    id BIGSERIAL PRIMARY KEY,
+    event_id BIGINT NOT NULL,
+    user_id INTEGER NOT NULL,
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_event_tombstones_user_deleted_at
+    ON public.calendar_event_tombstones(user_id, deleted_at);
+
+CREATE OR REPLACE FUNCTION public.record_calendar_event_tombstones()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO public.calendar_event_tombstones (event_id, user_id)
+    SELECT id, user_id FROM old_rows;
+    -- the deleting users' expired tombstones go with it (an index range per user)
+    PERFORM public.purge_calendar_event_tombstones(
+        user_ids => ARRAY(SELECT DISTINCT user_id FROM old_rows)
+    );
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS calendar_events_tombstones ON public.calendar_events;
+CREATE TRIGGER calendar_events_tombstones
+    AFTER DELETE ON public.calendar_events
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION public.record_calendar_event_tombstones();
+
+-- 3. Retention: clients with an older cursor get a full reload instead
+-- (TOMBSTONE_RETENTION in event_routes). Each delete purges its users' expired
+-- tombstones; where pg_cron is installed a nightly sweep also covers users who
+-- stopped deleting events.
+DROP FUNCTION IF EXISTS public.purge_calendar_event_tombstones(INTERVAL);
+CREATE OR REPLACE FUNCTION public.purge_calendar_event_tombstones(
+    retention INTERVAL DEFAULT INTERVAL '30 days',
+    user_ids INTEGER[] DEFAULT NULL
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    purged BIGINT;
+BEGIN
+    -- separate statements so the per-user purge plans on the (user_id, deleted_at) index
+    IF user_ids IS NULL THEN
+        DELETE FROM public.calendar_event_tombstones
+        WHERE deleted_at < clock_timestamp() - retention;
+    ELSE
+        DELETE FROM public.calendar_event_tombstones
+        WHERE user_id = ANY(user_ids) AND deleted_at < clock_timestamp() - retention;
+    END IF;
+    GET DIAGNOSTICS purged = ROW_COUNT;
+    RETURN purged;
+END;
+$$;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule(
+            'purge-calendar-event-tombstones',
+            '17 3 * * *',
+            'SELECT public.purge_calendar_event_tombstones()'
+        );
+    END IF;
+END;
+$$;
+
+COMMENT ON TABLE public.calendar_event_tombstones IS 'Deleted calendar_events (id, owner, time) for delta sync; purged after the retention window';
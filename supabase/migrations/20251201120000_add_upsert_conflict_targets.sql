@@ -0,0 +1,157 @@
+-- Conflict targets and insert defaults for the single-call upsert helpers in
+-- api/database.py (create_session, create_or_update_settings,
+-- create_or_update_user, create_or_update_user_by_email).
+-- ON CONFLICT needs a unique index on each target column; the defaults stand
+-- in for the values the old select-then-insert path put on new rows, so an
+-- upsert can leave them out and not overwrite them on existing rows.
+-- Earlier login races left duplicate rows behind; step 0 merges them so the
+-- unique indexes can be built (a no-op on a clean database).
+
+-- Pre-flight: one email on users with different google ids is two accounts that
+-- cannot be merged and would fail users_email_key, so stop before changing any
+-- rows and name them. The inner SELECT runs alone as a dry run; after deciding which
+-- account keeps the address, clear or change the email on the others and re-run.
+DO $$
+DECLARE
+    conflicts TEXT;
+BEGIN
+    SELECT string_agg(ids, '; ') INTO conflicts
+    FROM (
+        SELECT 'users ' || string_agg(id::text, ', ' ORDER BY id) AS ids
+        FROM public.users
+        WHERE email IS NOT NULL
+        GROUP BY email
+        HAVING COUNT(DISTINCT google_user_id) > 1
+    ) c;
+    IF conflicts IS NOT NULL THEN
+        RAISE EXCEPTION 'users sharing an email have different google_user_id values: %', conflicts
+            USING HINT = 'Keep the email on one account per group and set it to NULL (or a new address) on the others, then re-run this migration.';
+    END IF;
+END;
+$$;
+
+-- 0. Merge duplicates
+-- Users sharing a google_user_id, then users sharing an email, are merged into
+-- the one with the lowest id: rows that reference the others (foreign keys to
+-- users plus the user_id tables below) are re-pointed to it, per-user
+-- singletons it already has are dropped, its empty columns are filled from the
+-- duplicates and the duplicates are deleted. Two rows with one email but
+-- different google ids are different accounts: the pre-flight above has
+-- already refused to run while any are left.
+CREATE TEMP TABLE user_merges (old_id BIGINT PRIMARY KEY, new_id BIGINT NOT NULL);
+
+DO $$
+DECLARE
+    merge_key TEXT;
+    ref RECORD;
+BEGIN
+    FOREACH merge_key IN ARRAY ARRAY['google_user_id', 'email'] LOOP
+        DELETE FROM user_merges;
+        IF merge_key = 'google_user_id' THEN
+            INSERT INTO user_merges
+            SELECT id, MIN(id) OVER (PARTITION BY google_user_id)
+            FROM public.users WHERE google_user_id IS NOT NULL;
+        ELSE
+            INSERT INTO user_merges
+            SELECT id, MIN(id) OVER (PARTITION BY email)
+            FROM public.users WHERE email IS NOT NULL;
+        END IF;
+        DELETE FROM user_merges WHERE old_id = new_id;
+        CONTINUE WHEN NOT EXISTS (SELECT 1 FROM user_merges);
+
+        -- one row per user (per subject): keep the one of the lowest merged user id
+        IF to_regclass('public.settings') IS NOT NULL THEN
+            DELETE FROM public.settings s USING user_merges m
+            WHERE s.user_id = m.old_id
+              AND EXISTS (
+                  SELECT 1 FROM public.settings k LEFT JOIN user_merges km ON km.old_id = k.user_id
+                  WHERE COALESCE(km.new_id, k.user_id) = m.new_id AND k.user_id < s.user_id
+              );
+        END IF;
+        IF to_regclass('public.user_subjects') IS NOT NULL THEN
+            DELETE FROM public.user_subjects s USING user_merges m
+            WHERE s.user_id = m.old_id
+              AND EXISTS (
+                  SELECT 1 FROM public.user_subjects k LEFT JOIN user_merges km ON km.old_id = k.user_id
+                  WHERE COALESCE(km.new_id, k.user_id) = m.new_id AND k.user_id < s.user_id
+                    AND k.subject_name = s.subject_name
+              );
+        END IF;
+
+        FOR ref IN
+            SELECT quote_ident(n.nspname) || '.' || quote_ident(r.relname) AS tbl, a.attname::text AS col
+            FROM pg_constraint c
+            JOIN pg_class r ON r.oid = c.conrelid
+            JOIN pg_namespace n ON n.oid = r.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+            WHERE c.contype = 'f' AND c.confrelid = 'public.users'::regclass
+            UNION
+            SELECT 'public.' || t, 'user_id'
+            FROM unnest(ARRAY[
+                'tasks', 'calendar_events', 'calendar_event_tombstones', 'review_sessions',
+                'learning_history', 'user_subjects', 'settings', 'feedback'
+            ]) AS t
+            WHERE to_regclass('public.' || t) IS NOT NULL
+        LOOP
+            EXECUTE format(
+                'UPDATE %s t SET %I = m.new_id FROM user_merges m WHERE t.%I = m.old_id',
+                ref.tbl, ref.col, ref.col
+            );
+        END LOOP;
+
+        UPDATE public.users k SET
+            google_user_id = COALESCE(k.google_user_id, d.google_user_id),
+            email = COALESCE(k.email, d.email),
+            name = COALESCE(k.name, d.name)
+        FROM (
+            SELECT m.new_id,
+                   (array_agg(u.google_user_id ORDER BY u.id) FILTER (WHERE u.google_user_id IS NOT NULL))[1] AS google_user_id,
+                   (array_agg(u.email ORDER BY u.id) FILTER (WHERE u.email IS NOT NULL))[1] AS email,
+                   (array_agg(u.name ORDER BY u.id) FILTER (WHERE u.name IS NOT NULL))[1] AS name
+            FROM user_merges m JOIN public.users u ON u.id = m.old_id
+            GROUP BY m.new_id
+        ) d
+        WHERE k.id = d.new_id;
+
+        DELETE FROM public.users u USING user_merges m WHERE u.id = m.old_id;
+    END LOOP;
+END;
+$$;
+
+DROP TABLE user_merges;
+
+-- auth sessions and settings rows sharing a key: keep the first stored row
+DELETE FROM public.sessions a USING public.sessions b
+WHERE a.session_id = b.session_id AND a.ctid > b.ctid;
+DELETE FROM public.settings a USING public.settings b
+WHERE a.user_id = b.user_id AND a.ctid > b.ctid;
+
+-- 1. Conflict targets
+CREATE UNIQUE INDEX IF NOT EXISTS users_google_user_id_key ON public.users(google_user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_key ON public.users(email);
+CREATE UNIQUE INDEX IF NOT EXISTS settings_user_id_key ON public.settings(user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS sessions_session_id_key ON public.sessions(session_id);
+
+-- 2. Defaults for new users
+ALTER TABLE public.users
+    ALTER COLUMN subscription_plan SET DEFAULT 'free',
+    ALTER COLUMN credits_used SET DEFAULT 0,
+    ALTER COLUMN subscription_status SET DEFAULT 'active';
+
+-- Users created by email alone are named after the local part of the address
+CREATE OR REPLACE FUNCTION public.default_user_name()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.name IS NULL AND NEW.email IS NOT NULL THEN
+        NEW.name = split_part(NEW.email, '@', 1);
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS users_default_name ON public.users;
+CREATE TRIGGER users_default_name
+    BEFORE INSERT ON public.users
+    FOR EACH ROW EXECUTE FUNCTION public.default_user_name();
@@ -0,0 +1,11 @@
+-- Persistent embedding cache for semantic task matching
+-- (api/scheduling/matching/embedding_cache.py). Rows are keyed by a hash of
+-- model + text, so identical task titles are embedded once across users,
+-- workers and deploys.
+
+CREATE TABLE IF NOT EXISTS public.text_embeddings (
+    content_hash TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,17 @@
+-- Per-user task embedding index (api/scheduling/matching/task_index.py).
+-- One row per task title vector; a worker loads a user's rows in one query
+-- into a contiguous matrix. content_hash (model + title) tells whether the
+-- stored vector still matches the task's current title. Rows go away with
+-- their task.
+
+CREATE TABLE IF NOT EXISTS public.task_embeddings (
+    task_id INTEGER PRIMARY KEY REFERENCES public.tasks(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    embedding REAL[] NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_embeddings_user_model
+    ON public.task_embeddings(user_id, model);
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Benchmark chatgpt_call latency with and without the shared keep-alive session.
+
+A chat turn runs its intents in parallel, each making one chatgpt_call. The
+turns run twice against a local HTTPS stand-in for the Responses API: once
+opening a fresh aiohttp session per call (TCP + TLS handshake every time, the
+behaviour before api/http_session.py), once on the shared pooled session.
+
+The stand-in runs in a separate process with a self-signed certificate and a
+fixed per-request latency standing in for model time. On localhost a handshake
+costs well under a millisecond of network time, so the gap here is mostly the
+TLS CPU cost; over the internet each handshake also adds two or three round
+trips to the API.
+
+    python tests/benchmark_llm_session.py --turns 50 --intents 3 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import multiprocessing
+import os
+import ssl
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-key")
+
+
+# ============ RESPONSES API STAND-IN ============
+
+def write_self_signed_cert(directory):
+    """Self-signed certificate for 127.0.0.1; returns (cert path, key path)."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = x509.CertificateBuilder() \
+        .subject_name(name) \
+        .issuer_name(name) \
+        .public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()) \
+        .not_valid_before(now - datetime.timedelta(minutes=5)) \
+        .not_valid_after(now + datetime.timedelta(days=1)) \
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False) \
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True) \
+        .sign(key, hashes.SHA256())
+
+    cert_path, key_path = Path(directory) / "cert.pem", Path(directory) / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    return str(cert_path), str(key_path)
+
+
+def serve_stand_in(latency_seconds, cert_path, key_path, port_queue):
+    async def handle(request):
+        await request.read()
+        await asyncio.sleep(latency_seconds)
+        return web.json_response({"output_text": {"user_id": None, "intent": "ok"}})
+
+    app = web.Application()
+    app.router.add_post("/v1/responses", handle)
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_context.load_cert_chain(cert_path, key_path)
+
+    runner = web.AppRunner(app, access_log=None)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0, ssl_context=ssl_context)
+    loop.run_until_complete(site.start())
+    port_queue.put(site._server.sockets[0].getsockname()[1])
+    loop.run_forever()
+
+
+def start_stand_in(latency_seconds, cert_path, key_path):
+    """Run the stand-in in its own process; returns its Responses API URL."""
+    port_queue = multiprocessing.Queue()
+    multiprocessing.Process(
+        target=serve_stand_in, args=(latency_seconds, cert_path, key_path, port_queue), daemon=True
+    ).start()
+    return f"https://127.0.0.1:{port_queue.get()}/v1/responses"
+
+
+# ============ CHAT TURNS ============
+
+async def run_turns(turns, intents, reuse):
+    """Run chat turns one after another; returns (per-call latencies, per-turn latencies)."""
+    from api import http_session
+    from api.scheduling.agent_actions import utils
+
+    opened = []
+
+    def fresh_session():
+        opened.append(http_session.new_http_session())
+        return opened[-1]
+
+    async def timed_call():
+        started = time.perf_counter()
+        await utils.chatgpt_call({"text": "move my essay to friday"}, "prompt", "intent", {})
+        return time.perf_counter() - started
+
+    call_latencies, turn_latencies = [], []
+    with patch.object(utils, "get_http_session", http_session.get_http_session if reuse else fresh_session):
+        await timed_call()  # warm-up (first connection, DNS)
+        for _ in range(turns):
+            started = time.perf_counter()
+            call_latencies.extend(await asyncio.gather(*(timed_call() for _ in range(intents))))
+            turn_latencies.append(time.perf_counter() - started)
+
+    for session in opened:
+        await session.close()
+    await http_session.close_http_session()
+    return call_latencies, turn_latencies
+
+
+def report(label, call_latencies, turn_latencies):
+    print(
+        f"  {label:<30} call p50 {statistics.median(call_latencies) * 1000:7.1f} ms   "
+        f"turn p50 {statistics.median(turn_latencies) * 1000:7.1f} ms   "
+        f"turn mean {statistics.mean(turn_latencies) * 1000:7.1f} ms"
+    )
+    return statistics.median(turn_latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50, help="chat turns per run")
+    parser.add_argument("--intents", type=int, default=3, help="parallel chatgpt_call per turn")
+    parser.add_argument("--latency-ms", type=float, default=20, help="stand-in latency per request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_cert(directory)
+        os.environ["SSL_CERT_FILE"] = cert_path  # trusted by api.http_session's ssl context
+        url = start_stand_in(args.latency_ms / 1000, cert_path, key_path)
+
+        from api.scheduling.agent_actions import utils
+        with patch.object(utils, "OPENAI_API_URL", url):
+            print(
+                f"chatgpt_call session benchmark: {args.turns} turns x {args.intents} parallel calls, "
+                f"{args.latency_ms:g} ms per request (HTTPS, localhost)"
+            )
+            print("=" * 60)
+            fresh = report("new session per call", *asyncio.run(run_turns(args.turns, args.intents, reuse=False)))
+            shared = report("shared keep-alive session", *asyncio.run(run_turns(args.turns, args.intents, reuse=True)))
+            print(f"  turn latency saved: {(fresh - shared) * 1000:.1f} ms ({fresh / shared:.2f}x)")
+            print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""Microbenchmarks for the scheduler hot paths (no database or API required)"""
+
+import copy
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Measure the solver itself; the result cache is benchmarked separately
+os.environ.setdefault("SCHEDULE_CACHE_SIZE", "0")
+
+from api.scheduling.availability_bitmap import AvailabilityBitmap
+from api.scheduling.energy import EnergyCurve
+from api.scheduling.free_busy import find_free_slots
+from api.scheduling.context import SchedulingContext
+from api.scheduling.incremental import schedule_incremental
+from api.scheduling.result_cache import ScheduleCache
+from api.scheduling import scheduler
+from api.scheduling.scheduler import assign_events_to_slots, schedule_events
+from tests.reference_scheduler import (
+    legacy_assign_energy_and_sort,
+    legacy_assign_events_to_slots,
+    legacy_day_scan_slots,
+)
+
+WINDOW_START = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def make_events(count, days, seed=7):
+    """Random non-overlapping-per-day events spread over the window."""
+    rng = random.Random(seed)
+    per_day = max(1, count // days)
+    events = []
+    for day in range(days):
+        base = WINDOW_START + timedelta(days=day, hours=7)
+        offsets = sorted(rng.sample(range(0, 16 * 60, 5), min(per_day, 192)))
+        for offset in offsets[:per_day]:
+            start = base + timedelta(minutes=offset)
+            events.append({"start_time": start, "end_time": start + timedelta(minutes=5)})
+    return events[:count]
+
+
+def bench(label, fn, repeat=5):
+    """Run fn `repeat` times and print the best wall-clock time."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<40} {best * 1000:9.2f} ms")
+    return best
+
+
+def bench_free_busy(event_count=10_000, days=365):
+    events = make_events(event_count, days)
+    print(f"Free/busy slot discovery: {len(events)} events over {days} days")
+    busy = [(e["start_time"], e["end_time"]) for e in events]
+    window_end = WINDOW_START + timedelta(days=days)
+
+    legacy = bench("legacy per-day scan", lambda: legacy_day_scan_slots(events, WINDOW_START, window_end))
+    sweep = bench("sorted sweep (find_free_slots)", lambda: find_free_slots(busy, WINDOW_START, window_end))
+    print(f"  speedup: {legacy / sweep:.1f}x")
+    for resolution in (5, 1):
+        bitmap = bench(
+            f"numpy bitmap ({resolution}-minute cells)",
+            lambda: AvailabilityBitmap.build(busy, WINDOW_START, window_end, resolution_minutes=resolution).free_slots(),
+        )
+        print(f"  speedup: {legacy / bitmap:.1f}x")
+
+
+def bench_energy_scoring(slot_count=10_000):
+    print(f"Energy scoring: {slot_count} candidate slots")
+    rng = random.Random(11)
+    energy_levels = {str(hour): rng.randint(1, 10) for hour in range(7, 23)}
+    slots = [
+        (WINDOW_START + timedelta(minutes=5 * rng.randrange(0, 365 * 288)), rng.randrange(1, 48) * 5 / 60)
+        for _ in range(slot_count)
+    ]
+
+    legacy = bench("legacy hour-by-hour loop", lambda: legacy_assign_energy_and_sort(slots, energy_levels))
+    compiled = bench("prefix-sum curve (compile + rank)", lambda: EnergyCurve(energy_levels).rank_slots(slots))
+    print(f"  speedup: {legacy / compiled:.1f}x")
+
+    curve = EnergyCurve(energy_levels)
+    starts = [rng.randrange(0, 1440) for _ in range(100_000)]
+    durations = [rng.randrange(5, 240) for _ in range(100_000)]
+    bench("100k sub-slot averages (precompiled)", lambda: curve.average(starts, durations))
+
+
+def bench_slot_assignment(subject_count=60, event_count=1_500, days=90, gaps_per_day=4):
+    print(f"Slot assignment: {subject_count} subjects, {event_count} events, {days} days x {gaps_per_day} gaps")
+    rng = random.Random(5)
+    buckets = {}
+    for i in range(event_count):
+        subject = f"subject-{i % subject_count}"
+        buckets.setdefault(subject, []).append(
+            {"user_id": 1, "task_id": i, "title": f"Task {i}", "subject": subject, "duration_minutes": 45}
+        )
+    gap_hours = 16 / gaps_per_day
+    slots = sorted(
+        [
+            (WINDOW_START + timedelta(days=day, hours=7 + gap * gap_hours), gap_hours - 0.25, rng.random())
+            for day in range(days)
+            for gap in range(gaps_per_day)
+        ],
+        key=lambda slot: slot[2],
+        reverse=True,
+    )
+
+    legacy = bench("legacy round-robin scan", lambda: legacy_assign_events_to_slots(copy.deepcopy(buckets), slots, {}, None))
+    heap = bench("heap-driven selection", lambda: assign_events_to_slots(copy.deepcopy(buckets), slots, {}, None))
+    copying = bench("(input deepcopy only)", lambda: copy.deepcopy(buckets))
+    print(f"  speedup (excluding copy): {(legacy - copying) / (heap - copying):.1f}x")
+
+
+def bench_incremental(task_minutes=180, events_per_day=12):
+    print(f"Placing one {task_minutes}-minute task, {events_per_day} busy events per day")
+    task = {"id": 1, "user_id": 1, "estimated_duration": task_minutes, "subject": "math"}
+    for days in (30, 365):
+        events = [
+            {"id": i, "task_id": None, "event_type": "user_event", **e}
+            for i, e in enumerate(make_events(events_per_day * days, days))
+        ]
+        context = SchedulingContext(
+            user_id=1, now=WINDOW_START, window_end=WINDOW_START + timedelta(days=days),
+            settings={}, energy=EnergyCurve({}), tasks=[task], events=events,
+        )
+        bench(
+            f"full window ({days} days)",
+            lambda: schedule_events(1, [dict(task)], WINDOW_START, context.window_end, {}, None, context),
+        )
+        bench(f"incremental ({days} day horizon)", lambda: schedule_incremental(1, [task], context, {}))
+
+
+def bench_year_horizon(task_count=600, subject_count=40, events_per_day=6):
+    days = 365
+    tasks = [
+        {"id": i, "user_id": 1, "estimated_duration": 360, "subject": f"subject-{i % subject_count}"}
+        for i in range(1, task_count + 1)
+    ]
+    events = [
+        {"id": i, "task_id": None, "event_type": "user_event", **e}
+        for i, e in enumerate(make_events(events_per_day * days, days))
+    ]
+    context = SchedulingContext(
+        user_id=1, now=WINDOW_START, window_end=WINDOW_START + timedelta(days=days),
+        settings={}, energy=EnergyCurve({}), tasks=tasks, events=events,
+    )
+    chunks = len(schedule_events(1, copy.deepcopy(tasks), WINDOW_START, context.window_end, {}, None, context))
+    print(f"Year-long horizon: {task_count} tasks, {len(events)} busy events, {chunks} placed blocks")
+    for mode in ("energy", "edf"):
+        bench(
+            f"schedule_events (365 days, {mode})",
+            lambda: schedule_events(1, copy.deepcopy(tasks), WINDOW_START, context.window_end, {}, None, context, mode),
+        )
+    bench("(input deepcopy only)", lambda: copy.deepcopy(tasks))
+
+
+def bench_result_cache(task_count=200, days=60):
+    tasks = [{"id": i, "user_id": 1, "estimated_duration": 120, "subject": f"s{i % 10}"} for i in range(1, task_count + 1)]
+    events = [{"id": i, "task_id": None, **e} for i, e in enumerate(make_events(6 * days, days))]
+    context = SchedulingContext(
+        user_id=1, now=WINDOW_START, window_end=WINDOW_START + timedelta(days=days),
+        settings={}, energy=EnergyCurve({}), tasks=tasks, events=events,
+    )
+    print(f"Result cache: re-planning {task_count} tasks over {days} days")
+    run = lambda: schedule_events(1, copy.deepcopy(tasks), WINDOW_START, context.window_end, {}, None, context)
+    miss = bench("solve (cache off)", run)
+    scheduler.schedule_cache = ScheduleCache(max_entries=16)
+    run()
+    hit = bench("identical re-plan (cache hit)", run)
+    scheduler.schedule_cache = ScheduleCache(max_entries=0)
+    print(f"  speedup: {miss / hit:.1f}x")
+
+
+def main():
+    print("Scheduler microbenchmarks")
+    print("=" * 60)
+    bench_free_busy()
+    bench_free_busy(event_count=10_000, days=90)
+    bench_energy_scoring()
+    bench_slot_assignment()
+    bench_slot_assignment(subject_count=100, event_count=2_000, days=90, gaps_per_day=6)
+    bench_incremental()
+    bench_year_horizon()
+    bench_result_cache()
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,3 +35,26 @@ def mock_supabase():
         # Setup default mock behavior
         mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value.data = []
         yield mock_supabase
+
+@pytest.fixture(autouse=True)
+def mock_async_supabase():
+    """Serve the async data layer from an empty in-memory database (no network)"""
+    from tests.fakes import FakeSupabase
+    db = FakeSupabase()
+    with patch("api.database_async.get_async_supabase_client", return_value=db.as_async()), \
+         patch("api.scheduling.context.get_async_supabase_client", return_value=db.as_async()):
+        yield db
+
+@pytest.fixture(autouse=True)
+def clear_row_caches():
+    """Start every test with empty settings and user caches and no resident task indexes"""
+    from api.settings.settings_cache import settings_cache
+    from api.auth.user_cache import user_cache
+    from api.scheduling.matching.task_index import task_indexes
+    for cache in (settings_cache, user_cache):
+        cache.invalidate()
+    task_indexes.clear()
+    yield
+    for cache in (settings_cache, user_cache):
+        cache.invalidate()
+    task_indexes.clear()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Eval harness for the local intent fast path (api/scheduling/matching/local_intent.py).
+
+Each labelled utterance is held out of the local model's training data and
+classified. Without --remote the label is the intent it is listed under in
+intent_examples (or its "intents" in --utterances). With --remote, the label
+is what the current embedding classifier answers, which needs OPENAI_API_KEY.
+
+Messages asking for two things (TWO_INTENT_UTTERANCES) are always included:
+the local model answers a single intent, so serving one of them locally
+drops an intent and counts as a miss.
+
+Reports, per confidence threshold: share of requests served locally, local
+accuracy on those, end-to-end accuracy (local answers where served, the
+reference label elsewhere) and how many two-intent messages were served
+locally.
+
+    python tests/eval_intent_classifier.py
+    python tests/eval_intent_classifier.py --utterances intent_log.jsonl --remote
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("OPENAI_API_KEY", "eval-key")
+os.environ.setdefault("INTENT_UTTERANCE_LOG", "")  # train on intent_examples only, held-out style
+
+from api.scheduling.matching import intent_classifier, local_intent
+from api.scheduling.matching.intent_classifier import intent_examples
+
+ALLOWED_INTENTS = list(intent_examples)
+
+TWO_INTENT_UTTERANCES = [
+    ("clear all my tasks and block 2-3pm for dentist appointment", {"delete-tasks", "create-event"}),
+    ("delete tomorrow's tasks and help me study for my calculus exam next week", {"delete-tasks", "schedule-tasks"}),
+    ("remove the previous task and add doctor appointment Friday 2-3pm", {"delete-tasks", "create-event"}),
+    ("whats scheduled tomorrow? also move my task forward by 2 hours", {"check-calendar", "reschedule"}),
+]
+
+
+def labelled_utterances(path):
+    """(text, set of labels, index into intent_examples or None)."""
+    rows = [
+        (text, {intent}, (intent, i))
+        for intent, texts in intent_examples.items() for i, text in enumerate(texts)
+    ]
+    rows += [(text, intents, None) for text, intents in TWO_INTENT_UTTERANCES]
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                rows.append((entry["text"], set(entry["intents"]), None))
+    return rows
+
+
+def held_out_model(held_out, extra):
+    """Local model trained on every example but the held-out one (plus extra utterances)."""
+    examples = [
+        (text, intent) for intent, texts in intent_examples.items()
+        for i, text in enumerate(texts) if (intent, i) != held_out
+    ]
+    return local_intent.LocalIntentModel(examples + extra)
+
+
+async def remote_labels(rows):
+    return [set(await intent_classifier.classify_with_embeddings(text, ALLOWED_INTENTS)) for text, _, _ in rows]
+
+
+def evaluate(rows, labels, predictions, min_score, min_margin, max_runner_up):
+    served = correct_local = correct_total = multi_served = 0
+    for (top, score, margin), label in zip(predictions, labels):
+        if top is not None and local_intent.is_confident(score, margin, min_score, min_margin, max_runner_up):
+            served += 1
+            multi_served += len(label) > 1
+            hit = {top} == label
+            correct_local += hit
+            correct_total += hit
+        else:
+            correct_total += 1  # the embedding classifier answers (it is the reference)
+    n = len(rows)
+    return served / n, (correct_local / served if served else 1.0), correct_total / n, multi_served
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--utterances", help="JSONL of {text, intents} (e.g. INTENT_UTTERANCE_LOG)")
+    parser.add_argument("--remote", action="store_true", help="label with the embedding classifier")
+    args = parser.parse_args()
+
+    rows = labelled_utterances(args.utterances)
+    labels = asyncio.run(remote_labels(rows)) if args.remote else [label for _, label, _ in rows]
+    logged = [(text, next(iter(label))) for text, label, index in rows if index is None and len(label) == 1]
+
+    predictions = []
+    full_model = local_intent.LocalIntentModel(
+        [(text, intent) for intent, texts in intent_examples.items() for text in texts]
+    )
+    for text, _, index in rows:
+        if index is not None:
+            model = held_out_model(index, logged)
+        else:
+            model = full_model  # logged utterances are scored against intent_examples only
+        predictions.append(model.classify(text, ALLOWED_INTENTS))
+
+    print(
+        f"Local intent classifier: {len(rows)} utterances "
+        f"(labels: {'embedding classifier' if args.remote else 'listed intents'})"
+    )
+    print("=" * 60)
+    two_intent = sum(len(label) > 1 for label in labels)
+    print(
+        f"  {'min score':>9} {'min margin':>10} {'max runner-up':>13} {'served locally':>15} "
+        f"{'local acc':>10} {'overall acc':>12} {'2-intent served':>16}"
+    )
+    configured = (
+        local_intent.LOCAL_INTENT_MIN_SCORE, local_intent.LOCAL_INTENT_MIN_MARGIN, local_intent.LOCAL_INTENT_MAX_RUNNER_UP
+    )
+    thresholds = sorted({
+        (0.0, 0.0, 1.0), (0.3, 0.1, 1.0), (0.4, 0.1, 0.5), (0.45, 0.15, 0.5), (0.5, 0.15, 1.0), (0.5, 0.15, 0.5),
+        (0.55, 0.2, 0.5), (0.6, 0.2, 0.5), (0.7, 0.25, 0.5), configured,
+    })
+    for min_score, min_margin, max_runner_up in thresholds:
+        served, local_acc, overall, multi_served = evaluate(rows, labels, predictions, min_score, min_margin, max_runner_up)
+        marker = "  <- configured" if (min_score, min_margin, max_runner_up) == configured else ""
+        print(
+            f"  {min_score:9.2f} {min_margin:10.2f} {max_runner_up:13.2f} {served:14.0%} {local_acc:10.0%} "
+            f"{overall:12.0%} {multi_served:>9}/{two_intent}{marker}"
+        )
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
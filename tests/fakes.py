@@ -0,0 +1,184 @@
+"""
+In-memory Supabase stand-in for round-trip budget tests.
+
+Supports the query-builder subset the API uses (select/insert/update/upsert/
+delete plus eq/in_/lt/lte/gt/gte/order/limit/single) against plain row lists,
+and records every executed request so tests can pin how many round trips a
+code path makes. `unique` names columns that behave like unique indexes: a
+write that would duplicate a value raises postgrest's APIError 23505. `as_async()` serves the same tables to api.database_async,
+whose queries are awaited.
+"""
+
+from types import SimpleNamespace
+
+from postgrest.exceptions import APIError
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table_name = table
+        self.operation = "select"
+        self.payload = None
+        self.filters = []
+        self.on_conflict = None
+        self.order_by = None
+        self.limit_count = None
+        self.single_row = False
+
+    # operations
+    def select(self, *columns, **kwargs):
+        self.operation = "select"
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def update(self, payload, **kwargs):
+        self.operation, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload, on_conflict=None, **kwargs):
+        self.operation, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def delete(self, **kwargs):
+        self.operation = "delete"
+        return self
+
+    # filters
+    def _filter(self, column, predicate):
+        self.filters.append((column, predicate))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v: v == value)
+
+    def in_(self, column, values):
+        values = list(values)
+        return self._filter(column, lambda v: v in values)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v: v is not None and v < value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v: v is not None and v <= value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v: v is not None and v > value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v: v is not None and v >= value)
+
+    def order(self, column, desc=False, **kwargs):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count, **kwargs):
+        self.limit_count = count
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def _matches(self, row):
+        return all(predicate(row.get(column)) for column, predicate in self.filters)
+
+    def execute(self):
+        self.client.calls.append((self.table_name, self.operation))
+        rows = self.client.tables.setdefault(self.table_name, [])
+
+        if self.operation == "select":
+            data = [dict(row) for row in rows if self._matches(row)]
+            if self.order_by:
+                column, desc = self.order_by
+                data.sort(key=lambda row: row.get(column), reverse=desc)
+            if self.limit_count is not None:
+                data = data[:self.limit_count]
+        elif self.operation == "insert":
+            data = [self.client.add(self.table_name, row) for row in _as_list(self.payload)]
+        elif self.operation == "update":
+            data = []
+            for row in rows:
+                if self._matches(row):
+                    row.update(self.payload)
+                    data.append(dict(row))
+        elif self.operation == "upsert":
+            keys = (self.on_conflict or "id").split(",")
+            data = []
+            for incoming in _as_list(self.payload):
+                existing = next(
+                    (row for row in rows if all(row.get(k) == incoming.get(k) for k in keys)), None
+                )
+                if existing is not None:
+                    self.client.check_unique(self.table_name, {**existing, **incoming}, existing)
+                    existing.update(incoming)
+                    data.append(dict(existing))
+                else:
+                    data.append(self.client.add(self.table_name, incoming))
+        else:  # delete
+            data = [dict(row) for row in rows if self._matches(row)]
+            self.client.tables[self.table_name] = [row for row in rows if not self._matches(row)]
+
+        if self.single_row:
+            data = data[0] if data else None
+        return SimpleNamespace(data=data)
+
+
+class AsyncFakeQuery(FakeQuery):
+    async def execute(self):
+        return FakeQuery.execute(self)
+
+
+def _as_list(payload):
+    return payload if isinstance(payload, list) else [payload]
+
+
+class FakeSupabase:
+    """Minimal Supabase client double; `calls` lists (table, operation) per round trip."""
+
+    def __init__(self, tables=None, unique=None):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.unique = unique or {}
+        self.calls = []
+        self._next_id = 1000
+
+    def check_unique(self, table, row, replacing=None):
+        for column in self.unique.get(table, ()):
+            value = row.get(column)
+            if value is not None and any(
+                other is not replacing and other.get(column) == value for other in self.tables.get(table, [])
+            ):
+                raise APIError({"message": f"duplicate key value violates unique constraint on {column}",
+                                "code": "23505", "hint": None, "details": None})
+
+    def add(self, table, row):
+        self.check_unique(table, row)
+        row = dict(row)
+        if "id" not in row:
+            self._next_id += 1
+            row["id"] = self._next_id
+        self.tables.setdefault(table, []).append(row)
+        return dict(row)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def as_async(self):
+        """Async client double over the same tables and call log."""
+        return AsyncFakeSupabase(self)
+
+    def reset_calls(self):
+        self.calls = []
+
+
+class AsyncFakeSupabase:
+    """Async PostgREST client double sharing a FakeSupabase's tables and `calls`."""
+
+    def __init__(self, sync_client):
+        self.sync_client = sync_client
+
+    def table(self, name):
+        return AsyncFakeQuery(self.sync_client, name)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""
+Load test for the data layer: concurrent chat turns against a local PostgREST stand-in.
+
+A chat turn makes the database round trips of a "schedule my tasks" request
+(conversation id read, scheduling context load, task insert, calendar write,
+conversation id write); the LLM call and the solver are left out so only the
+data layer is measured. The same turns run twice: through the sync client in
+worker threads (asyncio.to_thread), then awaited on api.database_async.
+
+The stand-in is a small aiohttp server in a separate process on localhost,
+speaking enough of the PostgREST REST dialect for these queries, with a fixed
+per-request latency standing in for the network round trip to Supabase.
+
+    python tests/load_test_database.py --concurrency 200 --turns 1000 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("SCHEDULE_CACHE_SIZE", "0")
+
+USERS = 50
+NOW = datetime.now(timezone.utc)
+
+
+# ============ POSTGREST STAND-IN ============
+
+def seed_tables():
+    tables = {"users": [], "settings": [], "tasks": [], "calendar_events": [], "review_sessions": []}
+    for user_id in range(1, USERS + 1):
+        tables["users"].append({"id": user_id, "conversation_id": f"conv-{user_id}", "timezone": "UTC"})
+        tables["settings"].append({"id": user_id, "user_id": user_id, "energy_levels": "{}", "subject_colors": "{}"})
+        for n in range(10):
+            tables["tasks"].append({"id": user_id * 100 + n, "user_id": user_id, "estimated_duration": 60,
+                                    "status": "pending", "priority": "medium", "subject": f"s{n % 3}"})
+            start = NOW + timedelta(days=n, hours=2)
+            tables["calendar_events"].append({
+                "id": user_id * 100 + n, "user_id": user_id, "task_id": None, "event_type": "user_event",
+                "source": "user", "fixed": True,
+                "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat(),
+            })
+    return tables
+
+
+def make_stand_in(latency_seconds):
+    """aiohttp app serving /rest/v1/<table> (eq filters honoured, other filters ignored)."""
+    tables = seed_tables()
+    ids = itertools.count(100_000)
+
+    def eq_filters(request):
+        return {
+            column: value[3:] for column, value in request.query.items()
+            if value.startswith("eq.")
+        }
+
+    def matches(row, filters):
+        return all(str(row.get(column)) == value for column, value in filters.items())
+
+    async def handle(request):
+        await asyncio.sleep(latency_seconds)
+        rows = tables.setdefault(request.match_info["table"], [])
+        filters = eq_filters(request)
+
+        if request.method == "GET":
+            return web.json_response([row for row in rows if matches(row, filters)])
+        if request.method == "POST":
+            payload = await request.json()
+            created = []
+            for row in payload if isinstance(payload, list) else [payload]:
+                row = {"id": next(ids), **row}
+                rows.append(row)
+                created.append(row)
+            return web.json_response(created, status=201)
+        if request.method == "PATCH":
+            payload = await request.json()
+            updated = []
+            for row in rows:
+                if matches(row, filters):
+                    row.update(payload)
+                    updated.append(row)
+            return web.json_response(updated)
+        deleted = [row for row in rows if matches(row, filters)]
+        rows[:] = [row for row in rows if not matches(row, filters)]
+        return web.json_response(deleted)
+
+    app = web.Application()
+    app.router.add_route("*", "/rest/v1/{table}", handle)
+    return app
+
+
+def serve_stand_in(latency_seconds, port_queue):
+    runner = web.AppRunner(make_stand_in(latency_seconds), access_log=None)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0, backlog=1024)
+    loop.run_until_complete(site.start())
+    port_queue.put(site._server.sockets[0].getsockname()[1])
+    loop.run_forever()
+
+
+def start_stand_in(latency_seconds):
+    """Run the stand-in in its own process (like PostgREST would be); returns its base URL."""
+    port_queue = multiprocessing.Queue()
+    multiprocessing.Process(target=serve_stand_in, args=(latency_seconds, port_queue), daemon=True).start()
+    return f"http://127.0.0.1:{port_queue.get()}"
+
+
+# ============ CHAT TURNS ============
+
+def new_task(user_id):
+    return {"user_id": user_id, "title": "Essay", "estimated_duration": 90, "priority": "high",
+            "end_time": (NOW + timedelta(days=3)).isoformat()}
+
+
+def new_event(user_id, task_id):
+    start = NOW + timedelta(days=1, hours=3)
+    return {"user_id": user_id, "task_id": task_id, "title": "Essay", "event_type": "study",
+            "start_time": start.isoformat(), "end_time": (start + timedelta(minutes=90)).isoformat()}
+
+
+async def chat_turn_threaded(user_id):
+    """Sync client in worker threads (the data layer before api.database_async)."""
+    from api import database
+    from api.scheduling.context import load_scheduling_context_async
+
+    conversation_id = await asyncio.to_thread(database.get_user_conversation_id, user_id)
+    task = new_task(user_id)
+    task_ids, _ = await asyncio.gather(
+        asyncio.to_thread(database.create_tasks_batch, [task]),
+        load_scheduling_context_async(user_id, db=database.get_supabase_client(), extra_tasks=[task]),
+    )
+    await asyncio.to_thread(database.apply_calendar_event_changes, user_id, [new_event(user_id, task_ids[0])], [], [])
+    await asyncio.to_thread(database.update_user_conversation_id, user_id, conversation_id)
+
+
+async def chat_turn_async(user_id):
+    """Pooled async client, awaited natively."""
+    from api import database_async
+    from api.scheduling.context import load_scheduling_context_async
+
+    conversation_id = await database_async.get_user_conversation_id(user_id)
+    task = new_task(user_id)
+    task_ids, _ = await asyncio.gather(
+        database_async.create_tasks_batch([task]),
+        load_scheduling_context_async(user_id, extra_tasks=[task]),
+    )
+    await database_async.apply_calendar_event_changes(user_id, [new_event(user_id, task_ids[0])], [], [])
+    await database_async.update_user_conversation_id(user_id, conversation_id)
+
+
+async def run_load(chat_turn, concurrency, turns):
+    """Run `turns` chat turns with `concurrency` in flight; returns (wall seconds, per-turn latencies)."""
+    latencies = []
+    queue = iter(range(turns))
+
+    async def client():
+        for n in queue:
+            started = time.perf_counter()
+            await chat_turn(n % USERS + 1)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    from api.database_async import close_async_supabase_client
+    await close_async_supabase_client()
+    return wall, latencies
+
+
+def report(label, wall, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"  {label:<34} {len(latencies) / wall:8.1f} turns/s   "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms"
+    )
+    return len(latencies) / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200, help="chat turns in flight")
+    parser.add_argument("--turns", type=int, default=1000, help="total chat turns per run")
+    parser.add_argument("--latency-ms", type=float, default=50, help="stand-in latency per request")
+    args = parser.parse_args()
+
+    os.environ["SUPABASE_URL"] = start_stand_in(args.latency_ms / 1000)
+    os.environ["SUPABASE_SERVICE_KEY"] = "load-test-key"
+
+    from api import database_async
+    print(
+        f"Data layer load test: {args.concurrency} concurrent chat turns, {args.turns} turns, "
+        f"{args.latency_ms:g} ms per request"
+    )
+    print(
+        f"  (async pool: {database_async.SUPABASE_POOL_SIZE} connections, "
+        f"{database_async.SUPABASE_MAX_CONCURRENCY} queries in flight; "
+        f"threads: {min(32, (os.cpu_count() or 1) + 4)})"
+    )
+    print("=" * 60)
+    threaded = report("sync client via asyncio.to_thread", *asyncio.run(run_load(chat_turn_threaded, args.concurrency, args.turns)))
+    native = report("async pooled client", *asyncio.run(run_load(chat_turn_async, args.concurrency, args.turns)))
+    print(f"  speedup: {native / threaded:.1f}x")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
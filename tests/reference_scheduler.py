@@ -0,0 +1,250 @@
+"""
+Reference copies of the original scheduler loops.
+
+Kept verbatim (minus DB access) so equivalence tests and benchmarks can compare
+the optimized engines in api/scheduling against the behaviour they replaced.
+"""
+
+from collections import deque
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Tuple
+
+
+def legacy_day_scan_slots(
+    existing_events: List[dict],
+    start_date: datetime,
+    end_date: datetime,
+    wake: Tuple[int, int] = (7, 0),
+    sleep: Tuple[int, int] = (23, 0),
+    min_study_minutes: float = 15,
+) -> List[Tuple[datetime, float]]:
+    """Original per-day scan: re-filters every event for every day in the window."""
+    empty_slots = []
+    wake_hour, wake_min = wake
+    sleep_hour, sleep_min = sleep
+
+    current_date = start_date.date()
+    end_date_only = end_date.date()
+
+    while current_date <= end_date_only:
+        day_start = datetime.combine(current_date, datetime.min.time()).replace(
+            hour=wake_hour, minute=wake_min, tzinfo=timezone.utc
+        )
+        day_end = datetime.combine(current_date, datetime.min.time()).replace(
+            hour=sleep_hour, minute=sleep_min, tzinfo=timezone.utc
+        )
+
+        day_events = [e for e in existing_events if e["start_time"].date() == current_date]
+
+        if not day_events:
+            duration_hours = (day_end - day_start).total_seconds() / 3600
+            if duration_hours * 60 >= min_study_minutes:
+                empty_slots.append((day_start, duration_hours))
+        else:
+            first_event = day_events[0]
+            if day_start < first_event["start_time"]:
+                gap_minutes = (first_event["start_time"] - day_start).total_seconds() / 60
+                if gap_minutes >= min_study_minutes:
+                    empty_slots.append((day_start, gap_minutes / 60))
+
+            for i in range(len(day_events) - 1):
+                gap_start = day_events[i]["end_time"]
+                gap_end = day_events[i + 1]["start_time"]
+                gap_minutes = (gap_end - gap_start).total_seconds() / 60
+                if gap_minutes >= min_study_minutes:
+                    empty_slots.append((gap_start, gap_minutes / 60))
+
+            last_event = day_events[-1]
+            if last_event["end_time"] < day_end:
+                gap_minutes = (day_end - last_event["end_time"]).total_seconds() / 60
+                if gap_minutes >= min_study_minutes:
+                    empty_slots.append((last_event["end_time"], gap_minutes / 60))
+
+        current_date += timedelta(days=1)
+
+    return empty_slots
+
+
+def legacy_assign_energy_and_sort(
+    empty_slots: List[Tuple[datetime, float]],
+    energy_levels: dict
+) -> List[Tuple[datetime, float, float]]:
+    """Original hour-by-hour energy loop with string-key dict lookups."""
+    slots_with_energy = []
+
+    for start_time, duration_hours in empty_slots:
+        hour_of_day = start_time.hour
+        end_hour = (start_time + timedelta(hours=duration_hours)).hour
+
+        energy_sum = 0
+        hour_count = 0
+
+        for h in range(hour_of_day, end_hour + 1):
+            hour_key = str(h)
+            if hour_key in energy_levels:
+                energy_sum += energy_levels[hour_key]
+                hour_count += 1
+
+        avg_energy = energy_sum / hour_count if hour_count > 0 else 0.5
+        slots_with_energy.append((start_time, duration_hours, avg_energy))
+
+    return sorted(slots_with_energy, key=lambda x: x[2], reverse=True)
+
+
+def legacy_assign_events_to_slots(
+    subject_buckets: Dict[str, List[dict]],
+    energy_sorted_slots: List[Tuple[datetime, float, float]],
+    settings: dict,
+    db
+) -> List[dict]:
+    """Original round-robin interleaving: linear subject scan plus any() on every placement."""
+    scheduled_events = []
+
+    # Convert to queues
+    subject_queues = {subject: deque(events) for subject, events in subject_buckets.items()}
+    subject_names = list(subject_queues.keys())
+
+    if not subject_names:
+        return []
+
+    # Tracking
+    subject_last_time = {}
+    current_subject_idx = 0
+    previous_subject = None
+    cumulative_study_time = 0  # Track for break logic
+
+    # Settings with defaults
+    max_study_duration = settings.get("max_study_duration", 90)
+    short_break = settings.get("short_break", 5)
+    long_break = settings.get("long_break", 25)
+    long_study_threshold = settings.get("long_study_threshold", 120)
+
+    # Iterate through slots (best energy first)
+    for slot_start_time, slot_duration_hours, energy in energy_sorted_slots:
+        remaining_minutes = slot_duration_hours * 60
+        current_time = slot_start_time
+
+        while remaining_minutes > 0 and any(len(q) > 0 for q in subject_queues.values()):
+            scheduled_this_round = False
+            attempts = 0
+
+            # Round-robin through subjects
+            while attempts < len(subject_names) and not scheduled_this_round:
+                subject = subject_names[current_subject_idx]
+
+                # Skip if no events for this subject
+                if not subject_queues[subject]:
+                    current_subject_idx = (current_subject_idx + 1) % len(subject_names)
+                    attempts += 1
+                    continue
+
+                # Check 6-hour spacing constraint
+                if subject in subject_last_time:
+                    hours_since = (current_time - subject_last_time[subject]).total_seconds() / 3600
+
+                    if hours_since < 6:
+                        # Too soon! Try next subject
+                        current_subject_idx = (current_subject_idx + 1) % len(subject_names)
+                        attempts += 1
+                        continue
+
+                # Can schedule this subject!
+                event = subject_queues[subject][0]
+
+                # Context switching buffer (10 minutes)
+                if previous_subject is not None and previous_subject != subject and remaining_minutes >= 10:
+                    # Add break event to return array (not DB)
+                    scheduled_events.append({
+                        "user_id": event["user_id"],
+                        "title": "Context Switch",
+                        "event_type": "break",
+                        "source": "scheduler",
+                        "start_time": current_time,
+                        "end_time": current_time + timedelta(minutes=10),
+                        "color_hex": "#95A5A6"  # Neutral gray for breaks
+                    })
+
+                    current_time += timedelta(minutes=10)
+                    remaining_minutes -= 10
+
+                # Schedule the event
+                duration_to_schedule = min(
+                    event["duration_minutes"],
+                    remaining_minutes,
+                    max_study_duration
+                )
+
+                # Create event payload matching schema
+                scheduled_events.append({
+                    "user_id": event["user_id"],
+                    "task_id": event.get("task_id"),
+                    "title": event.get("title", "Study Session"),
+                    "description": event.get("description"),
+                    "start_time": current_time,
+                    "end_time": current_time + timedelta(minutes=duration_to_schedule),
+                    "event_type": event.get("event_type", "study"),
+                    "source": "scheduler",
+                    "priority": event.get("priority"),
+                    "subject": event.get("subject"),
+                    "color_hex": event.get("color_hex")
+                })
+
+                # Update state
+                event["duration_minutes"] -= duration_to_schedule
+                current_time += timedelta(minutes=duration_to_schedule)
+                remaining_minutes -= duration_to_schedule
+
+                # Remove if fully scheduled
+                if event["duration_minutes"] <= 0:
+                    subject_queues[subject].popleft()
+
+                # Update tracking
+                subject_last_time[subject] = current_time
+                previous_subject = subject
+                current_subject_idx = (current_subject_idx + 1) % len(subject_names)
+                scheduled_this_round = True
+
+                # Track cumulative study time for break logic
+                cumulative_study_time += duration_to_schedule
+
+                # Insert appropriate break based on cumulative study time
+                should_insert_break = remaining_minutes >= short_break
+
+                if should_insert_break:
+                    # Long break after extended study (threshold exceeded)
+                    if cumulative_study_time >= long_study_threshold:
+                        if remaining_minutes >= long_break:
+                            scheduled_events.append({
+                                "user_id": event["user_id"],
+                                "title": "Long Break",
+                                "event_type": "break",
+                                "source": "scheduler",
+                                "start_time": current_time,
+                                "end_time": current_time + timedelta(minutes=long_break),
+                                "color_hex": "#95A5A6"  # Neutral gray for breaks
+                            })
+
+                            current_time += timedelta(minutes=long_break)
+                            remaining_minutes -= long_break
+                            cumulative_study_time = 0  # Reset after long break
+
+                    # Short break for regular study sessions
+                    else:
+                        scheduled_events.append({
+                            "user_id": event["user_id"],
+                            "title": "Short Break",
+                            "event_type": "break",
+                            "source": "scheduler",
+                            "start_time": current_time,
+                            "end_time": current_time + timedelta(minutes=short_break),
+                            "color_hex": "#95A5A6"  # Neutral gray for breaks
+                        })
+
+                        current_time += timedelta(minutes=short_break)
+                        remaining_minutes -= short_break
+
+            # Couldn't schedule anything this round, move to next slot
+            if not scheduled_this_round:
+                break
+
+    return scheduled_events
@@ -3,7 +3,7 @@ from unittest.mock import MagicMock, patch
 
 def test_auth_status_unauthenticated(client):
     """Test auth status when not authenticated"""
-    with patch("api.database.get_session") as mock_get_session:
+    with patch("api.database_async.get_session") as mock_get_session:
         mock_get_session.return_value = None
         
         response = client.get("/api/auth/status")
@@ -13,7 +13,7 @@ def test_auth_status_unauthenticated(client):
 
 def test_auth_status_authenticated(client):
     """Test auth status when authenticated"""
-    with patch("api.database.get_session") as mock_get_session:
+    with patch("api.database_async.get_session") as mock_get_session:
         mock_get_session.return_value = {"session_id": "test_session"}
         
         response = client.get("/api/auth/status", params={"session_id": "test_session"})
@@ -25,7 +25,7 @@ def test_auth_status_authenticated(client):
 
 def test_logout_success(client):
     """Test successful logout"""
-    with patch("api.database.delete_session") as mock_delete:
+    with patch("api.database_async.delete_session") as mock_delete:
         mock_delete.return_value = True
         
         response = client.post("/api/auth/logout", params={"session_id": "test_session"})
@@ -35,7 +35,7 @@ def test_logout_success(client):
 
 def test_logout_invalid_session(client):
     """Test logout with invalid session"""
-    with patch("api.database.delete_session") as mock_delete:
+    with patch("api.database_async.delete_session") as mock_delete:
         mock_delete.return_value = False
         
         response = client.post("/api/auth/logout", params={"session_id": "invalid"})
@@ -44,7 +44,7 @@ def test_logout_invalid_session(client):
 
 def test_user_me(client):
     """Test get or create user by email"""
-    with patch("api.database.create_or_update_user_by_email") as mock_create:
+    with patch("api.database_async.create_or_update_user_by_email") as mock_create:
         mock_create.return_value = 123
         
         payload = {"email": "test@example.com", "name": "Test User"}
@@ -55,8 +55,8 @@ def test_user_me(client):
 
 def test_update_timezone(client):
     """Test updating user timezone"""
-    with patch("api.database.get_user_by_id") as mock_get, \
-         patch("api.database.update_user_timezone") as mock_update:
+    with patch("api.database_async.get_user_by_id") as mock_get, \
+         patch("api.database_async.update_user_timezone") as mock_update:
         mock_get.return_value = {"id": 1}
         mock_update.return_value = True
         
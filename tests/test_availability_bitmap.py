@@ -0,0 +1,57 @@
+import random
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock
+
+from api.scheduling.availability_bitmap import AvailabilityBitmap
+from api.scheduling.free_busy import find_free_slots
+from api.scheduling.scheduler import assign_energy_and_sort, get_empty_time_slots
+
+
+def _at(day, hour, minute=0):
+    return datetime(2030, 1, day, hour, minute, tzinfo=timezone.utc)
+
+
+def test_bitmap_matches_sweep_for_aligned_events():
+    """With events on 5-minute boundaries the bitmap and the sweep agree exactly"""
+    rng = random.Random(3)
+    busy = []
+    for _ in range(200):
+        start = _at(1, 0) + timedelta(minutes=5 * rng.randrange(0, 30 * 24 * 12))
+        busy.append((start, start + timedelta(minutes=5 * rng.randrange(1, 36))))
+
+    window_start, window_end = _at(1, 6), _at(30, 20)
+    bitmap = AvailabilityBitmap.build(busy, window_start, window_end, (7, 30), (22, 0), 30, 5)
+
+    assert bitmap.free_slots() == find_free_slots(busy, window_start, window_end, (7, 30), (22, 0), 30)
+
+
+def test_unaligned_event_blocks_touched_cells():
+    """Busy time off the grid blocks whole cells so slots never overlap events"""
+    busy = [(_at(1, 9, 2), _at(1, 9, 58))]
+
+    slots = AvailabilityBitmap.build(busy, _at(1, 0), _at(1, 23, 59), resolution_minutes=5).free_slots()
+
+    assert slots == [(_at(1, 7), 2.0), (_at(1, 10), 13.0)]
+
+
+def test_overnight_window_and_min_duration():
+    """Sleep before wake wraps to the next day; short runs are filtered out"""
+    busy = [(_at(1, 20), _at(1, 20, 50))]
+
+    bitmap = AvailabilityBitmap.build(busy, _at(1, 0), _at(2, 12), (19, 0), (2, 0), 60, 1)
+
+    # 00:00-02:00 is the tail of the previous evening's window
+    assert bitmap.free_slots() == [(_at(1, 0), 2.0), (_at(1, 19), 1.0), (_at(1, 20, 50), 5 + 10 / 60)]
+
+
+def test_scheduler_accepts_bitmap_directly():
+    """get_empty_time_slots reads a prebuilt bitmap without querying; energy sort takes it too"""
+    db = MagicMock()
+    bitmap = AvailabilityBitmap.build([(_at(1, 9), _at(1, 17))], _at(1, 0), _at(1, 23, 59))
+
+    slots = get_empty_time_slots(1, _at(1, 0), _at(1, 23, 59), {}, db, bitmap=bitmap)
+    ranked = assign_energy_and_sort(bitmap, {"7": 9, "8": 9, "17": 2, "18": 2, "19": 2, "20": 2, "21": 2, "22": 2, "23": 2})
+
+    db.table.assert_not_called()
+    assert slots == [(_at(1, 7), 2.0), (_at(1, 17), 6.0)]
+    assert [start for start, _, _ in ranked] == [_at(1, 7), _at(1, 17)]
@@ -73,3 +73,91 @@ def test_delete_event_success(client):
 
         assert response.status_code == 200
         assert response.json()["success"] is True
+
+def _calendar_db(version=3):
+    from tests.fakes import FakeSupabase
+    return FakeSupabase({
+        "users": [{"id": 1, "calendar_version": version}],
+        "calendar_events": [{"id": 10, "user_id": 1, "title": "Gym", "start_time": "2030-01-01T10:00:00+00:00"}],
+    })
+
+def test_get_events_conditional_get(client):
+    """Unchanged calendar answers If-None-Match with 304 and never reads the events"""
+    db = _calendar_db()
+    with patch("api.database.get_supabase_client", return_value=db), \
+         patch("api.calendar.event_routes.get_supabase_client", return_value=db):
+        first = client.get("/api/calendar/events", params={"user_id": 1})
+        db.reset_calls()
+        again = client.get("/api/calendar/events", params={"user_id": 1},
+                           headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200 and first.json()["count"] == 1
+    assert again.status_code == 304 and again.headers["ETag"] == first.headers["ETag"]
+    assert db.calls == [("users", "select")]
+
+def test_get_events_etag_changes_with_version_and_range(client):
+    """A calendar write (version bump) or a different range returns the full payload"""
+    db = _calendar_db()
+    with patch("api.database.get_supabase_client", return_value=db), \
+         patch("api.calendar.event_routes.get_supabase_client", return_value=db):
+        etag = client.get("/api/calendar/events", params={"user_id": 1}).headers["ETag"]
+        ranged = client.get("/api/calendar/events", params={"user_id": 1, "start_date": "2030-01-01"},
+                            headers={"If-None-Match": etag})
+        db.tables["users"][0]["calendar_version"] = 4
+        bumped = client.get("/api/calendar/events", params={"user_id": 1}, headers={"If-None-Match": etag})
+
+    assert ranged.status_code == 200 and ranged.headers["ETag"] != etag
+    assert bumped.status_code == 200 and bumped.headers["ETag"] != etag
+
+def test_event_changes_since_cursor(client):
+    """Only events changed or deleted after the cursor (less the overlap) come back, with an advanced cursor"""
+    from datetime import datetime, timedelta, timezone
+    from tests.fakes import FakeSupabase
+    base = datetime.now(timezone.utc) - timedelta(hours=1)
+    at = lambda minutes: (base + timedelta(minutes=minutes)).isoformat()
+    db = FakeSupabase({
+        "calendar_events": [
+            {"id": 1, "user_id": 1, "title": "Old", "updated_at": at(0)},
+            {"id": 2, "user_id": 1, "title": "Moved", "updated_at": at(20)},
+            {"id": 3, "user_id": 2, "title": "Other user", "updated_at": at(30)},
+        ],
+        "calendar_event_tombstones": [
+            {"event_id": 4, "user_id": 1, "deleted_at": at(25)},
+            {"event_id": 5, "user_id": 1, "deleted_at": at(5)},
+        ],
+    })
+    with patch("api.database.get_supabase_client", return_value=db):
+        body = client.get("/api/calendar/events/changes", params={"user_id": 1, "since": at(10)}).json()
+        caught_up = client.get("/api/calendar/events/changes", params={"user_id": 1, "since": body["cursor"]}).json()
+
+    assert body["reset"] is False
+    assert [e["id"] for e in body["events"]] == [2] and body["deleted"] == [4]
+    assert body["cursor"] == at(25)
+    # the change at the cursor is inside the overlap window: sent again, cursor unchanged
+    assert caught_up["deleted"] == [4] and caught_up["events"] == [] and caught_up["cursor"] == at(25)
+
+def test_event_changes_include_late_commits_behind_the_cursor(client):
+    """A write stamped just before the cursor but committed after it was handed out is still delivered"""
+    from datetime import datetime, timedelta, timezone
+    from tests.fakes import FakeSupabase
+    cursor = datetime.now(timezone.utc) - timedelta(minutes=5)
+    db = FakeSupabase({"calendar_events": [{"id": 1, "user_id": 1, "updated_at": cursor.isoformat()}]})
+    with patch("api.database.get_supabase_client", return_value=db):
+        # committed after the client's last sync, with an earlier updated_at
+        db.add("calendar_events", {"id": 2, "user_id": 1, "updated_at": (cursor - timedelta(seconds=2)).isoformat()})
+        body = client.get("/api/calendar/events/changes", params={"user_id": 1, "since": cursor.isoformat()}).json()
+
+    assert sorted(e["id"] for e in body["events"]) == [1, 2]
+    assert body["cursor"] == cursor.isoformat()
+
+def test_event_changes_without_cursor_is_full_reload(client):
+    """No (or an expired) cursor returns every event with reset=true"""
+    from tests.fakes import FakeSupabase
+    db = FakeSupabase({"calendar_events": [{"id": 1, "user_id": 1, "updated_at": "2030-01-01T10:00:00+00:00"}]})
+    with patch("api.calendar.event_routes.get_supabase_client", return_value=db):
+        body = client.get("/api/calendar/events/changes", params={"user_id": 1}).json()
+        expired = client.get("/api/calendar/events/changes",
+                             params={"user_id": 1, "since": "2020-01-01T00:00:00+00:00"}).json()
+
+    assert body["reset"] is True and body["count"] == 1 and body["cursor"] == "2030-01-01T10:00:00+00:00"
+    assert expired["reset"] is True
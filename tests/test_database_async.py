@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+from api import database_async
+from api.database_async import get_async_supabase_client
+from api.scheduling.context import load_scheduling_context, load_scheduling_context_async
+from tests.fakes import FakeSupabase
+
+NOW = datetime(2030, 1, 7, 9, tzinfo=timezone.utc)
+
+
+def test_async_loader_awaits_pooled_client():
+    """Without a db handle the async loader runs the sync loader's queries on the async client"""
+    tables = {
+        "settings": [{"user_id": 1, "energy_levels": "{}"}],
+        "tasks": [{"id": 1, "user_id": 1, "estimated_duration": 60, "event_type": "review"}],
+        "review_sessions": [{"task_id": 1, "scheduled_date": (NOW - timedelta(days=1)).isoformat()}],
+        "calendar_events": [{"id": 5, "user_id": 1, "task_id": None,
+                             "start_time": (NOW + timedelta(hours=1)).isoformat(),
+                             "end_time": (NOW + timedelta(hours=2)).isoformat()}],
+    }
+    sync_db, async_db = FakeSupabase(tables), FakeSupabase(tables)
+    expected = load_scheduling_context(1, sync_db, now=NOW)
+
+    with patch("api.scheduling.context.get_async_supabase_client", return_value=async_db.as_async()):
+        context = asyncio.run(load_scheduling_context_async(1, now=NOW))
+
+    assert sorted(async_db.calls) == sorted(sync_db.calls)
+    assert (context.busy, context.review_dates, context.settings) == \
+        (expected.busy, expected.review_dates, expected.settings)
+
+
+def test_execute_caps_queries_in_flight():
+    """No more than SUPABASE_MAX_CONCURRENCY queries run at once"""
+    in_flight = peak = 0
+
+    class SlowQuery:
+        async def execute(self):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+
+    async def run():
+        await asyncio.gather(*(database_async.execute(SlowQuery()) for _ in range(20)))
+
+    with patch.object(database_async, "SUPABASE_MAX_CONCURRENCY", 3):
+        asyncio.run(run())
+
+    assert peak == 3
+
+
+def test_client_is_pooled_per_event_loop():
+    """One configured keep-alive pool per event loop, closed on shutdown"""
+    async def build():
+        first, second = get_async_supabase_client(), get_async_supabase_client()
+        pool = database_async._http_client._transport._pool
+        limits = (pool._max_connections, pool._max_keepalive_connections)
+        await database_async.close_async_supabase_client()
+        return first, second, limits
+
+    with patch.object(database_async, "SUPABASE_POOL_SIZE", 7), \
+         patch.object(database_async, "SUPABASE_POOL_KEEPALIVE", 3):
+        first, second, limits = asyncio.run(build())
+        other_loop, _, _ = asyncio.run(build())
+
+    assert first is second
+    assert other_loop is not first
+    assert limits == (7, 3)
+    assert first.headers["apikey"] == "test-key"
+
+
+def test_both_layers_expose_every_operation():
+    """Each shared operation is a helper with the same signature in the sync and async layers"""
+    import inspect
+    from api import database, database_operations
+
+    operations = [op for op in vars(database_operations).values() if callable(op) and hasattr(op, "reraise")]
+    for op in operations:
+        name = op.__name__ if not op.__name__.startswith("fetch_") else f"_{op.__name__}"
+        sync_helper, async_helper = getattr(database, name), getattr(database_async, name)
+        assert inspect.signature(sync_helper) == inspect.signature(async_helper), name
+        assert inspect.iscoroutinefunction(async_helper) and not inspect.iscoroutinefunction(sync_helper), name
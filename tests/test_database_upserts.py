@@ -0,0 +1,77 @@
+import asyncio
+from unittest.mock import patch
+
+from api import database, database_async
+from tests.fakes import FakeSupabase
+
+
+def _db():
+    return FakeSupabase({
+        "users": [{"id": 1, "google_user_id": "g-1", "email": "ada@example.com", "name": "Ada",
+                   "subscription_plan": "pro"}],
+        "settings": [{"id": 5, "user_id": 1, "wake_time": "07:00:00"}],
+        "sessions": [{"session_id": "s-1", "credentials": {"state": "s-1"}}],
+    }, unique={"users": ("google_user_id", "email")})
+
+
+def _write_all(module, run=lambda result: result):
+    """Call each create-or-update helper for an existing and a new row."""
+    return [
+        run(module.create_or_update_user("g-1", "ada@example.com", "Ada L.")),
+        run(module.create_or_update_user("g-2", "bob@example.com", "Bob")),
+        run(module.create_or_update_user_by_email("ada@example.com", "Ada")),
+        run(module.create_or_update_user_by_email("cy@example.com")),
+        run(module.create_session("s-1", {"state": "s-1", "token": "t"})),
+        run(module.create_session("s-2", {"state": "s-2"})),
+        run(module.create_or_update_settings(1, {"wake_time": "08:00:00"})),
+        run(module.create_or_update_settings(2, {"wake_time": "09:00:00"})),
+    ]
+
+
+def _assert_single_upserts(db, results):
+    assert db.calls == [(table, "upsert") for table in ("users",) * 4 + ("sessions",) * 2 + ("settings",) * 2]
+    assert results[0] == 1 and results[2] == 1
+    assert results[4:] == [True] * 4
+
+    users = {row["email"]: row for row in db.tables["users"]}
+    assert users["ada@example.com"]["subscription_plan"] == "pro"  # existing plan kept
+    assert users["ada@example.com"]["name"] == "Ada"
+    assert len(db.tables["users"]) == 3
+    assert len(db.tables["sessions"]) == 2
+    assert {row["user_id"]: row["wake_time"] for row in db.tables["settings"]} == {1: "08:00:00", 2: "09:00:00"}
+
+
+def test_create_or_update_helpers_make_one_round_trip():
+    """Each create-or-update helper is a single upsert, whether or not the row exists"""
+    db = _db()
+    with patch("api.database.get_supabase_client", return_value=db):
+        results = _write_all(database)
+
+    _assert_single_upserts(db, results)
+
+
+def test_async_create_or_update_helpers_make_one_round_trip():
+    """The async data layer keeps the same one-upsert budget"""
+    db = _db()
+    with patch("api.database_async.get_async_supabase_client", return_value=db.as_async()):
+        results = _write_all(database_async, run=asyncio.run)
+
+    _assert_single_upserts(db, results)
+
+
+def test_google_login_links_an_email_only_account():
+    """A NextAuth (email-only) user signing in with Google keeps their row; a changed google email moves it"""
+    db = _db()
+    db.add("users", {"id": 3, "google_user_id": None, "email": "cy@example.com", "name": "cy"})
+    with patch("api.database.get_supabase_client", return_value=db):
+        assert database.create_or_update_user("g-3", "cy@example.com", "Cy") == 3
+        assert db.calls == [("users", "upsert")]
+
+        db.reset_calls()
+        assert database.create_or_update_user("g-1", "ada@new.example.com", "Ada") == 1
+        assert db.calls == [("users", "upsert"), ("users", "upsert")]
+
+    users = {row["id"]: row for row in db.tables["users"]}
+    assert len(users) == 2
+    assert users[3]["google_user_id"] == "g-3"
+    assert users[1]["email"] == "ada@new.example.com"
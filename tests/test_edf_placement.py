@@ -0,0 +1,69 @@
+import copy
+import random
+from datetime import datetime, timezone, timedelta
+
+from api.scheduling.context import ScheduleSnapshot
+from api.scheduling.scheduler import find_infeasible_tasks, solve_schedule
+
+NOW = datetime(2030, 3, 4, 6, 0, tzinfo=timezone.utc)
+END = NOW + timedelta(days=3)
+# Evenings are high-energy; 12:00-20:00 is busy every day
+SETTINGS = {"wake_time": "07:00", "sleep_time": "23:00",
+            "energy_levels": {str(h): 0.9 if h >= 20 else 0.1 for h in range(24)}}
+BUSY = tuple((NOW.replace(hour=12) + timedelta(days=d), NOW.replace(hour=20) + timedelta(days=d)) for d in range(3))
+
+
+def _task(task_id, minutes, due_in_hours=None, subject=None):
+    task = {"id": task_id, "user_id": 1, "title": f"Task {task_id}", "estimated_duration": minutes,
+            "subject": subject or f"subject-{task_id}"}
+    if due_in_hours is not None:
+        task["end_time"] = (NOW + timedelta(hours=due_in_hours)).isoformat()
+    return task
+
+
+def _study(schedule, task_id):
+    return [e for e in schedule if e["event_type"] != "break" and e["task_id"] == task_id]
+
+
+def test_deadline_beats_energy():
+    """A task due this morning takes a low-energy morning slot instead of the evening"""
+    tasks = [_task(1, 60, due_in_hours=4), _task(2, 120, due_in_hours=24 * 20)]
+    snapshot = ScheduleSnapshot(busy=BUSY, settings=SETTINGS, now=NOW)
+
+    energy = solve_schedule(copy.deepcopy(tasks), NOW, END, snapshot, "energy")
+    edf = solve_schedule(copy.deepcopy(tasks), NOW, END, snapshot, "edf")
+
+    assert _study(energy, 1)[0]["start_time"].hour == 20
+    assert all(e["end_time"] <= NOW + timedelta(hours=4) for e in _study(edf, 1))
+    # Work without a close deadline still gets the high-energy evening
+    assert all(e["start_time"].hour >= 20 for e in _study(edf, 2))
+
+
+def test_infeasible_tasks_reported_and_placed_late():
+    """Work that can't meet its deadline is reported up front and placed after everything on time"""
+    tasks = [_task(1, 240, due_in_hours=4), _task(2, 60, due_in_hours=5)]
+    snapshot = ScheduleSnapshot(busy=BUSY, settings=SETTINGS, now=NOW)
+
+    assert [t["id"] for t in find_infeasible_tasks(tasks, NOW, END, snapshot)] == [1, 2]
+
+    schedule = solve_schedule(copy.deepcopy(tasks), NOW, END, snapshot, "edf")
+    assert sum((e["end_time"] - e["start_time"]).seconds // 60 for e in _study(schedule, 1)) == 240
+    assert _study(schedule, 1)[0]["start_time"] == NOW.replace(hour=7)
+
+
+def test_edf_blocks_never_overlap_busy_time_or_each_other():
+    """Random deadlines still give disjoint blocks inside free time, with same-subject spacing"""
+    rng = random.Random(3)
+    snapshot = ScheduleSnapshot(busy=BUSY, settings=SETTINGS, now=NOW)
+    tasks = [_task(i, rng.choice([30, 45, 90, 150]), rng.choice([None, 5, 30, 60]), f"s{i % 4}")
+             for i in range(1, 25)]
+
+    schedule = solve_schedule(tasks, NOW, END, snapshot, "edf")
+    blocks = sorted((e["start_time"], e["end_time"]) for e in schedule)
+
+    assert all(prev_end <= start for (_, prev_end), (start, _) in zip(blocks, blocks[1:]))
+    assert not any(start < b_end and b_start < end for start, end in blocks for b_start, b_end in BUSY)
+    for subject in {t["subject"] for t in tasks}:
+        study = sorted(e["start_time"] for e in schedule if e.get("subject") == subject)
+        ends = sorted(e["end_time"] for e in schedule if e.get("subject") == subject)
+        assert all(nxt - end >= timedelta(hours=6) for end, nxt in zip(ends, study[1:]))
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from api.scheduling.energy import EnergyCurve
+from api.scheduling.scheduler import assign_energy_and_sort
+
+
+def _at(hour, minute=0):
+    return datetime(2030, 1, 1, hour, minute, tzinfo=timezone.utc)
+
+
+def test_average_is_minute_weighted():
+    """A 5-minute tail into the next hour counts for 5 minutes, not a whole hour"""
+    curve = EnergyCurve({"9": 10, "10": 0})
+
+    score = curve.average([9 * 60], [65])[0]
+
+    assert np.isclose(score, 10 * 60 / 65)
+
+
+def test_unknown_hours_are_ignored_and_default_applies():
+    """Missing hours don't dilute the average; fully unknown slots get the default"""
+    curve = EnergyCurve('{"8": 4, "9": 8}')
+
+    scores = curve.average([8 * 60, 7 * 60, 14 * 60], [120, 120, 60])
+
+    assert np.allclose(scores, [6.0, 4.0, 0.5])
+
+
+def test_windows_wrap_across_midnight():
+    """Windows longer than the rest of the day continue into the next day's curve"""
+    curve = EnergyCurve({"23": 2, "0": 6})
+
+    assert np.isclose(curve.average([23 * 60], [120])[0], 4.0)
+    assert np.isclose(curve.average([0], [3 * 1440])[0], 4.0)
+
+
+def test_assign_energy_and_sort_ranks_best_first():
+    """Slots are ranked by average energy, keeping input order for ties"""
+    slots = [(_at(7), 1.0), (_at(9), 2.0), (_at(13), 1.0), (_at(20), 1.0)]
+    energy_levels = {"7": 3, "9": 9, "10": 9, "13": 3, "20": 5}
+
+    ranked = assign_energy_and_sort(slots, energy_levels)
+
+    assert [start for start, _, _ in ranked] == [_at(9), _at(20), _at(7), _at(13)]
+    assert ranked[0][2] == 9.0
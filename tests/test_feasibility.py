@@ -0,0 +1,53 @@
+from datetime import datetime, timezone, timedelta
+
+from api.scheduling.agent_actions.scheduling import identify_blocking_tasks_by_importance
+from api.scheduling.feasibility import CapacityIndex, edf_infeasible
+
+NOW = datetime(2030, 3, 4, 9, 0, tzinfo=timezone.utc)
+
+
+def _slot(hour, hours):
+    return (NOW + timedelta(hours=hour), hours)
+
+
+def _task(task_id, minutes, due_in_hours=None, **extra):
+    task = {"id": task_id, "estimated_duration": minutes, **extra}
+    if due_in_hours is not None:
+        task["end_time"] = (NOW + timedelta(hours=due_in_hours)).isoformat()
+    return task
+
+
+def test_hours_before_matches_linear_scan():
+    """Binary search over cumulative capacity agrees with clipping every slot"""
+    slots = [_slot(30, 2), _slot(0, 1), _slot(5, 0.5), _slot(10, 3)]
+    capacity = CapacityIndex(slots)
+
+    for hour in [-1, 0, 0.5, 1, 4, 5.25, 11, 13, 31, 40]:
+        deadline = NOW + timedelta(hours=hour)
+        expected = sum(
+            max(0, min(hours, (deadline - start).total_seconds() / 3600)) for start, hours in slots
+        )
+        assert abs(capacity.hours_before(deadline) - expected) < 1e-9
+    assert capacity.total_hours == 6.5
+
+
+def test_edf_checks_tasks_together():
+    """Tasks that each fit alone but not together are reported, in deadline order"""
+    capacity = CapacityIndex([_slot(0, 2), _slot(24, 2)])
+    tasks = [_task(1, 90, due_in_hours=3), _task(2, 60, due_in_hours=3), _task(3, 120, due_in_hours=30),
+             _task(4, 600)]
+
+    assert [t["id"] for t in edf_infeasible(tasks[:1], capacity)] == []
+    assert [t["id"] for t in edf_infeasible(tasks[1:2], capacity)] == []
+    assert [t["id"] for t in edf_infeasible(tasks, capacity)] == [2, 3]
+
+
+def test_blocking_tasks_use_free_hours_for_urgency():
+    """A task with little free time before its deadline is kept in place, even if the deadline is days away"""
+    booked = _task(1, 120, due_in_hours=150, priority="low")
+    later = _task(2, 120, due_in_hours=200, priority="medium")
+    # Only two free hours before the low-priority task's deadline
+    capacity = CapacityIndex([_slot(0, 2)], end=NOW + timedelta(hours=160))
+
+    assert identify_blocking_tasks_by_importance([booked, later], 1, NOW) == [booked]
+    assert identify_blocking_tasks_by_importance([booked, later], 1, NOW, capacity) == [later]
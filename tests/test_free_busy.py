@@ -0,0 +1,88 @@
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock
+
+from api.scheduling.free_busy import find_free_slots, merge_intervals, parse_day_bounds
+from api.scheduling.scheduler import get_empty_time_slots
+from tests.reference_scheduler import legacy_day_scan_slots
+
+
+def _at(day, hour, minute=0):
+    return datetime(2030, 1, day, hour, minute, tzinfo=timezone.utc)
+
+
+def test_gaps_between_events_match_legacy_scan():
+    """Non-overlapping same-day events give the same gaps as the old per-day scan"""
+    events = [
+        {"start_time": _at(1, 9), "end_time": _at(1, 10)},
+        {"start_time": _at(1, 12), "end_time": _at(1, 13, 30)},
+        {"start_time": _at(2, 8), "end_time": _at(2, 22)},
+    ]
+    busy = [(e["start_time"], e["end_time"]) for e in events]
+
+    slots = find_free_slots(busy, _at(1, 0), _at(3, 23, 59))
+    expected = legacy_day_scan_slots(events, _at(1, 0), _at(3, 23, 59))
+
+    assert slots == expected
+
+
+def test_overlapping_events_are_merged():
+    """Overlapping and touching events collapse into one busy block"""
+    merged = merge_intervals([
+        (_at(1, 9), _at(1, 11)),
+        (_at(1, 10), _at(1, 12)),
+        (_at(1, 12), _at(1, 13)),
+    ])
+    assert merged == [(_at(1, 9), _at(1, 13))]
+
+
+def test_event_spanning_midnight_blocks_next_morning():
+    """An overnight event still blocks the following day until it ends"""
+    busy = [(_at(1, 22), _at(2, 9))]
+
+    slots = find_free_slots(busy, _at(1, 0), _at(2, 23, 59))
+
+    assert (_at(1, 7), 15.0) in slots
+    assert slots[-1] == (_at(2, 9), 14.0)
+
+
+def test_event_before_wake_is_clipped():
+    """An event starting before wake time only blocks the part after wake"""
+    busy = [(_at(1, 5), _at(1, 8))]
+
+    slots = find_free_slots(busy, _at(1, 0), _at(1, 23, 59))
+
+    assert slots == [(_at(1, 8), 15.0)]
+
+
+def test_window_start_and_min_duration():
+    """Slots never start before the window and short gaps are dropped"""
+    busy = [(_at(1, 12), _at(1, 12, 50)), (_at(1, 13), _at(1, 14))]
+
+    slots = find_free_slots(busy, _at(1, 10), _at(1, 23, 59), min_study_minutes=15)
+
+    assert slots == [(_at(1, 10), 2.0), (_at(1, 14), 9.0)]
+
+
+def test_parse_day_bounds_accepts_postgres_time():
+    """wake/sleep stored as HH:MM:SS are honoured instead of falling back to defaults"""
+    assert parse_day_bounds({"wake_time": "08:30:00", "sleep_time": "22:00:00"}) == ((8, 30), (22, 0))
+    assert parse_day_bounds({"wake_time": "bad", "sleep_time": "22:00"}) == ((7, 0), (23, 0))
+
+
+def test_get_empty_time_slots_uses_single_query():
+    """Scheduler fetches overlapping events once and sweeps the whole window"""
+    db = MagicMock()
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    busy_start = start.replace(hour=9)
+    query = db.table.return_value.select.return_value.eq.return_value.lt.return_value.gt.return_value.order.return_value
+    query.execute.return_value.data = [
+        {"start_time": busy_start.isoformat(), "end_time": (busy_start + timedelta(hours=2)).isoformat()}
+    ]
+
+    slots = get_empty_time_slots(1, start, start + timedelta(days=2), {"wake_time": "07:00", "sleep_time": "23:00"}, db)
+
+    assert db.table.call_count == 1
+    assert slots[0] == (start.replace(hour=7), 2.0)
+    assert slots[1] == (busy_start + timedelta(hours=2), 12.0)
+    assert len(slots) == 3
@@ -0,0 +1,43 @@
+import asyncio
+from unittest.mock import patch
+
+from aiohttp import web
+
+from api import http_session
+from api.scheduling.agent_actions.utils import chatgpt_call
+
+
+async def _responses_stand_in(client_ports):
+    async def handle(request):
+        client_ports.append(request.transport.get_extra_info("peername")[1])
+        return web.json_response({"output_text": {"user_id": None, "ok": True}})
+
+    app = web.Application()
+    app.router.add_post("/v1/responses", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/v1/responses"
+
+
+def test_chatgpt_calls_reuse_one_keep_alive_connection():
+    """Sequential chatgpt_call requests go over the shared session's pooled connection"""
+    client_ports = []
+
+    async def run():
+        runner, url = await _responses_stand_in(client_ports)
+        try:
+            with patch("api.scheduling.agent_actions.utils.OPENAI_API_URL", url):
+                results = [await chatgpt_call({"text": "hi"}, "prompt", "schema", {}) for _ in range(3)]
+            session = http_session.get_http_session()
+        finally:
+            await http_session.close_http_session()
+            await runner.cleanup()
+        return results, session
+
+    results, session = asyncio.run(run())
+
+    assert results == [{"user_id": None, "ok": True}] * 3
+    assert len(client_ports) == 3 and len(set(client_ports)) == 1
+    assert session.closed
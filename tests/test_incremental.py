@@ -0,0 +1,66 @@
+from datetime import datetime, timezone, timedelta
+
+from api.scheduling.agent_actions.scheduling import calculate_scheduling_strategy
+from api.scheduling.context import load_scheduling_context
+from api.scheduling.incremental import schedule_incremental
+from tests.fakes import FakeSupabase
+
+NOW = datetime(2030, 3, 4, 6, 0, tzinfo=timezone.utc)
+SETTINGS = {"user_id": 1, "wake_time": "07:00", "sleep_time": "23:00"}
+
+
+def _busy_day(day, user_id=1):
+    """A calendar event blocking the whole waking day `day` days after NOW."""
+    start = NOW.replace(hour=7) + timedelta(days=day)
+    return {"id": 500 + day, "user_id": user_id, "task_id": None, "event_type": "user_event",
+            "start_time": start.isoformat(), "end_time": start.replace(hour=23).isoformat()}
+
+
+def _context(horizon_days, events=(), tasks=()):
+    far_task = {"id": 99, "user_id": 1, "estimated_duration": 30,
+                "end_time": (NOW + timedelta(days=horizon_days)).isoformat()}
+    db = FakeSupabase({"settings": [SETTINGS], "tasks": [far_task, *tasks], "calendar_events": list(events)})
+    return load_scheduling_context(1, db, now=NOW)
+
+
+def test_incremental_result_independent_of_horizon():
+    """Only the nearest days are solved, so a longer horizon gives the same placement"""
+    task = {"id": 1, "user_id": 1, "estimated_duration": 120, "subject": "math"}
+
+    short = schedule_incremental(1, [task], _context(7))
+    long = schedule_incremental(1, [task], _context(365))
+
+    # Same-subject spacing pushes the second chunk to day two; nothing lands later
+    assert short == long
+    assert all(e["end_time"] <= NOW.replace(hour=23) + timedelta(days=1) for e in short)
+
+
+def test_incremental_spills_into_next_free_day():
+    """A fully booked day pushes the work into the following day, leaving booked time alone"""
+    task = {"id": 1, "user_id": 1, "estimated_duration": 60}
+
+    schedule = schedule_incremental(1, [task], _context(30, events=[_busy_day(0)]))
+
+    study = [e for e in schedule if e["event_type"] != "break"]
+    assert study and all(e["start_time"].date() == (NOW + timedelta(days=1)).date() for e in study)
+
+
+def test_incremental_gives_up_when_horizon_too_short():
+    """Work that can't fit before the horizon is left to the full strategies"""
+    task = {"id": 1, "user_id": 1, "estimated_duration": 600}
+    busy = [_busy_day(day) for day in range(8)]
+
+    assert schedule_incremental(1, [task], _context(7, events=busy)) is None
+
+
+def test_strategy_picks_incremental_for_common_case():
+    """New work that fits before its deadline uses the incremental strategy; overdue work does not"""
+    context = _context(30)
+    existing = [{"id": 2, "user_id": 1, "estimated_duration": 60, "end_time": (NOW + timedelta(days=10)).isoformat()}]
+    new = [{"id": 3, "user_id": 1, "estimated_duration": 90, "end_time": (NOW + timedelta(days=2)).isoformat()}]
+
+    assert calculate_scheduling_strategy(existing, new, context) == ("incremental", [])
+
+    overdue = [{**existing[0], "end_time": (NOW - timedelta(days=1)).isoformat()}]
+    strategy, tasks = calculate_scheduling_strategy(overdue, new, context)
+    assert strategy == "partial" and tasks == overdue
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from api.scheduling.matching import intent_classifier, local_intent
+
+
+def _fake_embedding(text):
+    """Deterministic pseudo-embedding: same text, same vector."""
+    return np.random.default_rng(zlib.crc32(text.encode())).normal(size=16)
+
+
+@pytest.fixture
+def embed_calls(tmp_path):
+    calls = []
+
+    async def fake_embed(texts):
+        calls.append(list(texts))
+        return np.vstack([_fake_embedding(text) for text in texts])
+
+    async def fake_single(text, model=None):
+        return _fake_embedding(text)
+
+    with patch.object(intent_classifier, "INTENT_VECTOR_CACHE_DIR", tmp_path), \
+         patch.object(intent_classifier, "embed", fake_embed), \
+         patch.object(intent_classifier, "get_openai_embedding", fake_single), \
+         patch.dict(intent_classifier.intent_vectors, clear=True):
+        yield calls
+
+
+def test_intent_vectors_are_built_once_and_persisted(embed_calls):
+    """The first worker embeds all examples in one request; later workers memory-map the file"""
+    asyncio.run(intent_classifier._initialize_intent_vectors())
+    built = dict(intent_classifier.intent_vectors)
+    assert len(embed_calls) == 1
+    assert intent_classifier.intent_vector_cache_path().exists()
+
+    intent_classifier.intent_vectors.clear()  # a fresh worker process
+    assert intent_classifier.load_intent_vectors()
+    assert len(embed_calls) == 1
+    assert isinstance(intent_classifier.intent_vectors["create-event"], np.memmap)
+    for intent, vec in built.items():
+        assert np.allclose(intent_classifier.intent_vectors[intent], vec)
+
+    detected = asyncio.run(intent_classifier.classify_with_embeddings("block 8-9am for morning workout", ["create-event", "delete-tasks"]))
+    assert detected == ["create-event"]
+
+
+def test_changed_examples_rebuild_the_cache(embed_calls):
+    """Editing intent_examples points at a new cache file and replaces the old one"""
+    asyncio.run(intent_classifier._initialize_intent_vectors())
+    old_path = intent_classifier.intent_vector_cache_path()
+
+    examples = {**intent_classifier.intent_examples, "delete-tasks": ["cancel everything"]}
+    with patch.object(intent_classifier, "intent_examples", examples):
+        intent_classifier.intent_vectors.clear()
+        assert not intent_classifier.load_intent_vectors()
+        asyncio.run(intent_classifier._initialize_intent_vectors())
+        assert intent_classifier.intent_vector_cache_path() != old_path
+        assert intent_classifier.intent_vector_cache_path().exists()
+
+    assert len(embed_calls) == 2
+    assert not old_path.exists()
+
+
+def test_confident_messages_are_classified_locally(embed_calls, tmp_path):
+    """Close paraphrases skip the embeddings API; unfamiliar ones fall back and are logged for training"""
+    log = tmp_path / "utterances.jsonl"
+    allowed = list(intent_classifier.intent_examples)
+    with patch.object(local_intent, "INTENT_UTTERANCE_LOG", str(log)), \
+         patch.object(local_intent, "_model", None):
+        local = asyncio.run(intent_classifier.classify_intent("add a dentist appointment friday 2-3pm", allowed))
+        assert local == ["create-event"]
+        assert embed_calls == []
+
+        asyncio.run(intent_classifier.classify_intent("zxqv plorb", allowed))
+        assert len(embed_calls) == 1
+        assert local_intent.logged_utterances(str(log))[0][0] == "zxqv plorb"
+
+
+def test_two_intent_messages_fall_back_to_embeddings(embed_calls):
+    """The local model answers one intent, so messages asking for two are left to the embedding classifier"""
+    allowed = list(intent_classifier.intent_examples)
+    with patch.object(local_intent, "INTENT_UTTERANCE_LOG", None), \
+         patch.object(local_intent, "_model", None):
+        for text in (
+            "clear all my tasks and block 2-3pm for dentist appointment",
+            "delete tomorrow's tasks and help me study for my calculus exam next week",
+        ):
+            assert local_intent.classify_locally(text, allowed, intent_classifier.intent_examples) is None
+        assert local_intent.classify_locally("clear all my tasks", allowed, intent_classifier.intent_examples) == ["delete-tasks"]
+
+
+def test_logged_utterances_are_deduplicated_and_capped(tmp_path):
+    """Repeated messages train once with their latest label, and only the most recent ones are kept"""
+    log = tmp_path / "utterances.jsonl"
+    lines = [("clear my list", "delete-tasks"), ("book gym at 6", "create-event"), ("Clear my list!", "reschedule")]
+    log.write_text("".join(json.dumps({"text": text, "intents": [intent]}) + "\n" for text, intent in lines))
+
+    assert local_intent.logged_utterances(str(log)) == [("book gym at 6", "create-event"), ("Clear my list!", "reschedule")]
+    assert local_intent.logged_utterances(str(log), limit=1) == [("Clear my list!", "reschedule")]
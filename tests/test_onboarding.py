@@ -3,7 +3,7 @@ from unittest.mock import patch
 
 def test_submit_onboarding_success(client):
     """Test submitting onboarding"""
-    with patch("api.database.create_or_update_settings") as mock_save, \
+    with patch("api.onboarding.onboarding_routes.create_or_update_settings") as mock_save, \
          patch("api.onboarding.onboarding_routes.run_agent") as mock_agent:
         mock_save.return_value = True
         mock_agent.return_value = [{"text": "Tasks created"}]
@@ -24,7 +24,7 @@ def test_submit_onboarding_success(client):
 
 def test_submit_onboarding_no_agent(client):
     """Test onboarding without triggering agent"""
-    with patch("api.database.create_or_update_settings") as mock_save:
+    with patch("api.onboarding.onboarding_routes.create_or_update_settings") as mock_save:
         mock_save.return_value = True
         
         payload = {
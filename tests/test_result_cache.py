@@ -0,0 +1,67 @@
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from api.database import update_calendar_event
+from api.scheduling.context import SchedulingContext
+from api.scheduling.energy import EnergyCurve
+from api.scheduling.result_cache import ScheduleCache
+from api.scheduling import scheduler
+from tests.fakes import FakeSupabase
+
+NOW = datetime(2030, 3, 4, 6, 0, tzinfo=timezone.utc)
+END = NOW + timedelta(days=7)
+SETTINGS = {"wake_time": "07:00", "sleep_time": "23:00"}
+TASKS = [{"id": i, "user_id": 1, "estimated_duration": 60, "subject": f"s{i}"} for i in range(1, 4)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    cache = ScheduleCache(max_entries=8, ttl_seconds=60)
+    with patch.object(scheduler, "schedule_cache", cache):
+        yield cache
+
+
+def _schedule(now=NOW, busy=(), user_id=1):
+    events = [{"id": 900 + i, "start_time": start, "end_time": end} for i, (start, end) in enumerate(busy)]
+    context = SchedulingContext(user_id=user_id, now=now, window_end=END, settings=SETTINGS,
+                                energy=EnergyCurve(None), tasks=TASKS, events=events)
+    return scheduler.schedule_events(user_id, [dict(t) for t in TASKS], now, END, SETTINGS, None, context)
+
+
+def test_identical_replan_is_served_from_cache(fresh_cache):
+    """Re-planning with unchanged inputs a few minutes later skips the solver"""
+    first = _schedule()
+    with patch.object(scheduler, "solve_schedule", side_effect=AssertionError("solver called")):
+        again = _schedule(now=NOW + timedelta(minutes=3))
+
+    assert first and again == first
+    assert fresh_cache.stats()["hits"] == 1 and fresh_cache.stats()["hit_rate"] == 0.5
+
+
+def test_changed_calendar_or_elapsed_plan_is_recomputed(fresh_cache):
+    """A new busy interval changes the key; a plan whose first block has passed is not reused"""
+    first = _schedule()
+    busy = [(NOW.replace(hour=7), NOW.replace(hour=9))]
+
+    moved = _schedule(busy=busy)
+    later = _schedule(now=NOW.replace(hour=7, minute=30))
+
+    assert moved != first and later != first
+    assert fresh_cache.stats()["hits"] == 0
+
+
+def test_calendar_write_invalidates_user_entries(fresh_cache, client):
+    """Writes drop the owner's cached plans; hit rate is exposed on /metrics"""
+    _schedule(user_id=1)
+    _schedule(user_id=2)
+    db = FakeSupabase({"calendar_events": [{"id": 5, "user_id": 1, "title": "Gym"}]})
+
+    with patch("api.database.get_supabase_client", return_value=db), \
+         patch("api.scheduling.result_cache.schedule_cache", fresh_cache):
+        assert update_calendar_event(5, {"title": "Swim"})
+        metrics = client.get("/metrics").json()
+
+    assert fresh_cache.stats()["entries"] == 1
+    assert set(metrics["schedule_cache"]) >= {"hits", "misses", "hit_rate"}
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone, timedelta
+
+from api.scheduling.scheduler import calculate_event_importance, schedule_events
+from tests.fakes import FakeSupabase
+
+NOW = datetime.now(timezone.utc)
+
+
+def _review_db(review_count):
+    """Fake DB with `review_count` review tasks, each with two review sessions."""
+    tasks = [
+        {"id": i, "user_id": 1, "title": f"Review {i}", "estimated_duration": 30,
+         "event_type": "review", "subject": f"subject-{i % 3}", "difficulty": 5}
+        for i in range(1, review_count + 1)
+    ]
+    sessions = []
+    for task in tasks:
+        sessions.append({"task_id": task["id"], "scheduled_date": (NOW - timedelta(days=4)).isoformat()})
+        sessions.append({"task_id": task["id"], "scheduled_date": (NOW - timedelta(days=2)).isoformat()})
+    return tasks, FakeSupabase({"tasks": tasks, "review_sessions": sessions, "calendar_events": []})
+
+
+def test_review_boost_uses_latest_session():
+    """Boost is based on the most recent scheduled review date"""
+    event = {"task_id": 7, "event_type": "review", "priority": "medium"}
+    plain = calculate_event_importance(event, {}, {}, NOW)
+
+    boosted = calculate_event_importance(event, {}, {7: NOW - timedelta(days=3)}, NOW)
+
+    assert boosted - plain == 300
+
+
+def test_schedule_round_trips_constant_in_review_count():
+    """Scheduling makes the same number of DB calls for 1 or 50 review events"""
+    round_trips = []
+    for review_count in (1, 50):
+        tasks, db = _review_db(review_count)
+        schedule_events(1, tasks, NOW, NOW + timedelta(days=14), {}, db)
+        round_trips.append(len(db.calls))
+        assert db.calls.count(("review_sessions", "select")) == 1
+
+    assert round_trips[0] == round_trips[1]
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+from api.database import apply_calendar_event_changes
+from api.scheduling.schedule_diff import diff_schedule
+from tests.fakes import FakeSupabase
+
+NOW = datetime(2030, 3, 4, 9, 0, tzinfo=timezone.utc)
+
+
+def _event(task_id, start_hour, minutes=60, event_type="study", **extra):
+    start = NOW + timedelta(hours=start_hour)
+    return {"user_id": 1, "task_id": task_id, "event_type": event_type, "title": f"Task {task_id}",
+            "start_time": start, "end_time": start + timedelta(minutes=minutes), **extra}
+
+
+def _stored(event_id, event):
+    row = {**event, "id": event_id}
+    row["start_time"] = event["start_time"].isoformat()
+    row["end_time"] = event["end_time"].isoformat()
+    return row
+
+
+def test_identical_schedule_needs_no_writes():
+    """Re-running the scheduler with the same result touches nothing"""
+    schedule = [_event(1, 0), _event(None, 1, 5, "break"), _event(2, 2)]
+    stored = [_stored(i, e) for i, e in enumerate(schedule, start=10)]
+
+    diff = diff_schedule(stored, schedule)
+
+    assert diff.is_empty
+    assert sorted(diff.unchanged) == [10, 11, 12]
+
+
+def test_moved_events_keep_their_ids():
+    """Moved blocks become in-place updates; new and vanished blocks become inserts and deletes"""
+    stored = [_stored(10, _event(1, 0)), _stored(11, _event(2, 2)), _stored(12, _event(3, 4))]
+    schedule = [_event(1, 0), _event(2, 5), _event(4, 6)]
+
+    diff = diff_schedule(stored, schedule)
+
+    assert diff.unchanged == [10]
+    assert [(u["id"], u["start_time"]) for u in diff.updates] == [(11, (NOW + timedelta(hours=5)).isoformat())]
+    assert [i["task_id"] for i in diff.inserts] == [4]
+    assert diff.deletes == [12]
+    assert isinstance(diff.inserts[0]["start_time"], str)
+
+
+def test_apply_uses_one_call_per_kind():
+    """A diff of any size is applied in at most three batched calls"""
+    stored = [_stored(100 + i, _event(i, i)) for i in range(50)]
+    schedule = [_event(i, i + 100) for i in range(25)] + [_event(i, i) for i in range(50, 90)]
+    db = FakeSupabase({"calendar_events": stored})
+    diff = diff_schedule(stored, schedule)
+
+    with patch("api.database.get_supabase_client", return_value=db):
+        assert apply_calendar_event_changes(1, diff.inserts, diff.updates, diff.deletes)
+
+    assert db.calls == [("calendar_events", "delete"), ("calendar_events", "upsert"), ("calendar_events", "insert")]
+    assert sorted(e["id"] for e in db.tables["calendar_events"] if e["id"] < 1000) == list(range(100, 125))
+    assert len(db.tables["calendar_events"]) == 65
@@ -0,0 +1,67 @@
+import pickle
+from datetime import datetime, timezone, timedelta
+
+from api.scheduling.context import ScheduleSnapshot
+from api.scheduling.scheduler import schedule_events, solve_schedule
+from tests.fakes import FakeSupabase
+
+NOW = datetime(2030, 3, 4, 6, 0, tzinfo=timezone.utc)
+END = NOW + timedelta(days=5)
+SETTINGS = {"wake_time": "07:00", "sleep_time": "23:00", "energy_levels": {"9": 0.9, "15": 0.4}}
+
+
+def _tasks():
+    return [
+        {"id": i, "user_id": 1, "title": f"Task {i}", "estimated_duration": 30 + 15 * i,
+         "subject": ["math", "bio", "art"][i % 3], "difficulty": i % 7 + 1}
+        for i in range(1, 10)
+    ]
+
+
+def _snapshot(now=NOW, **extra):
+    busy = ((NOW + timedelta(hours=4), NOW + timedelta(hours=6)),)
+    return ScheduleSnapshot(busy=busy, settings=SETTINGS, now=now,
+                            tasks_map={t["id"]: t for t in _tasks()}, **extra)
+
+
+def test_solve_schedule_is_deterministic_and_picklable():
+    """The same snapshot gives the same schedule, also after a pickle round trip"""
+    snapshot = _snapshot()
+
+    first = solve_schedule(_tasks(), NOW, END, snapshot)
+    second = solve_schedule(_tasks(), NOW, END, pickle.loads(pickle.dumps(snapshot)))
+
+    assert first and first == second
+
+
+def test_injected_now_drives_review_boost():
+    """Review urgency is computed from snapshot.now, not the wall clock"""
+    tasks = [
+        {"id": 1, "user_id": 1, "title": "Old review", "estimated_duration": 30, "event_type": "review", "subject": "s"},
+        {"id": 2, "user_id": 1, "title": "New review", "estimated_duration": 30, "event_type": "review", "subject": "s",
+         "difficulty": 9},
+    ]
+    review_dates = {1: NOW - timedelta(days=5), 2: NOW}
+
+    boosted = solve_schedule(tasks, NOW, END, _snapshot(review_dates=review_dates))
+    not_due = solve_schedule(tasks, NOW, END, _snapshot(now=NOW - timedelta(days=10), review_dates=review_dates))
+
+    assert boosted[0]["title"] == "Old review"
+    assert not_due[0]["title"] == "New review"
+
+
+def test_db_wrapper_matches_pure_core():
+    """schedule_events only gathers the snapshot; placement comes from solve_schedule"""
+    now = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=1)
+    busy_start = now + timedelta(hours=2)
+    db = FakeSupabase({
+        "tasks": _tasks(),
+        "calendar_events": [{"user_id": 1, "start_time": busy_start.isoformat(),
+                             "end_time": (busy_start + timedelta(hours=3)).isoformat()}],
+    })
+
+    wrapped = schedule_events(1, _tasks(), now, now + timedelta(days=3), SETTINGS, db)
+    snapshot = ScheduleSnapshot(busy=((busy_start, busy_start + timedelta(hours=3)),), settings=SETTINGS,
+                                now=now, tasks_map={t["id"]: t for t in _tasks()})
+
+    assert wrapped == solve_schedule(_tasks(), now, now + timedelta(days=3), snapshot)
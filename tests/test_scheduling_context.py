@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+from api.scheduling.agent_actions.scheduling import schedule_tasks_into_calendar
+from api.scheduling.context import load_scheduling_context, load_scheduling_context_async
+from api.scheduling.scheduler import schedule_events, schedule_events_async, solve_schedule
+from tests.fakes import FakeSupabase
+
+NOW = datetime(2030, 3, 4, 6, 0, tzinfo=timezone.utc)
+SETTINGS = {
+    "user_id": 1,
+    "wake_time": "07:00",
+    "sleep_time": "23:00",
+    "energy_levels": '{"9": 0.9, "20": 0.2}',
+    "subject_colors": '{"math": "#FF0000"}',
+}
+
+
+def _db(tasks=(), events=(), sessions=()):
+    return FakeSupabase({
+        "settings": [SETTINGS],
+        "tasks": list(tasks),
+        "calendar_events": list(events),
+        "review_sessions": list(sessions),
+    })
+
+
+def test_context_loads_in_three_queries():
+    """Settings, tasks and busy events are each fetched once; JSON settings are decoded"""
+    deadline = NOW + timedelta(days=20)
+    db = _db(
+        tasks=[{"id": 1, "user_id": 1, "estimated_duration": 60, "end_time": deadline.isoformat()}],
+        events=[{"id": 5, "user_id": 1, "task_id": None,
+                 "start_time": (NOW + timedelta(hours=3)).isoformat(),
+                 "end_time": (NOW + timedelta(hours=4)).isoformat()}],
+    )
+
+    context = load_scheduling_context(1, db, now=NOW)
+
+    assert len(db.calls) == 3
+    assert context.window_end == deadline
+    assert context.settings["subject_colors"] == {"math": "#FF0000"}
+    assert context.busy == [(NOW + timedelta(hours=3), NOW + timedelta(hours=4))]
+
+
+def test_schedule_events_with_context_makes_no_queries():
+    """A loaded context answers every lookup schedule_events needs"""
+    tasks = [{"id": 1, "user_id": 1, "estimated_duration": 60, "subject": "math", "event_type": "review"}]
+    sessions = [{"task_id": 1, "scheduled_date": (NOW - timedelta(days=2)).isoformat()}]
+    db = _db(tasks=tasks, sessions=sessions)
+    context = load_scheduling_context(1, db, now=NOW)
+    db.reset_calls()
+
+    schedule = schedule_events(1, tasks, NOW, context.window_end, context.settings, None, context)
+
+    assert db.calls == []
+    assert schedule[0]["task_id"] == 1
+    assert schedule[0]["color_hex"] == "#FF0000"
+    assert context.review_dates[1] == NOW - timedelta(days=2)
+
+
+def test_schedule_tasks_into_calendar_reads_bounded():
+    """The agent action reads settings, tasks and calendar once each and schedules the new task"""
+    existing = [{"id": 7, "user_id": 1, "estimated_duration": 60, "status": "pending", "priority": "low"}]
+    db = _db(tasks=existing)
+    inferred = [{"user_id": 1, "title": "Essay", "estimated_duration": 90, "priority": "high",
+                 "end_time": (datetime.now(timezone.utc) + timedelta(days=3)).isoformat()}]
+
+    async def chatgpt_call(*args):
+        return inferred
+
+    with patch("api.database_async.get_async_supabase_client", return_value=db.as_async()), \
+         patch("api.scheduling.context.get_async_supabase_client", return_value=db.as_async()):
+        result = asyncio.run(schedule_tasks_into_calendar({"user_id": 1, "text": "write my essay"}, chatgpt_call))
+
+    reads = [call for call in db.calls if call[1] == "select"]
+    assert len(reads) == 3
+    assert any(event.get("task_id") for event in db.tables["calendar_events"])
+    assert result["text"].startswith("Scheduled")
+
+
+def test_async_context_matches_sync_loader():
+    """The concurrent loader issues the same queries and builds the same snapshot"""
+    tasks = [{"id": 1, "user_id": 1, "estimated_duration": 60, "event_type": "review"}]
+    sessions = [{"task_id": 1, "scheduled_date": (NOW - timedelta(days=1)).isoformat()}]
+
+    sync_db, async_db = _db(tasks=tasks, sessions=sessions), _db(tasks=tasks, sessions=sessions)
+    expected = load_scheduling_context(1, sync_db, now=NOW)
+    context = asyncio.run(load_scheduling_context_async(1, async_db, now=NOW))
+
+    assert sorted(async_db.calls) == sorted(sync_db.calls)
+    assert (context.window_end, context.tasks, context.review_dates) == \
+        (expected.window_end, expected.tasks, expected.review_dates)
+
+
+def test_schedule_events_async_keeps_event_loop_free():
+    """Slot assignment runs on the worker pool while other coroutines keep running"""
+    tasks = [{"id": i, "user_id": 1, "estimated_duration": 90, "subject": f"s{i % 5}"} for i in range(1, 300)]
+    context = load_scheduling_context(1, _db(tasks=tasks), now=NOW)
+    end = NOW + timedelta(days=60)
+    # Straight from the core, so the async run below is a cache miss
+    expected = solve_schedule([dict(t) for t in tasks], NOW, end, context.snapshot(NOW, end))
+
+    async def run():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        beat = asyncio.create_task(heartbeat())
+        schedule = await schedule_events_async(1, [dict(t) for t in tasks], NOW, end, None, context)
+        beat.cancel()
+        return schedule, ticks
+
+    schedule, ticks = asyncio.run(run())
+
+    assert schedule == expected
+    assert ticks > 1
@@ -0,0 +1,66 @@
+import asyncio
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from api.scheduling.agent_actions.deletion import delete_tasks_from_calendar
+from api.scheduling.matching import embedding_cache
+from api.scheduling.matching.semantic_matcher import match_tasks
+
+TASKS = [
+    {"id": 1, "user_id": 7, "title": "math homework"},
+    {"id": 2, "user_id": 7, "title": "biology notes"},
+    {"id": 3, "user_id": 7, "title": "math homework"},  # same title, embedded once
+    {"id": 4, "user_id": 7, "title": None},
+]
+
+
+def _fake_embedding(text):
+    """Texts mentioning math point one way, everything else is random noise."""
+    noise = np.random.default_rng(zlib.crc32(text.encode())).normal(size=32) * 0.05
+    return (noise + (np.eye(32)[0] if "math" in text else 0)).tolist()
+
+
+@pytest.fixture
+def remote_batches(mock_async_supabase):
+    batches = []
+
+    async def fake_remote(texts):
+        batches.append(list(texts))
+        return [_fake_embedding(text) for text in texts]
+
+    embedding_cache.memory_cache.clear()
+    with patch.object(embedding_cache, "_embed_remote", fake_remote):
+        yield batches
+    embedding_cache.memory_cache.clear()
+
+
+def test_titles_are_embedded_in_one_batch_and_cached(remote_batches, mock_async_supabase):
+    """One batched request per call, and only for text not seen before"""
+    matched = asyncio.run(match_tasks("delete my math tasks", TASKS))
+    assert [task["id"] for task in matched] == [1, 3]
+    assert remote_batches == [["delete my math tasks", "math homework", "biology notes"]]
+
+    asyncio.run(match_tasks("drop the math stuff", TASKS))
+    assert remote_batches[1] == ["drop the math stuff"]
+
+    embedding_cache.memory_cache.clear()  # a new worker: titles come from text_embeddings
+    mock_async_supabase.reset_calls()
+    asyncio.run(match_tasks("drop the math stuff", TASKS))
+    assert len(remote_batches) == 2
+    assert mock_async_supabase.calls == [("text_embeddings", "select")]
+
+
+def test_delete_tasks_from_calendar_removes_matched_task_events(remote_batches, mock_async_supabase):
+    """Matched tasks' events are deleted and reported by title"""
+    for task in TASKS:
+        mock_async_supabase.add("tasks", task)
+    mock_async_supabase.add("calendar_events", {"id": 50, "user_id": 7, "task_id": 1})
+    mock_async_supabase.add("calendar_events", {"id": 51, "user_id": 7, "task_id": 2})
+
+    result = asyncio.run(delete_tasks_from_calendar({"user_id": 7, "text": "delete my math tasks"}))
+
+    assert result["text"].startswith("Deleted math homework, math homework")
+    assert [event["id"] for event in mock_async_supabase.tables["calendar_events"]] == [51]
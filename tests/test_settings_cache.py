@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from api import database, database_async
+from api.row_cache import RowCache
+from api.settings.settings_cache import settings_cache
+from tests.fakes import FakeSupabase
+
+
+def _db():
+    return FakeSupabase({"settings": [{"id": 5, "user_id": 1, "wake_time": "07:00:00"}]})
+
+
+def test_get_settings_reads_through_and_write_invalidates():
+    """Repeat reads hit the cache; create_or_update_settings drops the cached row"""
+    db = _db()
+    before = settings_cache.stats()
+    with patch("api.database.get_supabase_client", return_value=db):
+        assert database.get_settings(1)["wake_time"] == "07:00:00"
+        database.get_settings(1)["wake_time"] = "mutated"  # callers get copies
+        assert database.get_settings(1)["wake_time"] == "07:00:00"
+        assert database.get_settings(2) is None
+        assert database.get_settings(2) is None
+        assert db.calls == [("settings", "select")] * 2
+
+        database.create_or_update_settings(1, {"wake_time": "08:00:00"})
+        assert database.get_settings(1)["wake_time"] == "08:00:00"
+
+    stats = settings_cache.stats()
+    assert (stats["hits"] - before["hits"], stats["misses"] - before["misses"]) == (3, 3)
+
+
+def test_concurrent_async_misses_share_one_fetch():
+    """Concurrent async misses for one user await a single query, and the sync path shares the cache"""
+    db = _db()
+    fetch = database_async._fetch_settings
+    coalesced = settings_cache.stats()["coalesced"]
+
+    async def slow_fetch(user_id):
+        await asyncio.sleep(0.01)
+        return await fetch(user_id)
+
+    async def burst():
+        return await asyncio.gather(*(database_async.get_settings(1) for _ in range(10)))
+
+    with patch("api.database_async.get_async_supabase_client", return_value=db.as_async()), \
+         patch("api.database_async._fetch_settings", slow_fetch), \
+         patch("api.database.get_supabase_client", return_value=db):
+        rows = asyncio.run(burst())
+        assert database.get_settings(1)["wake_time"] == "07:00:00"
+
+    assert [row["wake_time"] for row in rows] == ["07:00:00"] * 10
+    assert db.calls == [("settings", "select")]
+    assert settings_cache.stats()["coalesced"] - coalesced == 9
+
+
+def test_concurrent_thread_misses_share_one_fetch():
+    """Threads missing on the same user wait for the first caller's fetch"""
+    cache = RowCache(max_entries=8, ttl_seconds=30)
+    fetches = []
+    release = threading.Event()
+
+    def fetch():
+        fetches.append(1)
+        release.wait(1)
+        return {"user_id": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.load(1, fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetches) == 1
+    assert results == [{"user_id": 1}] * 5
+
+
+def test_fetch_started_before_invalidation_is_not_cached():
+    """A row read before a write lands is returned once but never stored"""
+    cache = RowCache(max_entries=8, ttl_seconds=30)
+
+    def stale_fetch():
+        cache.invalidate(1)  # write lands while the read is in flight
+        return {"wake_time": "07:00:00"}
+
+    assert cache.load(1, stale_fetch) == {"wake_time": "07:00:00"}
+    assert cache.load(1, lambda: {"wake_time": "08:00:00"}) == {"wake_time": "08:00:00"}
+
+
+def test_invalidations_leave_no_per_key_state_behind():
+    """invalidate() only marks fetches in flight; a clear-all during one still keeps its row out"""
+    cache = RowCache(max_entries=8, ttl_seconds=30)
+    for key in range(1000):
+        cache.load(key, lambda: {"v": 1})
+        cache.invalidate(key)
+    cache.invalidate()
+
+    def stale_fetch():
+        cache.invalidate()
+        return {"v": 1}
+
+    assert cache.load(1, stale_fetch) == {"v": 1}
+    assert cache.load(1, lambda: {"v": 2}) == {"v": 2}
+    assert cache._fetches == {}
+
+def test_entries_expire_after_ttl_and_errors_are_not_cached():
+    """Rows are refetched after the TTL; a failed fetch leaves nothing behind"""
+    now = [0.0]
+    cache = RowCache(max_entries=8, ttl_seconds=30, clock=lambda: now[0])
+
+    def failing():
+        raise RuntimeError("down")
+
+    try:
+        cache.load(1, failing)
+    except RuntimeError:
+        pass
+    assert cache.load(1, lambda: {"v": 1}) == {"v": 1}
+    assert cache.load(1, lambda: {"v": 2}) == {"v": 1}
+    now[0] = 31
+    assert cache.load(1, lambda: {"v": 3}) == {"v": 3}
@@ -0,0 +1,79 @@
+import copy
+import random
+from datetime import datetime, timezone, timedelta
+
+from api.scheduling.scheduler import assign_events_to_slots
+from tests.reference_scheduler import legacy_assign_events_to_slots
+
+START = datetime(2030, 1, 1, 7, tzinfo=timezone.utc)
+
+
+def make_buckets(rng, subject_count, event_count):
+    """Random subject buckets shaped like schedule_events' grouped events."""
+    buckets = {}
+    for i in range(event_count):
+        subject = f"subject-{rng.randrange(subject_count)}"
+        buckets.setdefault(subject, []).append({
+            "user_id": 1,
+            "task_id": i,
+            "title": f"Task {i}",
+            "subject": subject,
+            "priority": rng.choice(["low", "medium", "high"]),
+            "duration_minutes": rng.choice([25, 30, 45, 60, 90, 135]),
+        })
+    return buckets
+
+
+def make_slots(rng, count, days):
+    """Energy-ordered slots: deliberately not chronological."""
+    slots = [
+        (START + timedelta(days=rng.randrange(days), minutes=5 * rng.randrange(0, 160)),
+         rng.choice([0.5, 1.0, 1.5, 2.75, 4.0, 7.5]),
+         rng.random())
+        for _ in range(count)
+    ]
+    return sorted(slots, key=lambda slot: slot[2], reverse=True)
+
+
+def test_heap_assignment_matches_round_robin():
+    """Heap-driven subject selection reproduces the linear round-robin exactly"""
+    rng = random.Random(42)
+    for trial in range(40):
+        buckets = make_buckets(rng, rng.randint(1, 12), rng.randint(1, 120))
+        slots = make_slots(rng, rng.randint(1, 60), rng.randint(1, 20))
+        settings = rng.choice([
+            {},
+            {"max_study_duration": 60, "short_break": 10, "long_break": 30, "long_study_threshold": 90},
+        ])
+
+        expected = legacy_assign_events_to_slots(copy.deepcopy(buckets), slots, settings, None)
+        actual = assign_events_to_slots(copy.deepcopy(buckets), slots, settings, None)
+
+        assert actual == expected, f"trial {trial} diverged"
+
+
+def test_same_subject_spacing_is_respected():
+    """A subject is not placed again within six hours of its previous session"""
+    buckets = {"Math": [
+        {"user_id": 1, "task_id": 1, "subject": "Math", "duration_minutes": 60},
+        {"user_id": 1, "task_id": 2, "subject": "Math", "duration_minutes": 60},
+    ]}
+    slots = [(START, 10.0, 1.0)]
+
+    scheduled = assign_events_to_slots(buckets, slots, {}, None)
+    study = [e for e in scheduled if e["event_type"] != "break"]
+
+    assert len(study) == 1
+    assert study[0]["start_time"] == START
+
+
+def test_slot_lengths_are_whole_minutes():
+    """Float hour lengths from the slot finder don't lose a minute to round-off"""
+    buckets = {"Math": [{"user_id": 1, "task_id": 1, "subject": "Math", "duration_minutes": 118}]}
+    # 123 minutes as produced by seconds / 3600 (122.99999... once multiplied back)
+    slots = [(START, 123 * 60 / 3600, 1.0)]
+
+    scheduled = assign_events_to_slots(buckets, slots, {"max_study_duration": 120}, None)
+
+    assert [e["title"] for e in scheduled] == ["Study Session", "Short Break"]
+    assert scheduled[-1]["end_time"] == START + timedelta(minutes=123)
@@ -0,0 +1,125 @@
+import asyncio
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from api import database_async
+from api.scheduling.matching import embedding_cache
+from api.scheduling.matching.embedding_cache import EMBEDDING_MODEL, content_hash
+from api.scheduling.matching.semantic_matcher import match_user_tasks
+from api.scheduling.matching.task_index import TaskEmbeddingIndex, get_task_index, task_indexes
+
+
+def _fake_embedding(text):
+    """Texts mentioning math point one way, everything else is random noise."""
+    noise = np.random.default_rng(zlib.crc32(text.encode())).normal(size=32) * 0.05
+    return (noise + (np.eye(32)[0] if "math" in text else 0)).tolist()
+
+
+@pytest.fixture
+def remote_batches(mock_async_supabase):
+    batches = []
+
+    async def fake_remote(texts):
+        batches.append(list(texts))
+        return [_fake_embedding(text) for text in texts]
+
+    embedding_cache.memory_cache.clear()
+    with patch.object(embedding_cache, "_embed_remote", fake_remote):
+        yield batches
+    embedding_cache.memory_cache.clear()
+
+
+def test_top_k_returns_best_matches_first():
+    """top_k agrees with a full sort of the similarities"""
+    rng = np.random.default_rng(0)
+    rows = [{"task_id": i, "content_hash": str(i), "embedding": rng.normal(size=16).tolist()} for i in range(200)]
+    index = TaskEmbeddingIndex.from_rows(rows)
+    query = rng.normal(size=16).astype(np.float32)
+    query /= np.linalg.norm(query)
+
+    ids, scores = index.scores(query)
+    expected = [int(ids[i]) for i in np.argsort(-scores)[:5]]
+    assert [task_id for task_id, _ in index.top_k(query, k=5)] == expected
+    assert index.top_k(query, k=5, min_score=2.0) == []
+
+
+def test_task_writes_update_a_resident_index_incrementally(remote_batches, mock_async_supabase):
+    """Inserted titles are embedded in one batch and persisted; deleted tasks leave the index"""
+    async def scenario():
+        await get_task_index(7, [])
+        await database_async.create_tasks_batch([
+            {"user_id": 7, "title": "math homework"},
+            {"user_id": 7, "title": "biology notes"},
+        ])
+        index = await get_task_index(7)
+        ids_after_insert = sorted(index.ids.tolist())
+
+        task_id = mock_async_supabase.tables["tasks"][0]["id"]
+        await database_async.delete_task(task_id)
+        return ids_after_insert, sorted((await get_task_index(7)).ids.tolist())
+
+    ids_after_insert, ids_after_delete = asyncio.run(scenario())
+
+    stored = mock_async_supabase.tables["task_embeddings"]
+    assert ids_after_insert == sorted(row["task_id"] for row in stored)
+    assert len(ids_after_insert) == 2
+    assert len(ids_after_delete) == 1
+    assert remote_batches == [["math homework", "biology notes"]]
+
+
+def test_index_is_loaded_from_task_embeddings(remote_batches, mock_async_supabase):
+    """A fresh worker matches from stored vectors, embedding only the message"""
+    tasks = [{"id": 1, "user_id": 7, "title": "math homework"}, {"id": 2, "user_id": 7, "title": "biology notes"}]
+    for task in tasks:
+        mock_async_supabase.add("task_embeddings", {
+            "task_id": task["id"], "user_id": 7, "model": EMBEDDING_MODEL,
+            "content_hash": content_hash(task["title"]), "embedding": _fake_embedding(task["title"]),
+        })
+
+    matched = asyncio.run(match_user_tasks(7, "delete my math tasks", tasks))
+
+    assert [task["id"] for task in matched] == [1]
+    assert remote_batches == [["delete my math tasks"]]
+
+
+def test_chat_user_ids_and_task_rows_share_one_index(remote_batches, mock_async_supabase):
+    """An index looked up with a chat request's string user id still receives task writes"""
+    async def scenario():
+        await match_user_tasks("7", "delete my math tasks", [{"id": 1, "user_id": 7, "title": "biology notes"}])
+        task_id = await database_async.create_task({"user_id": 7, "title": "math homework"})
+        assert task_indexes.resident("7").pending == {task_id: "math homework"}
+        await asyncio.sleep(0)  # let the background embedding run
+        return task_id
+
+    task_id = asyncio.run(scenario())
+
+    assert task_id in task_indexes.resident("7").ids.tolist()
+    assert remote_batches[-1] == ["math homework"]
+
+
+def test_task_deleted_while_embedding_is_not_indexed(mock_async_supabase):
+    """A delete landing during the batch's embed call keeps its vector out of the index and the table"""
+    async def remote_that_races_a_delete(texts):
+        await database_async.delete_task(mock_async_supabase.tables["tasks"][0]["id"])
+        return [_fake_embedding(text) for text in texts]
+
+    async def scenario():
+        await get_task_index(7, [])
+        await database_async.create_tasks_batch([
+            {"user_id": 7, "title": "math homework"},
+            {"user_id": 7, "title": "biology notes"},
+        ])
+        return await get_task_index(7)
+
+    embedding_cache.memory_cache.clear()
+    with patch.object(embedding_cache, "_embed_remote", remote_that_races_a_delete):
+        index = asyncio.run(scenario())
+    embedding_cache.memory_cache.clear()
+
+    remaining = [task["id"] for task in mock_async_supabase.tables["tasks"]]
+    assert index.ids.tolist() == remaining
+    assert [row["task_id"] for row in mock_async_supabase.tables["task_embeddings"]] == remaining
+    assert index.pending == {}
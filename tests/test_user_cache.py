@@ -0,0 +1,81 @@
+import asyncio
+from unittest.mock import patch
+
+from api import database, database_async
+from api.auth.user_cache import user_request_scope
+from api.timezone.conversions import resolve_user_timezone_async
+from tests.fakes import FakeSupabase
+
+
+def _db():
+    return FakeSupabase({"users": [{"id": 1, "timezone": "Europe/Paris", "conversation_id": "conv-1",
+                                    "subscription_plan": "pro", "credits_used": 3}]})
+
+
+async def _intent(user_id, new_conversation_id=None):
+    """What one agent action does with the users row: timezone, conversation read and save."""
+    tz_name = await resolve_user_timezone_async(user_id)
+    conversation_id = await database_async.get_user_conversation_id(user_id)
+    await database_async.update_user_conversation_id(user_id, new_conversation_id or conversation_id)
+    return tz_name, conversation_id
+
+
+def _chat_turn(new_conversation_id=None):
+    async def turn():
+        with user_request_scope():
+            return await asyncio.gather(*(_intent(1, new_conversation_id) for _ in range(3)))
+    return asyncio.run(turn())
+
+
+def test_chat_turn_reads_user_row_once_and_skips_unchanged_writes():
+    """Three parallel intents share one users select and rewrite nothing"""
+    db = _db()
+    with patch("api.database_async.get_async_supabase_client", return_value=db.as_async()):
+        results = _chat_turn()
+
+    assert results == [("Europe/Paris", "conv-1")] * 3
+    assert db.calls == [("users", "select")]
+
+
+def test_changed_conversation_id_is_written_once_and_seen_next_turn():
+    """A new conversation id saved by every intent costs one update; the next turn reads it"""
+    db = _db()
+    with patch("api.database_async.get_async_supabase_client", return_value=db.as_async()):
+        _chat_turn("conv-2")
+        assert db.calls == [("users", "select"), ("users", "update")]
+
+        db.reset_calls()
+        assert _chat_turn()[0] == ("Europe/Paris", "conv-2")
+        assert db.calls == [("users", "select")]
+
+
+def test_process_cache_serves_reads_until_a_user_write():
+    """Outside a request the row is cached per process; writers invalidate it"""
+    db = _db()
+    with patch("api.database.get_supabase_client", return_value=db):
+        assert database.get_user_by_id(1)["subscription_plan"] == "pro"
+        assert database.get_user_by_id(1)["timezone"] == "Europe/Paris"
+        assert db.calls == [("users", "select")]
+
+        database.update_user_plan(1, "unlimited")
+        assert database.get_user_by_id(1)["subscription_plan"] == "unlimited"
+        assert db.calls == [("users", "select"), ("users", "update"), ("users", "select")]
+
+
+def test_credits_skip_the_process_cache():
+    """A credit change made by another worker is seen at once; a request still reads credits once"""
+    db = _db()
+    with patch("api.database_async.get_async_supabase_client", return_value=db.as_async()):
+        async def turn():
+            with user_request_scope():
+                await database_async.get_user_by_id(1)  # warms the process cache
+                credits = [await database_async.get_user_credits(1) for _ in range(3)]
+                return credits, (await database_async.get_user_by_id(1))["credits_used"]
+
+        assert asyncio.run(turn()) == ([{"subscription_plan": "pro", "credits_used": 3,
+                                         "subscription_status": None}] * 3, 3)
+        assert db.calls == [("users", "select")] * 2
+
+        db.tables["users"][0]["credits_used"] = 4  # written by another worker
+        assert asyncio.run(database_async.get_user_credits(1))["credits_used"] == 4
+        assert asyncio.run(database_async.get_user_by_id(1))["credits_used"] == 3